@@ -0,0 +1,153 @@
+"""This module compiles a routing model into typed columnar arrays"""
+
+from array import array
+
+INFINITY = float("inf")
+
+
+def window_end(tw_end):
+    """Return the end of a time window, a zero end means no deadline"""
+    return tw_end if tw_end > 0 else INFINITY
+
+
+def vehicle_limit(max_number):
+    """Return the number of vehicles of a vehicle type, a zero max_number
+    means no limit (it is not sent to the solver)"""
+    return max_number if max_number > 0 else INFINITY
+
+
+class ModelArrays:
+    """Columnar view of the points, vehicle types and links of a model.
+
+    Additional informations:
+        - rows of points follow the order of :py:attr:`Model.points`
+        - start and end points of links and vehicle types are stored
+          as row indices (-1 for a vehicle type without start or end point)
+        - the time of an arc (i, j) is the time of the link plus the
+          service time of j, as in the solver
+    """
+
+    def __init__(self, model):
+        points = list(dict.values(model.points))
+        incompatible_vehicles = model.get_incompatible_vehicles()
+        self.point_ids = [point.id for point in points]
+        self.index = {point_id: row for row, point_id
+                      in enumerate(self.point_ids)}
+        self.names = [point.name for point in points]
+        self.id_customer = array("l", [point.id_customer
+                                       for point in points])
+        self.demand = array("l", [point.demand for point in points])
+        self.service_time = array("d", [point.service_time
+                                        for point in points])
+        self.tw_begin = array("d", [point.tw_begin for point in points])
+        self.tw_end = array("d", [point.tw_end for point in points])
+        self.penalty = array("d", [point.penalty_or_cost
+                                   for point in points])
+        self.incompatible_vehicles = [set(incompatible_vehicles[point.id])
+                                      for point in points]
+
+        vehicle_types = list(dict.values(model.vehicle_types))
+        self.vehicle_type_ids = [veh.id for veh in vehicle_types]
+        self.vehicle_type_index = {veh_id: row for row, veh_id
+                                   in enumerate(self.vehicle_type_ids)}
+        self.capacity = array("l", [veh.capacity for veh in vehicle_types])
+        self.fixed_cost = array("d", [veh.fixed_cost
+                                      for veh in vehicle_types])
+        self.var_cost_dist = array("d", [veh.var_cost_dist
+                                         for veh in vehicle_types])
+        self.var_cost_time = array("d", [veh.var_cost_time
+                                         for veh in vehicle_types])
+        self.max_number = array("l", [veh.max_number
+                                      for veh in vehicle_types])
+        self.start = array("l", [self.index.get(veh.start_point_id, -1)
+                                 for veh in vehicle_types])
+        self.end = array("l", [self.index.get(veh.end_point_id, -1)
+                               for veh in vehicle_types])
+        self.vehicle_tw_begin = array("d", [veh.tw_begin
+                                            for veh in vehicle_types])
+        self.vehicle_tw_end = array("d", [veh.tw_end
+                                          for veh in vehicle_types])
+        self.max_total_vehicles_number = model.max_total_vehicles_number
+
+        links = [link for link in model.get_links()
+                 if link.start_point_id in self.index
+                 and link.end_point_id in self.index]
+        self.link_start = array("l", [self.index[link.start_point_id]
+                                      for link in links])
+        self.link_end = array("l", [self.index[link.end_point_id]
+                                    for link in links])
+        self.link_distance = array("d", [link.distance for link in links])
+        self.link_time = array("d", [link.time for link in links])
+        self.link_fixed_cost = array("d", [link.fixed_cost
+                                           for link in links])
+        self.link_is_directed = array("b", [link.is_directed
+                                            for link in links])
+        self.link_names = [link.name for link in links]
+        self._arc_links = None
+
+    @property
+    def nb_points(self):
+        """int : number of rows of points"""
+        return len(self.point_ids)
+
+    @property
+    def customer_rows(self):
+        """list(int) : rows of points which are customers"""
+        return [row for row, id_customer in enumerate(self.id_customer)
+                if id_customer > 0]
+
+    @property
+    def depot_rows(self):
+        """list(int) : rows of points which are depots"""
+        return [row for row, id_customer in enumerate(self.id_customer)
+                if id_customer == 0]
+
+    def arcs(self):
+        """Return the arcs of the graph as columns (start, end, link),
+        an undirected link gives the two arcs"""
+        reverse = [k for k, directed in enumerate(self.link_is_directed)
+                   if not directed]
+        links = list(range(len(self.link_start))) + reverse
+        starts = array("l", self.link_start)
+        starts.extend(self.link_end[k] for k in reverse)
+        ends = array("l", self.link_end)
+        ends.extend(self.link_start[k] for k in reverse)
+        return starts, ends, array("l", links)
+
+    def arc_links(self):
+        """Return a dictionary giving for each arc (i, j) the list of
+        links which can be used to go from i to j"""
+        if self._arc_links is None:
+            self._arc_links = {}
+            for i, j, k in zip(*self.arcs()):
+                self._arc_links.setdefault((i, j), []).append(k)
+        return self._arc_links
+
+    def best_link(self, i, j, vehicle_row):
+        """Return the cheapest link from i to j for a vehicle type,
+        -1 if there is no link"""
+        best, best_cost = -1, INFINITY
+        for k in self.arc_links().get((i, j), ()):
+            cost = (self.var_cost_dist[vehicle_row] * self.link_distance[k]
+                    + self.var_cost_time[vehicle_row] * self.link_time[k]
+                    + self.link_fixed_cost[k])
+            if cost < best_cost:
+                best, best_cost = k, cost
+        return best
+
+    def arc_matrices(self, var_cost_dist=1.0, var_cost_time=0.0):
+        """Return dense matrices (cost, link) of the cheapest arc between
+        each pair of points for the given variable costs, missing arcs
+        have an infinite cost and a link equal to -1"""
+        size = self.nb_points
+        cost = [array("d", [INFINITY]) * size for _ in range(size)]
+        link = [array("l", [-1]) * size for _ in range(size)]
+        arc_costs = [var_cost_dist * dist + var_cost_time * tim + fixed
+                     for dist, tim, fixed in zip(self.link_distance,
+                                                 self.link_time,
+                                                 self.link_fixed_cost)]
+        for i, j, k in zip(*self.arcs()):
+            if arc_costs[k] < cost[i][j]:
+                cost[i][j] = arc_costs[k]
+                link[i][j] = k
+        return cost, link
@@ -0,0 +1,71 @@
+"""This module schedules the resolution of a batch of models within a
+total time budget, see :py:meth:`Model.solve_batch`"""
+
+
+def round_jobs(index, time_limit, growth, remaining, nb_jobs):
+    """Return the time limit of the jobs of a round and the number of
+    jobs which fit in the remaining budget : the limit is time_limit for
+    the first round (index 0) multiplied by growth at each round, one
+    job is given the remaining budget when it is shorter than the
+    limit"""
+    limit = time_limit * growth ** index
+    count = min(nb_jobs, int(remaining // limit))
+    if count == 0:
+        return remaining, 1
+    return limit, count
+
+
+class BatchResult:
+    """Result of :py:meth:`Model.solve_batch`
+
+    Additional informations:
+        - runs contains for each model a dictionary with its name,
+          status, value, bestLB, number of rounds, last time limit, time
+          spent and solved flag (optimality proven)
+        - rounds contains for each round its time limit, its number of
+          jobs and the number of models solved at its end
+        - progress contains the pairs (budget spent, number of models
+          solved) after each job
+    """
+
+    def __init__(self, runs, rounds, progress, budget, spent=0.0):
+        self.__runs = runs
+        self.__rounds = rounds
+        self.__progress = progress
+        self.__budget = budget
+        self.__spent = spent
+
+    @property
+    def runs(self):
+        """list(dict) : results of each model"""
+        return self.__runs
+
+    @property
+    def rounds(self):
+        """list(dict) : time limit and results of each round"""
+        return self.__rounds
+
+    @property
+    def progress(self):
+        """list(tuple) : budget spent and number of models solved"""
+        return self.__progress
+
+    @property
+    def budget(self):
+        """float : total time budget in seconds"""
+        return self.__budget
+
+    @property
+    def spent(self):
+        """float : time spent by the jobs in seconds"""
+        return self.__spent
+
+    @property
+    def solved(self):
+        """int : number of models whose optimality is proven"""
+        return sum(run["solved"] for run in self.__runs)
+
+    def __repr__(self):
+        return repr({"solved": self.solved, "models": len(self.__runs),
+                     "budget": self.__budget, "spent": self.__spent,
+                     "rounds": self.__rounds})
@@ -0,0 +1,209 @@
+"""This module writes and reads the binary format of models and solutions.
+
+A file starts with a fixed prefix (magic bytes, version of the format,
+compression and length of the header). The header is a json document
+holding the scalar values and the description of the tables. The columns
+of the tables follow as typed arrays aligned on 8 bytes. When the file is
+compressed, the columns form a single zlib or lzma stream.
+"""
+
+import json
+import lzma
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from itertools import accumulate
+
+MAGIC = b"VRPB"
+VERSION = 1
+EXTENSION = ".vrpb"
+COMPRESSIONS = ("", "zlib", "lzma")
+_PREFIX = struct.Struct("<4sHBxI")
+_ALIGNMENT = 8
+_CHUNK = 1 << 20
+
+# types of the columns : "q" integers, "d" numbers, "b" booleans,
+# "s" strings and "l" lists of integers
+_NUMERIC_TYPES = ("q", "d", "b")
+
+
+def is_binary(path):
+    """Return True if the file at path is in the binary format"""
+    with open(path, "rb") as infile:
+        return infile.read(len(MAGIC)) == MAGIC
+
+
+def _encode_column(kind, values):
+    """Return the description and the arrays of a column"""
+    description = {"type": kind}
+    if kind == "d":
+        # the integers are flagged to be given back as integers
+        mask = array("b", [type(value) is int for value in values])
+        if all(mask):
+            description["int"] = True
+        elif any(mask):
+            return description, [array("d", values), mask]
+        return description, [array("d", values)]
+    if kind in _NUMERIC_TYPES:
+        return description, [array(kind, values)]
+    if kind == "s":
+        encoded = [value.encode("utf-8") for value in values]
+        offsets = array("q", [0])
+        offsets.extend(accumulate(len(value) for value in encoded))
+        return description, [offsets, b"".join(encoded)]
+    offsets = array("q", [0])
+    offsets.extend(accumulate(len(value) for value in values))
+    return description, [offsets,
+                         array("q", [x for value in values for x in value])]
+
+
+def _decode_column(description, buffers):
+    """Return the values of a column from its buffers"""
+    kind = description["type"]
+    if kind in _NUMERIC_TYPES:
+        values = buffers[0].cast(kind).tolist()
+        if kind == "b":
+            return [bool(value) for value in values]
+        if description.get("int"):
+            return [int(value) for value in values]
+        if len(buffers) > 1:
+            return [int(value) if is_int else value for value, is_int
+                    in zip(values, buffers[1].cast("b").tolist())]
+        return values
+    offsets = buffers[0].cast("q").tolist()
+    if kind == "s":
+        data = bytes(buffers[1])
+        return [data[begin:end].decode("utf-8")
+                for begin, end in zip(offsets, offsets[1:])]
+    data = buffers[1].cast("q").tolist()
+    return [data[begin:end] for begin, end in zip(offsets, offsets[1:])]
+
+
+def _compressor(compression):
+    """Return a streaming compressor (None without compression)"""
+    if compression == "zlib":
+        return zlib.compressobj(6)
+    if compression == "lzma":
+        return lzma.LZMACompressor()
+    return None
+
+
+def _decompressor(compression):
+    """Return a streaming decompressor"""
+    if compression == "zlib":
+        return zlib.decompressobj()
+    return lzma.LZMADecompressor()
+
+
+def write(path, data, tables, compression=""):
+    """Write a binary file.
+
+    data is a json serializable dictionary, tables is a dictionary giving
+    for each table a list of columns (name, type, values).
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError("unknown compression " + repr(compression))
+    description = {}
+    buffers = []
+    for table, columns in tables.items():
+        description[table] = []
+        for name, kind, values in columns:
+            column, column_buffers = _encode_column(kind, values)
+            column["name"] = name
+            column["sizes"] = [len(memoryview(buffer).cast("B"))
+                               for buffer in column_buffers]
+            description[table].append(column)
+            buffers.extend(column_buffers)
+    header = json.dumps({"byteorder": sys.byteorder, "data": data,
+                         "tables": description}).encode("utf-8")
+    header += b" " * (-(_PREFIX.size + len(header)) % _ALIGNMENT)
+
+    compressor = _compressor(compression)
+    with open(path, "wb") as outfile:
+        outfile.write(_PREFIX.pack(MAGIC, VERSION,
+                                   COMPRESSIONS.index(compression),
+                                   len(header)))
+        outfile.write(header)
+        for buffer in buffers:
+            content = memoryview(buffer).cast("B")
+            padding = b"\0" * (-len(content) % _ALIGNMENT)
+            if compressor is None:
+                outfile.write(content)
+                outfile.write(padding)
+            else:
+                outfile.write(compressor.compress(content))
+                outfile.write(compressor.compress(padding))
+        if compressor is not None:
+            outfile.write(compressor.flush())
+
+
+def _read_columns(infile, compression, size):
+    """Return the memory holding the columns of an opened file"""
+    if compression == "":
+        # the columns are read directly from the mapped file
+        return memoryview(mmap.mmap(infile.fileno(), 0,
+                                    access=mmap.ACCESS_READ))[
+                                        infile.tell():]
+    content = bytearray()
+    decompressor = _decompressor(compression)
+    while len(content) < size:
+        chunk = infile.read(_CHUNK)
+        if not chunk:
+            break
+        content += decompressor.decompress(chunk)
+    return memoryview(content)
+
+
+def read(path):
+    """Read a binary file, return its data and its tables as a
+    dictionary giving for each table a dictionary of columns"""
+    with open(path, "rb") as infile:
+        magic, version, compression, header_size = _PREFIX.unpack(
+            infile.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError("not a binary model or solution")
+        if version > VERSION:
+            raise ValueError("unsupported version " + str(version))
+        header = json.loads(infile.read(header_size))
+        sizes = [size for columns in header["tables"].values()
+                 for column in columns for size in column["sizes"]]
+        memory = _read_columns(infile, COMPRESSIONS[compression],
+                               sum(size + (-size % _ALIGNMENT)
+                                   for size in sizes))
+    swap = header["byteorder"] != sys.byteorder
+    tables = {}
+    position = 0
+    for table, columns in header["tables"].items():
+        tables[table] = {}
+        for column in columns:
+            buffers = []
+            for size in column["sizes"]:
+                buffers.append(memory[position:position + size])
+                position += size + (-size % _ALIGNMENT)
+            if swap:
+                buffers = [_swap(buffer, kind) for buffer, kind
+                           in zip(buffers, _buffer_types(column))]
+            tables[table][column["name"]] = _decode_column(column, buffers)
+    return header["data"], tables
+
+
+def _buffer_types(column):
+    """Return the item types of the buffers of a column"""
+    kind = column["type"]
+    if kind in _NUMERIC_TYPES:
+        return [kind, "b"][:len(column["sizes"])]
+    if kind == "s":
+        return ["q", "B"]
+    return ["q", "q"]
+
+
+def _swap(buffer, kind):
+    """Return a buffer written with the other byte order"""
+    if kind in ("B", "b"):
+        return buffer
+    values = array(kind)
+    values.frombytes(buffer)
+    values.byteswap()
+    return memoryview(values).cast("B")
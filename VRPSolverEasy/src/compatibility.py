@@ -0,0 +1,116 @@
+"""This module keeps the compatibility of points with vehicle types"""
+
+
+class CompatibilityMatrix:
+    """Incompatibilities of points with vehicle types stored as bitsets.
+
+    Additional informations:
+        - each vehicle type id has a bit, each point has the bitset of the
+          vehicle types incompatible with it
+        - a point is incompatible with the vehicle types it declares in
+          incompatible_vehicles and, for a depot, with the vehicle types
+          which neither start nor end at it
+        - :py:meth:`refresh` compares the model with the state seen at
+          the previous call and only updates what changed
+    """
+
+    def __init__(self):
+        self.__bits = {}
+        self.__free_bits = []
+        self.__vehicle_types = {}
+        self.__users = {}
+        self.__all = 0
+        self.__points = {}
+        self.__declared = {}
+        self.__depots = set()
+
+    def __bit(self, vehicle_type_id):
+        """Return the bit of a vehicle type, given to it if needed"""
+        if vehicle_type_id not in self.__bits:
+            if self.__free_bits:
+                self.__bits[vehicle_type_id] = self.__free_bits.pop()
+            else:
+                self.__bits[vehicle_type_id] = len(self.__bits)
+        return 1 << self.__bits[vehicle_type_id]
+
+    def __use(self, vehicle_type_id, depots, sign):
+        """Add (sign 1) or remove (sign -1) a vehicle type from the users
+        of its depots"""
+        bit = 1 << self.__bits[vehicle_type_id]
+        for depot_id in set(depots):
+            users = self.__users.get(depot_id, 0)
+            self.__users[depot_id] = users | bit if sign > 0 else \
+                users & ~bit
+
+    def refresh(self, points, vehicle_types):
+        """Update the bitsets from dictionaries of points and vehicle
+        types"""
+        for vehicle_type_id in list(self.__vehicle_types):
+            if vehicle_type_id not in vehicle_types:
+                self.__use(vehicle_type_id,
+                           self.__vehicle_types.pop(vehicle_type_id), -1)
+                self.__free_bits.append(self.__bits.pop(vehicle_type_id))
+                self.__declared.clear()
+        for vehicle_type_id, vehicle_type in vehicle_types.items():
+            depots = (vehicle_type.start_point_id, vehicle_type.end_point_id)
+            previous = self.__vehicle_types.get(vehicle_type_id)
+            if previous == depots:
+                continue
+            if previous is None:
+                # the points may already declare this vehicle type
+                self.__bit(vehicle_type_id)
+                self.__declared.clear()
+            else:
+                self.__use(vehicle_type_id, previous, -1)
+            self.__use(vehicle_type_id, depots, 1)
+            self.__vehicle_types[vehicle_type_id] = depots
+        self.__all = 0
+        for vehicle_type_id in self.__vehicle_types:
+            self.__all |= 1 << self.__bits[vehicle_type_id]
+
+        for point_id in list(self.__points):
+            if point_id not in points:
+                del self.__points[point_id]
+                self.__declared.pop(point_id, None)
+                self.__depots.discard(point_id)
+        for point_id, point in points.items():
+            declared = tuple(point.incompatible_vehicles)
+            if point_id not in self.__declared or \
+                    self.__points.get(point_id) != declared:
+                mask = 0
+                for vehicle_type_id in declared:
+                    if vehicle_type_id in self.__bits:
+                        mask |= 1 << self.__bits[vehicle_type_id]
+                self.__points[point_id] = declared
+                self.__declared[point_id] = mask
+            if point.id_customer == 0:
+                self.__depots.add(point_id)
+            else:
+                self.__depots.discard(point_id)
+
+    def incompatible_mask(self, point_id):
+        """Return the bitset of the vehicle types incompatible with a
+        point"""
+        mask = self.__declared.get(point_id, 0)
+        if point_id in self.__depots:
+            mask |= self.__all & ~self.__users.get(point_id, 0)
+        return mask
+
+    def is_compatible(self, point_id, vehicle_type_id):
+        """Return True if a vehicle type can visit a point"""
+        bit = self.__bits.get(vehicle_type_id)
+        return bit is None or not self.incompatible_mask(point_id) >> bit & 1
+
+    def incompatible_vehicles(self, point_id):
+        """Return the ids of the vehicle types incompatible with a point,
+        those declared by the point first"""
+        declared = list(self.__points.get(point_id, ()))
+        if point_id not in self.__depots:
+            return declared
+        unused = self.__all & ~self.__users.get(point_id, 0) \
+            & ~self.__declared.get(point_id, 0)
+        if unused:
+            declared.extend(vehicle_type_id for vehicle_type_id
+                            in self.__vehicle_types
+                            if unused >> self.__bits[vehicle_type_id] & 1)
+        return declared
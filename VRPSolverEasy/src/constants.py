@@ -35,6 +35,8 @@ ENUM_STR_PROPERTY = 13
 ENUM_INT_PROPERTY = 14
 TUPLE_PROPERTY = 15
 LESS_MAX_POINTS_ID_PROPERTY = 16
+UPPER_BOUND_PROVIDER_PROPERTY = 17
+GREATER_THAN_ONE_PROPERTY = 18
 ERRORS_PROPERTY = {
     INVALID_PROPERTY: " is an invalid property",
     INTEGER_PROPERTY: " must be an integer",
@@ -52,7 +54,9 @@ ERRORS_PROPERTY = {
     LINK_PROPERTY: "The value must be a Link",
     ENUM_STR_PROPERTY: " must be a string in the following list: ",
     ENUM_INT_PROPERTY: " must be an integer in the following list: ",
-    TUPLE_PROPERTY: " must be a tuple of lenght 2 "}
+    TUPLE_PROPERTY: " must be a tuple of lenght 2 ",
+    UPPER_BOUND_PROVIDER_PROPERTY: "The value must be an UpperBoundProvider",
+    GREATER_THAN_ONE_PROPERTY: " must be greater than 1"}
 
 # model errors
 CUSTOMERS_ERROR = -6
@@ -73,6 +77,10 @@ PLATFORM_ERROR = -20
 LOAD_LIB_ERROR = -21
 BAPCOD_ERROR = -22
 MODEL_NOT_SOLVED = -23
+UNKNOWN_POINT_ERROR = -24
+UNKNOWN_VEHICLE_TYPE_ERROR = -25
+ALTERNATIVE_ERROR = -26
+NO_SOLUTION_ERROR = -27
 
 ERRORS_MODEL = {
     CUSTOMERS_ERROR: "CUSTOMERS ERROR",
@@ -102,7 +110,11 @@ ERRORS_MODEL = {
                if the error persists please contact our support
               for more information""",
    MODEL_NOT_SOLVED: """ The model is not yet solved. 
-              You can solve it by using the function solve()""" }
+              You can solve it by using the function solve()""",
+    UNKNOWN_POINT_ERROR: "Unknown point id.",
+    UNKNOWN_VEHICLE_TYPE_ERROR: "Unknown vehicle type id.",
+    ALTERNATIVE_ERROR: "An alternative can only be added to a customer.",
+    NO_SOLUTION_ERROR: "A solution is needed to start the improvement."}
 
 # solution status
 INFEASIBLE = -2
@@ -129,6 +141,15 @@ SOLUTION_STATUS = {BETTER_SOL_DOES_NOT_EXISTS: "BETTER_SOL_DOES_NOT_EXISTS",
 ENUMERATION_STATUS = {ENUMERATION_INFEASIBLE: "ENUMERATION_INFEASIBLE",
                       ENUMERATION_NOT_SUCCEEDED: "ENUMERATION_NOT_SUCCEEDED",
                       ENUMERATION_SUCCEEDED: "ENUMERATION_SUCCEEDED"}
+# upper bound provider status
+UPPER_BOUND_APPLIED = "APPLIED"
+UPPER_BOUND_NOT_IMPROVING = "NOT_IMPROVING"
+UPPER_BOUND_SKIPPED = "SKIPPED"
+UPPER_BOUND_FAILED = "FAILED"
+
+# maximum number of points and of id_customer accepted by the solver
+MAX_NB_POINTS = 1022
+
 # Dictionary
 KEY_STR = "key"
 ID_STR = "id"
@@ -218,3 +239,11 @@ class ROUTE(Enum):
     LOAD = "load"
     TIME = "endTime"
     INCOMING_ARC_NAME = "incomingArcName"
+
+
+class HEURISTIC(Enum):
+    TIME_LIMIT = "HeuristicTimeLimit"
+    VALUE = "value"
+    ROUTES = "routes"
+    VEHICLE_TYPE_ID = "vehicleTypeId"
+    POINT_IDS = "pointIds"
@@ -0,0 +1,244 @@
+"""This module partitions the customers of a model into clusters which
+are solved separately, see :py:meth:`Model.solve_decomposition`"""
+
+import heapq
+import math
+
+from VRPSolverEasy.src import constants
+from VRPSolverEasy.src.arrays import INFINITY, vehicle_limit
+
+
+def customer_groups(arrays):
+    """Return the rows of customers grouped by id_customer, the
+    alternatives of a customer are never separated"""
+    groups = {}
+    for row in arrays.customer_rows:
+        groups.setdefault(arrays.id_customer[row], []).append(row)
+    return list(groups.values())
+
+
+def _cut(groups, nb_clusters):
+    """Cut an ordered list of groups into nb_clusters consecutive
+    clusters with about the same number of points"""
+    total = sum(len(group) for group in groups)
+    clusters = [[] for _ in range(nb_clusters)]
+    seen = 0
+    for group in groups:
+        cluster = min(seen * nb_clusters // total, nb_clusters - 1)
+        clusters[cluster].extend(group)
+        seen += len(group)
+    return [cluster for cluster in clusters if cluster]
+
+
+def angular_clusters(arrays, groups, nb_clusters, coordinates):
+    """Return clusters made of the customers of consecutive angles around
+    the depots, the sweep starts after the largest angular gap"""
+    depots = [coordinates[arrays.point_ids[row]] for row in arrays.depot_rows
+              if arrays.point_ids[row] in coordinates]
+    if not depots:
+        depots = list(coordinates.values())
+    center_x = sum(x for x, _ in depots) / len(depots)
+    center_y = sum(y for _, y in depots) / len(depots)
+    angles = []
+    for group in groups:
+        x, y = coordinates[arrays.point_ids[group[0]]]
+        angles.append((math.atan2(y - center_y, x - center_x), group))
+    angles.sort(key=lambda element: element[0])
+    gaps = [angles[k][0] - angles[k - 1][0] for k in range(1, len(angles))]
+    gaps.append(angles[0][0] + 2 * math.pi - angles[-1][0])
+    start = (gaps.index(max(gaps)) + 1) % len(angles)
+    ordered = [group for _, group in angles[start:] + angles[:start]]
+    return _cut(ordered, nb_clusters)
+
+
+def distance_clusters(arrays, groups, nb_clusters):
+    """Return clusters grown from the link distances : a cluster starts
+    from the unassigned customer farthest from the depots and takes the
+    nearest unassigned customers until it reaches its size"""
+    group_of = {}
+    for index, group in enumerate(groups):
+        for row in group:
+            group_of[row] = index
+    neighbours = [{} for _ in groups]
+    from_depots = [INFINITY] * len(groups)
+    for i, j, k in zip(*arrays.arcs()):
+        distance = arrays.link_distance[k]
+        if i in group_of and j in group_of:
+            a, b = group_of[i], group_of[j]
+            if a != b and distance < neighbours[a].get(b, INFINITY):
+                neighbours[a][b] = distance
+                neighbours[b][a] = distance
+        elif j in group_of and arrays.id_customer[i] == 0:
+            from_depots[group_of[j]] = min(from_depots[group_of[j]],
+                                           distance)
+
+    total = sum(len(group) for group in groups)
+    size = math.ceil(total / nb_clusters)
+    order = sorted(range(len(groups)), key=lambda index: -from_depots[index])
+    assigned = [False] * len(groups)
+    clusters = []
+    for seed in order:
+        if assigned[seed]:
+            continue
+        cluster = []
+        heap = [(0.0, seed)]
+        while heap and len(cluster) < size:
+            _, index = heapq.heappop(heap)
+            if assigned[index]:
+                continue
+            assigned[index] = True
+            cluster.extend(groups[index])
+            for other, distance in neighbours[index].items():
+                if not assigned[other]:
+                    heapq.heappush(heap, (distance, other))
+        clusters.append(cluster)
+    return clusters
+
+
+def fleet_size(arrays):
+    """Return the number of vehicles of a model, at least one"""
+    number = sum(vehicle_limit(max_number)
+                 for max_number in arrays.max_number)
+    return max(min(number, arrays.max_total_vehicles_number), 1)
+
+
+def clusters(arrays, max_size, coordinates=None):
+    """Return the clusters of customers (lists of point ids) with at most
+    about max_size points each. The clusters are angular around the
+    depots when coordinates {point id : (x, y)} are given for all
+    customers, otherwise they are grown from the link distances. There
+    are never more clusters than vehicles, so that each cluster is given
+    at least one vehicle, the clusters are larger when the fleet is
+    small."""
+    groups = customer_groups(arrays)
+    if not groups:
+        return []
+    nb_clusters = min(math.ceil(sum(len(group) for group in groups)
+                                / max_size), fleet_size(arrays))
+    if coordinates is not None and all(
+            arrays.point_ids[group[0]] in coordinates for group in groups):
+        rows = angular_clusters(arrays, groups, nb_clusters, coordinates)
+    else:
+        rows = distance_clusters(arrays, groups, nb_clusters)
+    if len(rows) > nb_clusters:
+        # the clusters grown from disconnected customers are merged
+        rows = _cut(rows, nb_clusters)
+    return [[arrays.point_ids[row] for row in cluster] for cluster in rows]
+
+
+def share(total, weights):
+    """Return total split in integers proportional to weights (by the
+    largest remainders)"""
+    exact = [total * weight / sum(weights) for weight in weights]
+    shares = [math.floor(value) for value in exact]
+    order = sorted(range(len(weights)),
+                   key=lambda index: shares[index] - exact[index])
+    for index in order[:total - sum(shares)]:
+        shares[index] += 1
+    return shares
+
+
+def split_fleet(arrays, clusters):
+    """Return for each cluster (list of point ids) the numbers of
+    vehicles {vehicle type id : max number} of the vehicle types with a
+    limit and the total number of vehicles, the fleet being split in
+    proportion to the demands of the clusters. Each cluster is given at
+    least one vehicle, the clusters being at most as many as the
+    vehicles (see :py:func:`clusters`)."""
+    demands = [sum(arrays.demand[arrays.index[point_id]]
+                   for point_id in cluster) for cluster in clusters]
+    weights = demands if sum(demands) > 0 else [len(cluster)
+                                                for cluster in clusters]
+    limits = {vehicle_type_id: max_number for vehicle_type_id, max_number
+              in zip(arrays.vehicle_type_ids, arrays.max_number)
+              if vehicle_limit(max_number) != INFINITY}
+    max_numbers = [dict.fromkeys(limits, 0) for _ in clusters]
+    if limits and len(limits) == len(arrays.vehicle_type_ids):
+        # without a vehicle type without limit, each cluster is first
+        # given a vehicle of the type with the most vehicles left
+        for numbers in max_numbers:
+            vehicle_type_id = max(limits, key=limits.get)
+            numbers[vehicle_type_id] += 1
+            limits[vehicle_type_id] -= 1
+    for vehicle_type_id, max_number in limits.items():
+        for numbers, number in zip(max_numbers, share(max_number, weights)):
+            numbers[vehicle_type_id] += number
+    totals = [1 + number for number in share(
+        max(arrays.max_total_vehicles_number - len(clusters), 0), weights)]
+    return max_numbers, totals
+
+
+def exceeds_fleet(arrays, routes):
+    """Return True if routes in the format of the solver output use more
+    vehicles than the fleet of a model"""
+    used = {}
+    for route in routes:
+        vehicle_type_id = route[constants.ROUTE.VEHICLE_TYPE_ID.value]
+        used[vehicle_type_id] = used.get(vehicle_type_id, 0) + 1
+    return len(routes) > arrays.max_total_vehicles_number or any(
+        number > vehicle_limit(arrays.max_number[
+            arrays.vehicle_type_index[vehicle_type_id]])
+        for vehicle_type_id, number in used.items())
+
+
+def merge_outputs(outputs):
+    """Return the output of the solver made of the routes of the
+    outputs of all clusters (None if a cluster has no solution, a
+    cluster whose customers are all optional may have no route)"""
+    routes = []
+    value = 0.0
+    for output in outputs:
+        if output is None:
+            return None
+        solution = output.get("Solution", {})
+        if "bestSolutionValue" not in solution:
+            return None
+        routes.extend(solution.get("Routes", []))
+        value += solution["bestSolutionValue"]
+    return {"Status": {"code": constants.BETTER_SOL_FOUND,
+                       "message": constants.SOLUTION_STATUS[
+                           constants.BETTER_SOL_FOUND]},
+            "Solution": {"bestSolutionValue": value, "Routes": routes}}
+
+
+class DecompositionResult:
+    """Result of :py:meth:`Model.solve_decomposition`
+
+    Additional informations:
+        - clusters contains the point ids of the customers of each cluster
+        - runs contains for each cluster a dictionary with its number of
+          customers, status, value, bestLB, number of branch and bound
+          nodes, time, finished flag and error
+        - the value is the sum of the values of the clusters, it is None
+          if a cluster has no solution
+    """
+
+    def __init__(self, clusters, runs, value=None, time=0.0):
+        self.__clusters = clusters
+        self.__runs = runs
+        self.__value = value
+        self.__time = time
+
+    @property
+    def clusters(self):
+        """list(list(int)) : point ids of the customers of each cluster"""
+        return self.__clusters
+
+    @property
+    def runs(self):
+        """list(dict) : results of each cluster"""
+        return self.__runs
+
+    @property
+    def value(self):
+        """float : cost of the stitched solution"""
+        return self.__value
+
+    @property
+    def time(self):
+        """float : time of the decomposition in seconds"""
+        return self.__time
+
+    def __repr__(self):
+        return repr({"value": self.__value, "time": self.__time,
+                     "runs": self.__runs})
@@ -0,0 +1,255 @@
+"""This module evaluates routes and solutions against a model compiled in
+:py:class:`ModelArrays`, see :py:class:`SolutionEvaluator`"""
+
+from array import array
+
+from VRPSolverEasy.src import constants
+from VRPSolverEasy.src.arrays import ModelArrays, vehicle_limit, window_end
+
+EPSILON = 1e-6
+
+
+def check_route(arrays, vehicle_type_id, point_ids, best_link=None,
+                with_json=True):
+    """Check a route against a model compiled in :py:class:`ModelArrays`,
+    return its cost, the route in the format of the solver output (None
+    if with_json is False), the id_customer of the visited customers and
+    the list of the violations (empty if the route is feasible).
+    best_link replaces :py:meth:`ModelArrays.best_link`, for instance to
+    cache it."""
+    if vehicle_type_id not in arrays.vehicle_type_index:
+        return 0.0, None, [], ["unknown vehicle type "
+                               + str(vehicle_type_id)]
+    if any(point_id not in arrays.index for point_id in point_ids):
+        return 0.0, None, [], ["unknown point in route " + str(point_ids)]
+    if best_link is None:
+        best_link = arrays.best_link
+    veh = arrays.vehicle_type_index[vehicle_type_id]
+    rows = [arrays.index[point_id] for point_id in point_ids]
+    violations = []
+    if arrays.start[veh] >= 0 and rows[0] != arrays.start[veh]:
+        violations.append("route does not start at its depot")
+    if arrays.end[veh] >= 0 and rows[-1] != arrays.end[veh]:
+        violations.append("route does not end at its depot")
+    capacity = arrays.capacity[veh]
+    cost = arrays.fixed_cost[veh]
+    load = 0
+    clock = 0.0
+    visited = []
+    visited_points = []
+    for position, row in enumerate(rows):
+        arc_name = str()
+        if position == 0:
+            clock = max(arrays.vehicle_tw_begin[veh],
+                        arrays.tw_begin[row])
+            if row != arrays.start[veh]:
+                clock = max(arrays.tw_begin[row],
+                            arrays.vehicle_tw_begin[veh]
+                            + arrays.service_time[row])
+        else:
+            link = best_link(rows[position - 1], row, veh)
+            if link < 0:
+                violations.append("no link between points "
+                                  + str(point_ids[position - 1]) + " and "
+                                  + str(point_ids[position]))
+                clock = max(arrays.tw_begin[row],
+                            clock + arrays.service_time[row])
+            else:
+                cost += (arrays.var_cost_dist[veh]
+                         * arrays.link_distance[link]
+                         + arrays.var_cost_time[veh]
+                         * arrays.link_time[link]
+                         + arrays.link_fixed_cost[link])
+                clock = max(arrays.tw_begin[row],
+                            clock + arrays.link_time[link]
+                            + arrays.service_time[row])
+                arc_name = arrays.link_names[link]
+        if clock > window_end(arrays.tw_end[row]):
+            violations.append("time window of point "
+                              + str(point_ids[position]) + " is violated")
+        if vehicle_type_id in arrays.incompatible_vehicles[row]:
+            violations.append("point " + str(point_ids[position])
+                              + " is incompatible with vehicle type "
+                              + str(vehicle_type_id))
+        if arrays.id_customer[row] > 0:
+            visited.append(arrays.id_customer[row])
+            load += arrays.demand[row]
+            if 0 < capacity < load and \
+                    load - arrays.demand[row] <= capacity:
+                violations.append("capacity of vehicle type "
+                                  + str(vehicle_type_id)
+                                  + " is exceeded")
+        elif arrays.penalty[row] != 0:
+            violations.append("depot costs are not supported")
+        if with_json:
+            visited_points.append({
+                constants.ROUTE.POINT_ID.value: point_ids[position],
+                constants.ROUTE.POINT_NAME.value: arrays.names[row],
+                constants.ROUTE.LOAD.value: load,
+                constants.ROUTE.TIME.value: clock,
+                constants.ROUTE.INCOMING_ARC_NAME.value: arc_name})
+    if clock > window_end(arrays.vehicle_tw_end[veh]):
+        violations.append("time window of vehicle type "
+                          + str(vehicle_type_id) + " is violated")
+    if not with_json:
+        return cost, None, visited, violations
+    return cost, {constants.ROUTE.VEHICLE_TYPE_ID.value: vehicle_type_id,
+                  constants.ROUTE.ROUTE_COST.value: cost,
+                  constants.ROUTE.VISITED_POINTS.value: visited_points}, \
+        visited, violations
+
+
+class EvaluationResult:
+    """Result of :py:meth:`SolutionEvaluator.evaluate`
+
+    Additional informations:
+        - costs and violations are given for each route, in the order of
+          the routes evaluated
+        - the value is the sum of the recomputed costs of the routes and
+          of the penalties of the optional customers which are not
+          visited
+        - solution_violations are the violations which do not belong to
+          one route (customers not visited or visited twice, numbers of
+          vehicles)
+    """
+
+    def __init__(self, value, costs, violations, solution_violations):
+        self.__value = value
+        self.__costs = costs
+        self.__violations = violations
+        self.__solution_violations = solution_violations
+
+    @property
+    def value(self):
+        """float : recomputed value of the solution"""
+        return self.__value
+
+    @property
+    def costs(self):
+        """list(float) : recomputed cost of each route"""
+        return self.__costs
+
+    @property
+    def violations(self):
+        """list(list(str)) : violations of each route"""
+        return self.__violations
+
+    @property
+    def solution_violations(self):
+        """list(str) : violations of the whole solution"""
+        return self.__solution_violations
+
+    @property
+    def feasible(self):
+        """bool : True if the solution has no violation"""
+        return not self.__solution_violations and \
+            not any(self.__violations)
+
+    def __repr__(self):
+        return repr({"value": self.__value, "feasible": self.feasible,
+                     "costs": self.__costs,
+                     "violations": self.__violations,
+                     "solutionViolations": self.__solution_violations})
+
+
+class SolutionEvaluator:
+    """Evaluation and validation of solutions of a model, for instance the
+    solutions returned by the solver or plans computed by other systems.
+
+    Additional informations:
+        - the model is compiled once in :py:class:`ModelArrays` and the
+          cheapest link of each arc is cached, so that batches of
+          solutions are evaluated quickly
+        - a solution is a :py:class:`Solution`, a list of
+          :py:class:`Route` or a list of (vehicle_type_id, point_ids)
+        - the route costs given by the solver are compared with the
+          recomputed costs
+    """
+
+    def __init__(self, model, arrays=None):
+        self.__arrays = ModelArrays(model) if arrays is None else arrays
+        self.__links = {}
+        self.__penalties = {}
+        for row in self.__arrays.customer_rows:
+            group = self.__arrays.id_customer[row]
+            self.__penalties[group] = max(self.__penalties.get(group, 0.0),
+                                          self.__arrays.penalty[row])
+
+    @property
+    def arrays(self):
+        """ModelArrays : compiled model"""
+        return self.__arrays
+
+    def __best_link(self, i, j, vehicle_row):
+        """Return the cheapest link from i to j for a vehicle type"""
+        key = (i, j, vehicle_row)
+        if key not in self.__links:
+            self.__links[key] = self.__arrays.best_link(i, j, vehicle_row)
+        return self.__links[key]
+
+    def check_route(self, vehicle_type_id, point_ids):
+        """Return the cost of a route, the id_customer of its customers and
+        its violations, see :py:func:`check_route`"""
+        cost, _, visited, violations = check_route(
+            self.__arrays, vehicle_type_id, point_ids, self.__best_link,
+            False)
+        return cost, visited, violations
+
+    def evaluate(self, solution):
+        """Return the :py:class:`EvaluationResult` of a solution"""
+        arrays = self.__arrays
+        routes = getattr(solution, "routes", solution)
+        costs = []
+        violations = []
+        visited = {}
+        used = array("l", [0]) * len(arrays.vehicle_type_ids)
+        value = 0.0
+        for route in routes:
+            if hasattr(route, "point_ids"):
+                vehicle_type_id, point_ids = (route.vehicle_type_id,
+                                              route.point_ids)
+                given_cost = route.route_cost
+            else:
+                (vehicle_type_id, point_ids), given_cost = route, None
+            if not point_ids:
+                costs.append(0.0)
+                violations.append([])
+                continue
+            cost, groups, route_violations = self.check_route(
+                vehicle_type_id, point_ids)
+            if given_cost is not None and \
+                    abs(given_cost - cost) > EPSILON * max(1.0, abs(cost)):
+                route_violations.append("cost " + str(given_cost)
+                                        + " differs from " + str(cost))
+            if vehicle_type_id in arrays.vehicle_type_index:
+                used[arrays.vehicle_type_index[vehicle_type_id]] += 1
+            for group in groups:
+                visited[group] = visited.get(group, 0) + 1
+            value += cost
+            costs.append(cost)
+            violations.append(route_violations)
+
+        solution_violations = []
+        for veh, number in enumerate(used):
+            if vehicle_limit(arrays.max_number[veh]) < number:
+                solution_violations.append(
+                    "too many vehicles of type "
+                    + str(arrays.vehicle_type_ids[veh]))
+        if sum(used) > arrays.max_total_vehicles_number:
+            solution_violations.append("too many vehicles")
+        for group, penalty in self.__penalties.items():
+            number = visited.get(group, 0)
+            if number > 1:
+                solution_violations.append("customer " + str(group)
+                                           + " is visited twice")
+            elif number == 0:
+                if penalty <= 0:
+                    solution_violations.append("customer " + str(group)
+                                               + " is not visited")
+                value += penalty
+        return EvaluationResult(value, costs, violations,
+                                solution_violations)
+
+    def evaluate_batch(self, solutions):
+        """Return the :py:class:`EvaluationResult` of each solution"""
+        return [self.evaluate(solution) for solution in solutions]
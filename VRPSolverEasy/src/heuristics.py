@@ -0,0 +1,545 @@
+"""This module computes upper bounds before the exact resolution of a model"""
+
+import abc
+import heapq
+import json
+import shlex
+import subprocess
+import time
+from array import array
+
+from VRPSolverEasy.src import constants
+from VRPSolverEasy.src.arrays import INFINITY, ModelArrays, vehicle_limit
+from VRPSolverEasy.src.evaluation import check_route
+
+
+class UpperBoundResult:
+    """Result of an upper bound provider run before the resolution"""
+
+    def __init__(self, provider=str(), status=constants.UPPER_BOUND_SKIPPED,
+                 value=None, routes=None, route_jsons=None, time=0.0,
+                 message=str()):
+        self.__provider = provider
+        self.__status = status
+        self.__value = value
+        self.__routes = routes if routes is not None else []
+        self.__route_jsons = route_jsons if route_jsons is not None else []
+        self.__time = time
+        self.__message = message
+
+    @property
+    def provider(self):
+        """str : name of the provider"""
+        return self.__provider
+
+    @property
+    def status(self):
+        """str : APPLIED, NOT_IMPROVING, SKIPPED or FAILED"""
+        return self.__status
+
+    @property
+    def value(self):
+        """float : value of the heuristic solution (None if not found)"""
+        return self.__value
+
+    @property
+    def routes(self):
+        """list(tuple) : routes (vehicle_type_id, point_ids) found"""
+        return self.__routes
+
+    @property
+    def route_jsons(self):
+        """list(dict) : routes found in the format of the solver output"""
+        return self.__route_jsons
+
+    @property
+    def time(self):
+        """float : time spent by the provider"""
+        return self.__time
+
+    @property
+    def message(self):
+        """str : reason of a skipped or failed run"""
+        return self.__message
+
+    def __repr__(self):
+        return repr({"provider": self.__provider, "status": self.__status,
+                     "value": self.__value, "time": self.__time,
+                     "message": self.__message})
+
+
+def evaluate_route(arrays, vehicle_type_id, point_ids):
+    """Check a route against a model compiled in :py:class:`ModelArrays`,
+    return its cost, the route in the format of the solver output and
+    the id_customer of the visited customers.
+    Raise a ValueError if the route is not feasible."""
+    cost, route_json, visited, violations = check_route(
+        arrays, vehicle_type_id, point_ids)
+    if violations:
+        raise ValueError(violations[0])
+    return cost, route_json, visited
+
+
+def evaluate_routes(arrays, routes):
+    """Check routes given as (vehicle_type_id, point_ids) against a
+    model compiled in :py:class:`ModelArrays`, return the value of the
+    solution and the routes in the format of the solver output.
+    Raise a ValueError if the routes are not feasible."""
+    visited = {}
+    used = array("l", [0]) * len(arrays.vehicle_type_ids)
+    value = 0.0
+    route_jsons = []
+    for vehicle_type_id, point_ids in routes:
+        if not point_ids:
+            continue
+        cost, route_json, groups = evaluate_route(arrays, vehicle_type_id,
+                                                  point_ids)
+        used[arrays.vehicle_type_index[vehicle_type_id]] += 1
+        for group in groups:
+            visited[group] = visited.get(group, 0) + 1
+        value += cost
+        route_jsons.append(route_json)
+
+    for veh, number in enumerate(used):
+        if number > vehicle_limit(arrays.max_number[veh]):
+            raise ValueError("too many vehicles of type "
+                             + str(arrays.vehicle_type_ids[veh]))
+    if sum(used) > arrays.max_total_vehicles_number:
+        raise ValueError("too many vehicles")
+
+    penalties = {}
+    for row in arrays.customer_rows:
+        group = arrays.id_customer[row]
+        penalties[group] = max(penalties.get(group, 0.0),
+                               arrays.penalty[row])
+    for group, penalty in penalties.items():
+        number = visited.get(group, 0)
+        if number > 1:
+            raise ValueError("customer " + str(group) + " is visited twice")
+        if number == 0:
+            if penalty <= 0:
+                raise ValueError("customer " + str(group) + " is not visited")
+            value += penalty
+    return value, route_jsons
+
+
+class UpperBoundProvider(abc.ABC):
+    """Heuristic run by :py:meth:`Model.solve` before the exact resolution.
+    The value found is given to the solver as upper bound.
+
+    Subclasses must implement :py:meth:`compute` and may implement
+    :py:meth:`is_applicable` to skip models they cannot handle.
+    """
+
+    name = "provider"
+
+    def __init__(self, time_limit=10.0):
+        self.time_limit = time_limit  # time budget in seconds
+
+    def is_applicable(self, arrays):
+        """Return the reason why the model cannot be handled,
+        an empty string if it can"""
+        return str()
+
+    @abc.abstractmethod
+    def compute(self, model, arrays, deadline):
+        """Return a pair (value, routes) where routes is a list of
+        (vehicle_type_id, point_ids), the value is recomputed when
+        routes are given. Raise a ValueError if nothing is found."""
+
+    def run(self, model):
+        """Run the heuristic on a model and return an
+        :py:class:`UpperBoundResult`"""
+        begin = time.perf_counter()
+        arrays = ModelArrays(model)
+        reason = self.is_applicable(arrays)
+        if reason != str():
+            return UpperBoundResult(self.name, constants.UPPER_BOUND_SKIPPED,
+                                    time=time.perf_counter() - begin,
+                                    message=reason)
+        try:
+            value, routes = self.compute(model, arrays,
+                                         begin + self.time_limit)
+            route_jsons = []
+            if routes:
+                value, route_jsons = evaluate_routes(arrays, routes)
+        except (ValueError, OSError, subprocess.SubprocessError) as error:
+            return UpperBoundResult(self.name, constants.UPPER_BOUND_FAILED,
+                                    time=time.perf_counter() - begin,
+                                    message=str(error))
+        if value is None:
+            return UpperBoundResult(self.name, constants.UPPER_BOUND_FAILED,
+                                    time=time.perf_counter() - begin,
+                                    message="no value found")
+        status = constants.UPPER_BOUND_APPLIED
+        if value >= model.parameters.upper_bound:
+            status = constants.UPPER_BOUND_NOT_IMPROVING
+        return UpperBoundResult(self.name, status, value, routes or [],
+                                route_jsons, time.perf_counter() - begin)
+
+
+class SavingsHeuristic(UpperBoundProvider):
+    """Savings heuristic of Clarke and Wright followed by a local search
+    (2-opt and relocation of customers between routes).
+
+    Additional informations:
+        - savings are computed row by row on the cost matrix of the
+          vehicle type with the largest capacity and only the best
+          ``neighbours`` savings of each customer are merged
+        - routes are then assigned to the cheapest available vehicle type
+        - models with time windows, several depots, open routes,
+          alternative points, incompatibilities or depot costs are skipped
+    """
+
+    name = "savings"
+
+    def __init__(self, time_limit=10.0, neighbours=40, local_search=True):
+        super().__init__(time_limit)
+        self.neighbours = neighbours
+        self.local_search = local_search
+
+    def is_applicable(self, arrays):
+        customers = arrays.customer_rows
+        if not customers:
+            return "the model has no customer"
+        if not arrays.vehicle_type_ids:
+            return "the model has no vehicle type"
+        depots = set(arrays.start) | set(arrays.end)
+        if len(depots) != 1 or -1 in depots:
+            return "vehicles must start and end at the same depot"
+        if any(arrays.tw_begin) or any(arrays.tw_end) or \
+                any(arrays.vehicle_tw_begin) or any(arrays.vehicle_tw_end):
+            return "time windows are not supported"
+        if len({arrays.id_customer[row] for row in customers}) \
+                != len(customers):
+            return "alternative points are not supported"
+        if any(arrays.incompatible_vehicles[row] for row in customers):
+            return "incompatibilities are not supported"
+        if any(arrays.penalty[row] != 0 for row in arrays.depot_rows):
+            return "depot costs are not supported"
+        return str()
+
+    def compute(self, model, arrays, deadline):
+        depot = arrays.start[0]
+        customers = arrays.customer_rows
+        capacities = [capacity if capacity > 0 else INFINITY
+                      for capacity in arrays.capacity]
+        reference = max(range(len(capacities)),
+                        key=lambda veh: (capacities[veh],
+                                         -arrays.var_cost_dist[veh]))
+        capacity = capacities[reference]
+        cost, _ = arrays.arc_matrices(arrays.var_cost_dist[reference],
+                                      arrays.var_cost_time[reference])
+        for row in customers:
+            if cost[depot][row] == INFINITY or cost[row][depot] == INFINITY:
+                raise ValueError("point " + str(arrays.point_ids[row])
+                                 + " is not linked to the depot")
+            if arrays.demand[row] > capacity:
+                raise ValueError("demand of point "
+                                 + str(arrays.point_ids[row])
+                                 + " exceeds the capacities")
+        symmetric = all(cost[i][j] == cost[j][i]
+                        for i in customers for j in customers)
+
+        routes = self.__merge(arrays, cost, depot, customers, capacity,
+                              symmetric, deadline)
+        if self.local_search:
+            self.__improve(arrays, cost, depot, routes, capacity, symmetric,
+                           deadline)
+        return None, self.__assign_vehicles(arrays, depot, routes)
+
+    def __merge(self, arrays, cost, depot, customers, capacity, symmetric,
+                deadline):
+        """Merge routes along the best savings"""
+        from_depot = cost[depot]
+        savings = []
+        for i in customers:
+            to_depot = cost[i][depot]
+            row = [to_depot + from_j - cost_ij
+                   for from_j, cost_ij in zip(from_depot, cost[i])]
+            savings.extend(heapq.nlargest(
+                self.neighbours,
+                ((row[j], i, j) for j in customers
+                 if j != i and row[j] > 0)))
+        savings.sort(reverse=True)
+
+        routes = {i: [i] for i in customers}
+        route_of = {i: i for i in customers}
+        loads = {i: arrays.demand[i] for i in customers}
+        for _, i, j in savings:
+            if time.perf_counter() > deadline:
+                break
+            first, second = route_of[i], route_of[j]
+            if first == second or \
+                    loads[first] + loads[second] > capacity:
+                continue
+            route_i, route_j = routes[first], routes[second]
+            if route_i[-1] != i:
+                if not symmetric or route_i[0] != i:
+                    continue
+                route_i.reverse()
+            if route_j[0] != j:
+                if not symmetric or route_j[-1] != j:
+                    continue
+                route_j.reverse()
+            route_i.extend(route_j)
+            for row in route_j:
+                route_of[row] = first
+            loads[first] += loads[second]
+            del routes[second]
+            del loads[second]
+        return [[depot] + route + [depot] for route in routes.values()]
+
+    @staticmethod
+    def __improve(arrays, cost, depot, routes, capacity, symmetric,
+                  deadline):
+        """Improve routes by 2-opt moves and relocations of customers"""
+        loads = [sum(arrays.demand[row] for row in route) for route in routes]
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            if symmetric:
+                for route in routes:
+                    for first in range(1, len(route) - 2):
+                        for last in range(first + 1, len(route) - 1):
+                            delta = (cost[route[first - 1]][route[last]]
+                                     + cost[route[first]][route[last + 1]]
+                                     - cost[route[first - 1]][route[first]]
+                                     - cost[route[last]][route[last + 1]])
+                            if delta < -1e-9:
+                                route[first:last + 1] = \
+                                    route[first:last + 1][::-1]
+                                improved = True
+            for origin, route in enumerate(routes):
+                position = 1
+                while position < len(route) - 1:
+                    if time.perf_counter() > deadline:
+                        return
+                    row = route[position]
+                    previous, following = route[position - 1], \
+                        route[position + 1]
+                    gain = (cost[previous][row] + cost[row][following]
+                            - cost[previous][following])
+                    best = (-1e-9, -1, -1)
+                    for target, other in enumerate(routes):
+                        if target == origin or len(other) < 3 or \
+                                loads[target] + arrays.demand[row] > capacity:
+                            continue
+                        for place in range(1, len(other)):
+                            delta = (cost[other[place - 1]][row]
+                                     + cost[row][other[place]]
+                                     - cost[other[place - 1]][other[place]]
+                                     - gain)
+                            if delta < best[0]:
+                                best = (delta, target, place)
+                    if best[1] >= 0:
+                        routes[best[1]].insert(best[2], row)
+                        loads[best[1]] += arrays.demand[row]
+                        loads[origin] -= arrays.demand[row]
+                        del route[position]
+                        improved = True
+                    else:
+                        position += 1
+            emptied = [index for index, route in enumerate(routes)
+                       if len(route) < 3]
+            for index in reversed(emptied):
+                del routes[index]
+                del loads[index]
+
+    @staticmethod
+    def __assign_vehicles(arrays, depot, routes):
+        """Assign each route to the cheapest available vehicle type"""
+        available = [vehicle_limit(number) for number in arrays.max_number]
+        remaining = arrays.max_total_vehicles_number
+        result = []
+        loads = [sum(arrays.demand[row] for row in route) for route in routes]
+        for index in sorted(range(len(routes)), key=lambda i: -loads[i]):
+            route = routes[index]
+            best, best_cost = -1, INFINITY
+            for veh in range(len(available)):
+                capacity = arrays.capacity[veh]
+                if available[veh] == 0 or 0 < capacity < loads[index]:
+                    continue
+                links = [arrays.best_link(route[k], route[k + 1], veh)
+                         for k in range(len(route) - 1)]
+                if -1 in links:
+                    continue
+                route_cost = arrays.fixed_cost[veh] + sum(
+                    arrays.var_cost_dist[veh] * arrays.link_distance[link]
+                    + arrays.var_cost_time[veh] * arrays.link_time[link]
+                    + arrays.link_fixed_cost[link] for link in links)
+                if route_cost < best_cost:
+                    best, best_cost = veh, route_cost
+            if best < 0 or remaining == 0:
+                raise ValueError("the fleet cannot serve the routes found")
+            available[best] -= 1
+            remaining -= 1
+            result.append((arrays.vehicle_type_ids[best],
+                           [arrays.point_ids[row] for row in route]))
+        return result
+
+
+class RoutesProvider(UpperBoundProvider):
+    """Routes given in advance, for instance the routes of a previous
+    plan, used as upper bound.
+
+    Additional informations:
+        - routes is a list of (vehicle_type_id, point_ids)
+        - each customer which must be visited and is not visited by the
+          routes is inserted at its cheapest feasible position, possibly
+          in a new route of an unused vehicle
+    """
+
+    name = "routes"
+
+    def __init__(self, routes, time_limit=10.0):
+        super().__init__(time_limit)
+        self.routes = routes
+
+    def compute(self, model, arrays, deadline):
+        routes = [(vehicle_type_id, list(point_ids))
+                  for vehicle_type_id, point_ids in self.routes if point_ids]
+        costs = []
+        visited = set()
+        for vehicle_type_id, point_ids in routes:
+            cost, _, groups = evaluate_route(arrays, vehicle_type_id,
+                                             point_ids)
+            costs.append(cost)
+            visited.update(groups)
+        missing = {}
+        for row in arrays.customer_rows:
+            group = arrays.id_customer[row]
+            if group not in visited and arrays.penalty[row] <= 0:
+                missing.setdefault(group, []).append(arrays.point_ids[row])
+        for point_ids in missing.values():
+            if time.perf_counter() > deadline:
+                raise ValueError("time limit of the insertion is exceeded")
+            best = self.__best_insertion(arrays, routes, costs, point_ids)
+            if best is None:
+                raise ValueError("point " + str(point_ids[0])
+                                 + " cannot be inserted")
+            index, route, cost = best
+            if index == len(routes):
+                routes.append(route)
+                costs.append(cost)
+            else:
+                routes[index] = route
+                costs[index] = cost
+        return None, routes
+
+    @staticmethod
+    def __best_insertion(arrays, routes, costs, point_ids):
+        """Return the cheapest insertion (route index, route, cost) of
+        one of the points, None if no insertion is feasible"""
+        candidates = []
+        for index, (vehicle_type_id, route) in enumerate(routes):
+            veh = arrays.vehicle_type_index[vehicle_type_id]
+            last = len(route) - 1 if arrays.end[veh] >= 0 else len(route)
+            for position in range(1, max(last, 1) + 1):
+                for point_id in point_ids:
+                    candidates.append((index, vehicle_type_id,
+                                       route[:position] + [point_id]
+                                       + route[position:]))
+        used = [0] * len(arrays.vehicle_type_ids)
+        for vehicle_type_id, _ in routes:
+            used[arrays.vehicle_type_index[vehicle_type_id]] += 1
+        if len(routes) < arrays.max_total_vehicles_number:
+            for veh, vehicle_type_id in enumerate(arrays.vehicle_type_ids):
+                if vehicle_limit(arrays.max_number[veh]) <= used[veh]:
+                    continue
+                depots = ([arrays.point_ids[arrays.start[veh]]]
+                          if arrays.start[veh] >= 0 else [],
+                          [arrays.point_ids[arrays.end[veh]]]
+                          if arrays.end[veh] >= 0 else [])
+                for point_id in point_ids:
+                    candidates.append((len(routes), vehicle_type_id,
+                                       depots[0] + [point_id] + depots[1]))
+        best = None
+        for index, vehicle_type_id, route in candidates:
+            try:
+                cost, _, _ = evaluate_route(arrays, vehicle_type_id, route)
+            except ValueError:
+                continue
+            delta = cost - (costs[index] if index < len(costs) else 0.0)
+            if best is None or delta < best[0]:
+                best = (delta, index, (vehicle_type_id, route), cost)
+        return None if best is None else best[1:]
+
+
+class ExternalHeuristic(UpperBoundProvider):
+    """Heuristic run as an external executable.
+
+    Protocol:
+        - the executable receives on its standard input the model in
+          the JSON format of :py:meth:`Model.export` with all elements,
+          plus the key ``HeuristicTimeLimit`` giving its time budget in
+          seconds. It is killed when the budget is exceeded.
+        - it writes on its standard output either a number (the value of
+          a solution) or a JSON object
+          ``{"value": 1234.5, "routes": [{"vehicleTypeId": 1,
+          "pointIds": [0, 3, 5, 0]}]}``. When routes are given, they are
+          checked against the model and their value is recomputed; the
+          routes must contain their start and end depots.
+        - a non-zero exit code means that no solution was found.
+    """
+
+    name = "external"
+
+    def __init__(self, command, time_limit=10.0):
+        super().__init__(time_limit)
+        self.command = command
+
+    def compute(self, model, arrays, deadline):
+        command = self.command
+        if isinstance(command, str):
+            command = shlex.split(command)
+        payload = model.get_model(True, all_elements=True)
+        payload[constants.HEURISTIC.TIME_LIMIT.value] = self.time_limit
+        try:
+            process = subprocess.run(
+                command, input=json.dumps(payload), stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE, universal_newlines=True,
+                timeout=max(deadline - time.perf_counter(), 0.0))
+        except subprocess.TimeoutExpired:
+            raise ValueError("time limit of the heuristic is exceeded")
+        if process.returncode != 0:
+            raise ValueError("the heuristic failed : " + process.stderr)
+        return read_output(json.loads(process.stdout))
+
+
+def _is_number(value):
+    """Return True if value is an int or a float (not a bool)"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def read_output(output):
+    """Return the pair (value, routes) of the json output of an external
+    heuristic. Raise a ValueError if the output is malformed."""
+    if _is_number(output):
+        return float(output), []
+    if not isinstance(output, dict):
+        raise ValueError("the output of the heuristic must be a number "
+                         "or a dictionary")
+    value = output.get(constants.HEURISTIC.VALUE.value)
+    if value is not None and not _is_number(value):
+        raise ValueError("the value of the heuristic must be a number")
+    routes = output.get(constants.HEURISTIC.ROUTES.value, [])
+    if not isinstance(routes, list):
+        raise ValueError("the routes of the heuristic must be a list")
+    result = []
+    for route in routes:
+        if not isinstance(route, dict) or \
+                constants.HEURISTIC.VEHICLE_TYPE_ID.value not in route or \
+                constants.HEURISTIC.POINT_IDS.value not in route:
+            raise ValueError("each route of the heuristic must have a "
+                             + constants.HEURISTIC.VEHICLE_TYPE_ID.value
+                             + " and " + constants.HEURISTIC.POINT_IDS.value)
+        vehicle_type_id = route[constants.HEURISTIC.VEHICLE_TYPE_ID.value]
+        point_ids = route[constants.HEURISTIC.POINT_IDS.value]
+        if not isinstance(vehicle_type_id, int) or \
+                not isinstance(point_ids, list) or \
+                not all(isinstance(point_id, int) for point_id in point_ids):
+            raise ValueError("the ids of the routes of the heuristic must "
+                             "be integers")
+        result.append((vehicle_type_id, point_ids))
+    return (None if value is None else float(value)), result
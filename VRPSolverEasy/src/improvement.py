@@ -0,0 +1,102 @@
+"""This module selects the subproblems of the improvement of a solution,
+each subproblem being a group of nearby routes solved again exactly
+(POPMUSIC), see :py:meth:`Model.improve`"""
+
+from VRPSolverEasy.src import constants
+from VRPSolverEasy.src.arrays import INFINITY
+
+
+def route_point_ids(route):
+    """Return the point ids visited by a route in the solver output"""
+    return [point[constants.ROUTE.POINT_ID.value]
+            for point in route[constants.ROUTE.VISITED_POINTS.value]]
+
+
+def route_distances(arrays, routes):
+    """Return for each route a dictionary giving for the other routes
+    the smallest distance of a link between their customers"""
+    route_of = {}
+    for index, route in enumerate(routes):
+        for point_id in route_point_ids(route):
+            row = arrays.index[point_id]
+            if arrays.id_customer[row] > 0:
+                route_of[row] = index
+    distances = [{} for _ in routes]
+    for i, j, distance in zip(arrays.link_start, arrays.link_end,
+                              arrays.link_distance):
+        a, b = route_of.get(i), route_of.get(j)
+        if a is None or b is None or a == b:
+            continue
+        if distance < distances[a].get(b, INFINITY):
+            distances[a][b] = distance
+            distances[b][a] = distance
+    return distances
+
+
+def select_subproblems(seeds, distances, nb_routes, max_count):
+    """Return at most max_count disjoint subproblems, each one made of a
+    seed route and of its nearest routes (nb_routes routes at most)"""
+    used = set()
+    subproblems = []
+    for seed in seeds:
+        if len(subproblems) == max_count:
+            break
+        if seed in used:
+            continue
+        nearest = sorted((distance, route) for route, distance
+                         in distances[seed].items() if route not in used)
+        subproblem = [seed] + [route for _, route
+                               in nearest[:nb_routes - 1]]
+        used.update(subproblem)
+        subproblems.append(subproblem)
+    return subproblems
+
+
+class ImprovementResult:
+    """Result of :py:meth:`Model.improve`
+
+    Additional informations:
+        - trace contains the pairs (time, value) of the initial solution
+          and of each improvement
+        - subproblems is the number of subproblems solved and
+          improvements the number of them which improved the solution
+    """
+
+    def __init__(self, value, trace, subproblems=0, improvements=0,
+                 time=0.0):
+        self.__value = value
+        self.__trace = trace
+        self.__subproblems = subproblems
+        self.__improvements = improvements
+        self.__time = time
+
+    @property
+    def value(self):
+        """float : value of the improved solution"""
+        return self.__value
+
+    @property
+    def trace(self):
+        """list(tuple) : time and value of each improvement"""
+        return self.__trace
+
+    @property
+    def subproblems(self):
+        """int : number of subproblems solved"""
+        return self.__subproblems
+
+    @property
+    def improvements(self):
+        """int : number of subproblems which improved the solution"""
+        return self.__improvements
+
+    @property
+    def time(self):
+        """float : time of the improvement in seconds"""
+        return self.__time
+
+    def __repr__(self):
+        return repr({"value": self.__value, "time": self.__time,
+                     "subproblems": self.__subproblems,
+                     "improvements": self.__improvements,
+                     "trace": self.__trace})
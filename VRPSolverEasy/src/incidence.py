@@ -0,0 +1,174 @@
+"""This module converts the routes of a solution, for instance all the
+feasible routes enumerated by the solver, into a sparse incidence
+matrix between routes and customers, see :py:class:`RouteIncidence`"""
+
+from array import array
+from itertools import accumulate
+
+from VRPSolverEasy.src import binary, constants
+from VRPSolverEasy.src.arrays import INFINITY, ModelArrays
+
+
+class RouteIncidence:
+    """Incidence matrix between routes and customers in the compressed
+    sparse row (CSR) format, with the cost and the vehicle type of each
+    route.
+
+    Additional informations:
+        - row r gives the customers visited by route r : the columns
+          indices[indptr[r]:indptr[r + 1]] are the id_customer minus 1
+          and data gives the number of visits, as expected by
+          scipy.sparse.csr_matrix((data, indices, indptr))
+        - the distance, time and fixed cost of the links of each route
+          are kept, so that the routes can be repriced with other costs
+          of the vehicle types by :py:meth:`reprice`
+        - the routes are read in one pass over the output of the solver,
+          without building :py:class:`Route` objects
+    """
+
+    def __init__(self, model=None, route_jsons=()):
+        self.indptr = array("q", [0])
+        self.indices = array("q")
+        self.data = array("q")
+        self.costs = array("d")
+        self.vehicle_type_ids = array("q")
+        self.distances = array("d")
+        self.times = array("d")
+        self.link_fixed_costs = array("d")
+        self.point_indptr = array("q", [0])
+        self.point_ids = array("q")
+        self.nb_customers = 0
+        if model is not None:
+            self.__read(model, route_jsons)
+
+    def __read(self, model, route_jsons):
+        """Add the routes given in the format of the solver output"""
+        arrays = ModelArrays(model)
+        self.nb_customers = max(arrays.id_customer, default=0)
+        links = {}
+        for route in route_jsons:
+            vehicle_type_id = route[constants.ROUTE.VEHICLE_TYPE_ID.value]
+            veh = arrays.vehicle_type_index[vehicle_type_id]
+            visits = {}
+            distance = time = fixed_cost = 0.0
+            previous = -1
+            for point in route[constants.ROUTE.VISITED_POINTS.value]:
+                point_id = point[constants.ROUTE.POINT_ID.value]
+                row = arrays.index[point_id]
+                self.point_ids.append(point_id)
+                if arrays.id_customer[row] > 0:
+                    column = arrays.id_customer[row] - 1
+                    visits[column] = visits.get(column, 0) + 1
+                if previous >= 0:
+                    key = (previous, row, veh)
+                    if key not in links:
+                        links[key] = arrays.best_link(previous, row, veh)
+                    link = links[key]
+                    if link >= 0:
+                        distance += arrays.link_distance[link]
+                        time += arrays.link_time[link]
+                        fixed_cost += arrays.link_fixed_cost[link]
+                previous = row
+            self.indices.extend(visits)
+            self.data.extend(visits.values())
+            self.indptr.append(len(self.indices))
+            self.point_indptr.append(len(self.point_ids))
+            self.costs.append(route[constants.ROUTE.ROUTE_COST.value])
+            self.vehicle_type_ids.append(vehicle_type_id)
+            self.distances.append(distance)
+            self.times.append(time)
+            self.link_fixed_costs.append(fixed_cost)
+
+    @property
+    def nb_routes(self):
+        """int : number of routes (rows of the matrix)"""
+        return len(self.costs)
+
+    def customers(self, index):
+        """Return the id_customer of the customers visited by a route"""
+        return [column + 1 for column in
+                self.indices[self.indptr[index]:self.indptr[index + 1]]]
+
+    def route_point_ids(self, index):
+        """Return the point ids visited by a route"""
+        return list(self.point_ids[self.point_indptr[index]:
+                                   self.point_indptr[index + 1]])
+
+    def routes(self):
+        """Return the routes as (vehicle_type_id, point_ids)"""
+        return [(self.vehicle_type_ids[index], self.route_point_ids(index))
+                for index in range(self.nb_routes)]
+
+    def columns(self):
+        """Return for each customer (id_customer minus 1) the list of the
+        routes visiting it, the transposed matrix"""
+        columns = [[] for _ in range(self.nb_customers)]
+        for index in range(self.nb_routes):
+            for column in self.indices[self.indptr[index]:
+                                       self.indptr[index + 1]]:
+                columns[column].append(index)
+        return columns
+
+    def reprice(self, vehicle_types):
+        """Return the costs of the routes for other costs of the vehicle
+        types, given as a dictionary {id : VehicleType} (for instance
+        the vehicle types of a modified model). The cost of a route whose
+        vehicle type is missing is infinite."""
+        costs = array("d")
+        for vehicle_type_id, distance, time, fixed_cost in zip(
+                self.vehicle_type_ids, self.distances, self.times,
+                self.link_fixed_costs):
+            vehicle_type = vehicle_types.get(vehicle_type_id)
+            if vehicle_type is None:
+                costs.append(INFINITY)
+                continue
+            costs.append(vehicle_type.fixed_cost
+                         + vehicle_type.var_cost_dist * distance
+                         + vehicle_type.var_cost_time * time + fixed_cost)
+        return costs
+
+    def export(self, name="routes", compression=""):
+        """Export the matrix in the binary format, it can be compressed
+        with "zlib" or "lzma" """
+        sizes = [end - begin for begin, end
+                 in zip(self.indptr, self.indptr[1:])]
+        point_sizes = [end - begin for begin, end
+                       in zip(self.point_indptr, self.point_indptr[1:])]
+        binary.write(name + binary.EXTENSION,
+                     {"nbCustomers": self.nb_customers}, {
+                         "Routes": [
+                             ("vehicleTypeId", "q", self.vehicle_type_ids),
+                             ("cost", "d", self.costs),
+                             ("distance", "d", self.distances),
+                             ("time", "d", self.times),
+                             ("fixedCost", "d", self.link_fixed_costs),
+                             ("nbCustomers", "q", sizes),
+                             ("nbPoints", "q", point_sizes)],
+                         "Customers": [("column", "q", self.indices),
+                                       ("visits", "q", self.data)],
+                         "Points": [("pointId", "q", self.point_ids)]},
+                     compression)
+
+    @classmethod
+    def load(cls, path):
+        """Load a matrix exported by :py:meth:`export`"""
+        data, tables = binary.read(path)
+        incidence = cls()
+        incidence.nb_customers = data["nbCustomers"]
+        routes = tables["Routes"]
+        incidence.vehicle_type_ids = array("q", routes["vehicleTypeId"])
+        incidence.costs = array("d", routes["cost"])
+        incidence.distances = array("d", routes["distance"])
+        incidence.times = array("d", routes["time"])
+        incidence.link_fixed_costs = array("d", routes["fixedCost"])
+        incidence.indptr.extend(accumulate(routes["nbCustomers"]))
+        incidence.point_indptr.extend(accumulate(routes["nbPoints"]))
+        incidence.indices = array("q", tables["Customers"]["column"])
+        incidence.data = array("q", tables["Customers"]["visits"])
+        incidence.point_ids = array("q", tables["Points"]["pointId"])
+        return incidence
+
+    def __repr__(self):
+        return repr({"routes": self.nb_routes,
+                     "customers": self.nb_customers,
+                     "nonzeros": len(self.indices)})
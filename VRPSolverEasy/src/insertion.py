@@ -0,0 +1,223 @@
+"""This module checks quickly the insertion of a new customer in the
+routes of a solution, see :py:meth:`Solution.insertion_check`"""
+
+from array import array
+
+from VRPSolverEasy.src.arrays import window_end
+
+EPSILON = 1e-6
+
+
+def _arc(model, vehicle_type, start_point_id, end_point_id):
+    """Return the cost and the time of the cheapest link from a location
+    to another one for a vehicle type, None if there is no link"""
+    links = list(model.links.get((start_point_id, end_point_id), ()))
+    links.extend(link for link in model.links.get(
+        (end_point_id, start_point_id), ()) if not link.is_directed)
+    best = None
+    for link in links:
+        cost = (vehicle_type.var_cost_dist * link.distance
+                + vehicle_type.var_cost_time * link.time + link.fixed_cost)
+        if best is None or cost < best[0]:
+            best = (cost, link.time)
+    return best
+
+
+class InsertionCheck:
+    """Cheapest feasible insertion of a new customer in each route of a
+    solution, without solving the model again.
+
+    Additional informations:
+        - the routes are compiled once in columns (location, time, time
+          slack and cost of the next arc of each position), the time
+          slack of a position being the delay its end of service can
+          take without violating the time windows of the next points
+        - the customer to insert can be added to the model, with its
+          links, after the check is built
+        - the loads and times of the routes are those given by the
+          solver, a capacity or a tw_end equal to 0 is not a limit
+    """
+
+    def __init__(self, model, routes):
+        self.__model = model
+        self.__vehicle_types = []
+        self.__loads = array("d")
+        self.__offsets = array("l", [0])
+        self.__point_ids = []
+        self.__locations = []
+        self.__planned = set()
+        self.__times = array("d")
+        self.__slacks = array("d")
+        self.__next_costs = array("d")
+        for route in routes:
+            self.__add_route(route)
+
+    def __add_route(self, route):
+        """Compile the columns of a route"""
+        model = self.__model
+        vehicle_type = model.vehicle_types[route.vehicle_type_id]
+        point_ids = route.point_ids
+        locations = [model.get_location(point_id) for point_id in point_ids]
+        times = list(route.time_consumption)
+        size = len(point_ids)
+        next_costs = [0.0] * size
+        slacks = [0.0] * size
+        for k in range(size - 1, -1, -1):
+            point = model.points[point_ids[k]]
+            slack = window_end(point.tw_end) - times[k]
+            if k == size - 1:
+                slack = min(slack,
+                            window_end(vehicle_type.tw_end) - times[k])
+            else:
+                arc = _arc(model, vehicle_type, locations[k],
+                           locations[k + 1])
+                cost, link_time = arc if arc is not None else (0.0, 0.0)
+                next_costs[k] = cost
+                following = model.points[point_ids[k + 1]]
+                wait = max(times[k + 1] - times[k] - link_time
+                           - following.service_time, 0.0)
+                slack = min(slack, wait + slacks[k + 1])
+            slacks[k] = slack
+        self.__vehicle_types.append(vehicle_type)
+        self.__loads.append(max(route.cap_consumption, default=0))
+        self.__point_ids.extend(point_ids)
+        self.__locations.extend(locations)
+        self.__planned.update(locations)
+        self.__times.extend(times)
+        self.__slacks.extend(slacks)
+        self.__next_costs.extend(next_costs)
+        self.__offsets.append(len(self.__locations))
+
+    @property
+    def nb_routes(self):
+        """int : number of routes checked"""
+        return len(self.__vehicle_types)
+
+    def __links(self, location):
+        """Return the links between a location and the locations of the
+        routes as lists of (other location, distance, time, fixed cost),
+        the incoming ones and the outgoing ones"""
+        links = self.__model.links
+        incoming = []
+        outgoing = []
+        for key in links.incident_keys(location):
+            other = key[1] if key[0] == location else key[0]
+            if other not in self.__planned:
+                continue
+            for link in links[key]:
+                arc = (other, link.distance, link.time, link.fixed_cost)
+                if link.end_point_id == location or not link.is_directed:
+                    incoming.append(arc)
+                if link.start_point_id == location or not link.is_directed:
+                    outgoing.append(arc)
+        return incoming, outgoing
+
+    @staticmethod
+    def __cheapest(links, vehicle_type):
+        """Return the cheapest arcs (cost, time) of a vehicle type indexed
+        by the other location"""
+        var_cost_dist = vehicle_type.var_cost_dist
+        var_cost_time = vehicle_type.var_cost_time
+        arcs = {}
+        for other, distance, link_time, fixed_cost in links:
+            cost = (var_cost_dist * distance + var_cost_time * link_time
+                    + fixed_cost)
+            if other not in arcs or cost < arcs[other][0]:
+                arcs[other] = (cost, link_time)
+        return arcs
+
+    def evaluate(self, point_id):
+        """Return for each route the cheapest feasible insertion of a
+        customer as (cost delta, position), the position being the index
+        of the customer in the point ids of the new route, or None if the
+        customer cannot be inserted in the route"""
+        model = self.__model
+        point = model.points[point_id]
+        location = model.get_location(point_id)
+        tw_begin = point.tw_begin
+        tw_end = window_end(point.tw_end)
+        service_time = point.service_time
+        links = None
+        cache = {}
+        results = []
+        for index, vehicle_type in enumerate(self.__vehicle_types):
+            if vehicle_type.id in point.incompatible_vehicles or \
+                    0 < vehicle_type.capacity < \
+                    self.__loads[index] + point.demand:
+                results.append(None)
+                continue
+            if links is None:
+                links = self.__links(location)
+            if vehicle_type.id not in cache:
+                cache[vehicle_type.id] = (
+                    self.__cheapest(links[0], vehicle_type),
+                    self.__cheapest(links[1], vehicle_type))
+            incoming, outgoing = cache[vehicle_type.id]
+            results.append(self.__evaluate_route(
+                index, vehicle_type, incoming, outgoing, tw_begin, tw_end,
+                service_time))
+        return results
+
+    def __evaluate_route(self, index, vehicle_type, incoming, outgoing,
+                         tw_begin, tw_end, service_time):
+        """Return the cheapest feasible insertion in a route"""
+        begin, end = self.__offsets[index], self.__offsets[index + 1]
+        locations = self.__locations
+        times = self.__times
+        best = None
+        if vehicle_type.start_point_id < 0 and begin < end:
+            # the customer can be the first point of the route
+            arc = outgoing.get(locations[begin])
+            if arc is not None:
+                clock = max(tw_begin, vehicle_type.tw_begin + service_time)
+                best = self.__check(clock, arc, begin, tw_end)
+                if best is not None:
+                    best = (best, 0)
+        last = end - 1 if vehicle_type.end_point_id >= 0 else end
+        for k in range(begin, last):
+            arc = incoming.get(locations[k])
+            if arc is None:
+                continue
+            clock = max(tw_begin, times[k] + arc[1] + service_time)
+            if clock > tw_end + EPSILON:
+                continue
+            cost = arc[0]
+            if k + 1 < end:
+                following = outgoing.get(locations[k + 1])
+                delta = self.__check(clock, following, k + 1, tw_end)
+                if delta is None:
+                    continue
+                cost += delta - self.__next_costs[k]
+            elif clock > window_end(vehicle_type.tw_end) + EPSILON:
+                continue
+            if best is None or cost < best[0] - EPSILON:
+                best = (cost, k + 1 - begin)
+        return best
+
+    def __check(self, clock, arc, k, tw_end):
+        """Return the cost of the arc from the inserted customer to the
+        point of position k if the delay of this point is feasible,
+        None otherwise"""
+        if arc is None or clock > tw_end + EPSILON:
+            return None
+        point = self.__model.points[self.__point_ids[k]]
+        arrival = max(point.tw_begin,
+                      clock + arc[1] + point.service_time)
+        if arrival - self.__times[k] > self.__slacks[k] + EPSILON:
+            return None
+        return arc[0]
+
+    def best(self, point_id):
+        """Return the cheapest feasible insertion of a customer over all
+        routes as (route index, cost delta, position), None if the
+        customer cannot be inserted"""
+        best = None
+        for index, result in enumerate(self.evaluate(point_id)):
+            if result is not None and (best is None
+                                       or result[0] < best[1] - EPSILON):
+                best = (index, result[0], result[1])
+        return best
+
+    def __repr__(self):
+        return repr({"routes": self.nb_routes,
+                     "points": len(self.__locations)})
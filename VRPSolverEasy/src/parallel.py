@@ -0,0 +1,117 @@
+"""This module runs resolutions of models in parallel processes"""
+
+import multiprocessing
+import os
+import queue
+import time
+
+from VRPSolverEasy.src import constants
+
+
+def _run_job(index, function, args, results):
+    """Run a job in a child process and send back its result"""
+    try:
+        results.put((index, function(*args), str()))
+    except Exception as error:
+        results.put((index, None, str(error)))
+
+
+def run_in_processes(function, jobs, max_workers=None, time_limit=None):
+    """Run function(*args) for each args of jobs in separate processes,
+    with at most max_workers processes at the same time.
+
+    Yield (index, result, error) in the order the jobs finish. When the
+    time limit is reached or when the caller stops iterating, the
+    processes still running are killed.
+    """
+    context = multiprocessing.get_context()
+    results = context.Queue()
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    deadline = None
+    if time_limit is not None:
+        deadline = time.perf_counter() + time_limit
+    pending = list(enumerate(jobs))[::-1]
+    running = {}
+    try:
+        while pending or running:
+            while pending and len(running) < max_workers:
+                index, args = pending.pop()
+                process = context.Process(target=_run_job,
+                                          args=(index, function, args,
+                                                results),
+                                          daemon=True)
+                process.start()
+                running[index] = process
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            try:
+                index, result, error = results.get(timeout=0.05)
+            except queue.Empty:
+                for index, process in list(running.items()):
+                    if not process.is_alive() and process.exitcode != 0:
+                        del running[index]
+                        yield index, None, ("process exited with code "
+                                            + str(process.exitcode))
+                continue
+            running.pop(index).join()
+            yield index, result, error
+    finally:
+        for process in running.values():
+            process.terminate()
+        for process in running.values():
+            process.join()
+
+
+def solve_job(model, parameters=None):
+    """Solve a model in a child process, return the elements needed
+    to rebuild its output (status, message, output, upper bound result,
+    resolution time)"""
+    if parameters is not None:
+        model.parameters = parameters
+    begin = time.perf_counter()
+    model.solve()
+    return (model.status, model.message, model.solution.json,
+            model.upper_bound_result, time.perf_counter() - begin)
+
+
+def is_proven(status):
+    """Return True if the status proves the optimality of the solution"""
+    return status in (constants.OPTIMAL_SOL_FOUND,
+                      constants.BETTER_SOL_DOES_NOT_EXISTS)
+
+
+class PortfolioResult:
+    """Result of :py:meth:`Model.solve_portfolio`
+
+    Additional informations:
+        - winner is the index of the winning configuration (-1 if no
+          configuration returned a result)
+        - runs contains for each configuration a dictionary with its
+          status, value, bestLB, time, finished flag and error
+    """
+
+    def __init__(self, configs, runs, winner=-1):
+        self.__configs = configs
+        self.__runs = runs
+        self.__winner = winner
+
+    @property
+    def winner(self):
+        """int : index of the winning configuration"""
+        return self.__winner
+
+    @property
+    def parameters(self):
+        """Parameters : winning configuration (None if there is none)"""
+        if self.__winner < 0:
+            return None
+        return self.__configs[self.__winner]
+
+    @property
+    def runs(self):
+        """list(dict) : results of each configuration"""
+        return self.__runs
+
+    def __repr__(self):
+        return repr({"winner": self.__winner, "runs": self.__runs})
@@ -0,0 +1,128 @@
+"""This module keeps the routes of solved models to reuse them in the
+resolution of related models, see :py:class:`RoutePool`"""
+
+from VRPSolverEasy.src import binary
+from VRPSolverEasy.src.arrays import vehicle_limit
+from VRPSolverEasy.src.evaluation import SolutionEvaluator
+from VRPSolverEasy.src.heuristics import RoutesProvider, UpperBoundProvider
+
+
+def _route_tuples(routes):
+    """Return routes given as a :py:class:`Solution`, a
+    :py:class:`RouteIncidence`, a list of :py:class:`Route` or a list of
+    (vehicle_type_id, point_ids) as a list of (vehicle_type_id, point_ids)"""
+    routes = getattr(routes, "routes", routes)
+    if callable(routes):
+        routes = routes()
+    return [(route.vehicle_type_id, route.point_ids)
+            if hasattr(route, "point_ids") else route for route in routes]
+
+
+class RoutePool(UpperBoundProvider):
+    """Routes of solved models stored by key (for instance the name of
+    an instance), used as upper bound of a related model.
+
+    Additional informations:
+        - the routes of a key are revalidated against the new model (a
+          demand, cost or time window may have changed) and only the
+          feasible ones are kept, with their new costs
+        - the upper bound is built from disjoint feasible routes, the
+          cheapest per customer first, the customers which are not
+          visited are then inserted as in :py:class:`RoutesProvider`
+        - the routes of the solution of a model are added with
+          :py:meth:`add` after its resolution, the enumerated routes of a
+          model can be added the same way
+    """
+
+    name = "pool"
+
+    def __init__(self, key=str(), time_limit=10.0):
+        super().__init__(time_limit)
+        self.key = key  # key of the routes used as upper bound
+        self.__routes = {}
+
+    def add(self, routes, key=None):
+        """Add routes to the pool under a key (the key of the pool by
+        default), the routes already in the pool are ignored"""
+        key = self.key if key is None else key
+        pool = self.__routes.setdefault(key, {})
+        for vehicle_type_id, point_ids in _route_tuples(routes):
+            if point_ids:
+                pool[(vehicle_type_id, tuple(point_ids))] = None
+
+    def keys(self):
+        """Return the keys of the pool"""
+        return list(self.__routes)
+
+    def routes(self, key=None):
+        """Return the routes of a key as (vehicle_type_id, point_ids)"""
+        key = self.key if key is None else key
+        return [(vehicle_type_id, list(point_ids)) for vehicle_type_id,
+                point_ids in self.__routes.get(key, {})]
+
+    def clear(self, key=None):
+        """Remove the routes of a key"""
+        self.__routes.pop(self.key if key is None else key, None)
+
+    def __len__(self):
+        return sum(len(routes) for routes in self.__routes.values())
+
+    def revalidate(self, model, key=None, arrays=None):
+        """Return the routes of a key which are feasible for a model as
+        (cost, vehicle_type_id, point_ids, id_customer of the visited
+        customers)"""
+        evaluator = SolutionEvaluator(model, arrays)
+        feasible = []
+        for vehicle_type_id, point_ids in self.routes(key):
+            cost, groups, violations = evaluator.check_route(
+                vehicle_type_id, point_ids)
+            if not violations and len(set(groups)) == len(groups):
+                feasible.append((cost, vehicle_type_id, point_ids, groups))
+        return feasible
+
+    def compute(self, model, arrays, deadline):
+        feasible = self.revalidate(model, arrays=arrays)
+        feasible.sort(key=lambda route: route[0] / max(len(route[3]), 1))
+        used = [0] * len(arrays.vehicle_type_ids)
+        visited = set()
+        selected = []
+        for _, vehicle_type_id, point_ids, groups in feasible:
+            if len(selected) >= arrays.max_total_vehicles_number:
+                break
+            veh = arrays.vehicle_type_index[vehicle_type_id]
+            if vehicle_limit(arrays.max_number[veh]) <= used[veh] or \
+                    not visited.isdisjoint(groups):
+                continue
+            used[veh] += 1
+            visited.update(groups)
+            selected.append((vehicle_type_id, point_ids))
+        return RoutesProvider(selected).compute(model, arrays, deadline)
+
+    def export(self, name="pool", compression=""):
+        """Export the pool in the binary format, it can be compressed
+        with "zlib" or "lzma" """
+        routes = [(key, vehicle_type_id, point_ids)
+                  for key, pool in self.__routes.items()
+                  for vehicle_type_id, point_ids in pool]
+        binary.write(name + binary.EXTENSION, {"key": self.key}, {
+            "Routes": [("key", "s", [route[0] for route in routes]),
+                       ("vehicleTypeId", "q", [route[1] for route in routes]),
+                       ("pointIds", "l", [route[2] for route in routes])]},
+            compression)
+
+    @classmethod
+    def load(cls, path, time_limit=10.0):
+        """Load a pool exported by :py:meth:`export`"""
+        data, tables = binary.read(path)
+        pool = cls(data["key"], time_limit)
+        columns = tables["Routes"]
+        for key, vehicle_type_id, point_ids in zip(
+                columns["key"], columns["vehicleTypeId"],
+                columns["pointIds"]):
+            pool.add([(vehicle_type_id, point_ids)], key)
+        return pool
+
+    def __repr__(self):
+        return repr({"key": self.key,
+                     "routes": {key: len(routes) for key, routes
+                                in self.__routes.items()}})
@@ -0,0 +1,755 @@
+"""This module reduces the graph of a model before its resolution.
+
+The rules are evaluated column by column on :py:class:`ModelArrays`.
+An arc (i, j) is removed when no feasible route can use it:
+    - incompatibility : no vehicle type is compatible with i and j
+    - capacity : the demands of i and j exceed the largest capacity of the
+      vehicle types compatible with both
+    - time : the end of service at j, when leaving i at the beginning of
+      its time window, is after the end of the time window of j
+A link is also removed when a parallel link is not worse in distance,
+time and fixed cost and can be used in the same directions.
+
+The time windows of the customers can be tightened with the earliest end
+of service reachable from the start depots and the latest end of service
+from which an end depot is still reachable.
+
+The numbers of vehicles can be capped by the numbers of customers the
+vehicle types can serve, a bin packing lower bound on the number of
+vehicles needed is computed at the same time.
+
+Vehicle types with the same characteristics and the same compatible
+points are merged into one type, and a vehicle type is removed when
+another one is not worse on any characteristic and is available in a
+sufficient number.
+
+Finally, the capacity and time resources can be divided by a common
+factor, found as the greatest common divisor of their values or given as
+a granularity, which reduces their ranges in the solver.
+"""
+
+import heapq
+import math
+import time
+from array import array
+
+from VRPSolverEasy.src import constants
+from VRPSolverEasy.src.arrays import INFINITY, vehicle_limit, window_end
+
+# decisions taken for each link
+KEEP = 0
+DROP = 1
+FORWARD = 2
+BACKWARD = 3
+
+INFEASIBLE_ARCS = ("incompatibility", "capacity", "time")
+
+
+class PreprocessingReport:
+    """Result of the preprocessing of a model
+
+    Additional informations:
+        - removed gives for each rule the number of arcs it removed,
+          an arc removed by several rules is counted by the first one
+        - an undirected link with one removed arc is kept as a directed link
+    """
+
+    def __init__(self):
+        self.__removed = {}
+        self.__links_before = 0
+        self.__links_after = 0
+        self.__directed = 0
+        self.__tightened = 0
+        self.__unreachable = []
+        self.__scaling = {"capacity": 1, "time": 1}
+        self.__fleet = {}
+        self.__vehicle_types = {"merged": {}, "dominated": {}}
+        self.__time = 0.0
+
+    def add(self, rule, number):
+        """Count arcs removed by a rule"""
+        self.__removed[rule] = self.__removed.get(rule, 0) + number
+
+    def set_links(self, before, after, directed):
+        """Set the number of links before and after the preprocessing
+        and the number of undirected links which became directed"""
+        self.__links_before = before
+        self.__links_after = after
+        self.__directed = directed
+
+    def set_windows(self, tightened, unreachable):
+        """Set the number of tightened time windows and the ids of the
+        customers which cannot be reached in time"""
+        self.__tightened = tightened
+        self.__unreachable = unreachable
+
+    def set_scaling(self, capacity, time_):
+        """Set the factors dividing the capacity and time resources"""
+        self.__scaling = {"capacity": capacity, "time": time_}
+
+    def set_fleet(self, lower_bound, max_total_vehicles_number, max_number):
+        """Set the lower bound on the number of vehicles and the caps
+        given to the solver"""
+        self.__fleet = {"lowerBound": lower_bound,
+                        "maxTotalVehiclesNumber": max_total_vehicles_number,
+                        "maxNumber": max_number}
+
+    def set_vehicle_types(self, merged, dominated):
+        """Set the vehicle types merged into another one and the vehicle
+        types removed because another one dominates them"""
+        self.__vehicle_types = {"merged": merged, "dominated": dominated}
+
+    def add_time(self, duration):
+        """Add the time spent in a preprocessing pass"""
+        self.__time += duration
+
+    @property
+    def removed(self):
+        """dict : number of arcs removed by each rule"""
+        return self.__removed
+
+    @property
+    def links_before(self):
+        """int : number of links before the preprocessing"""
+        return self.__links_before
+
+    @property
+    def links_after(self):
+        """int : number of links sent to the solver"""
+        return self.__links_after
+
+    @property
+    def directed(self):
+        """int : number of undirected links which became directed"""
+        return self.__directed
+
+    @property
+    def tightened(self):
+        """int : number of customers whose time window was tightened"""
+        return self.__tightened
+
+    @property
+    def unreachable(self):
+        """list(int) : ids of customers which no route can serve in time"""
+        return self.__unreachable
+
+    @property
+    def scaling(self):
+        """dict : factors dividing the capacity and time resources"""
+        return self.__scaling
+
+    @property
+    def fleet(self):
+        """dict : lower bound on the number of vehicles (lowerBound) and
+        caps sent to the solver (maxTotalVehiclesNumber and maxNumber for
+        each vehicle type id)"""
+        return self.__fleet
+
+    @property
+    def vehicle_types(self):
+        """dict : ids of the vehicle types merged into each kept type
+        (merged) and id of the type dominating each removed type
+        (dominated)"""
+        return self.__vehicle_types
+
+    @property
+    def time(self):
+        """float : time spent in the preprocessing"""
+        return self.__time
+
+    def __repr__(self):
+        return repr({"removed": self.__removed,
+                     "linksBefore": self.__links_before,
+                     "linksAfter": self.__links_after,
+                     "directed": self.__directed,
+                     "tightened": self.__tightened,
+                     "unreachable": self.__unreachable,
+                     "scaling": self.__scaling, "fleet": self.__fleet,
+                     "vehicleTypes": self.__vehicle_types,
+                     "time": self.__time})
+
+
+def compatibility_masks(arrays):
+    """Return for each point the bitmask of the rows of the vehicle types
+    compatible with it"""
+    masks = []
+    for incompatible in arrays.incompatible_vehicles:
+        mask = 0
+        for veh, vehicle_type_id in enumerate(arrays.vehicle_type_ids):
+            if vehicle_type_id not in incompatible:
+                mask |= 1 << veh
+        masks.append(mask)
+    return masks
+
+
+def _largest_capacities(arrays, masks):
+    """Return a function giving the largest capacity of the vehicle
+    types of a bitmask (infinite if one of them has no capacity)"""
+    capacities = {}
+
+    def largest(mask):
+        if mask not in capacities:
+            best = 0
+            for veh, capacity in enumerate(arrays.capacity):
+                if mask >> veh & 1:
+                    best = max(best, capacity if capacity > 0 else INFINITY)
+            capacities[mask] = best
+        return capacities[mask]
+    return largest
+
+
+def infeasible_arcs(arrays, report):
+    """Return for each link of arrays the decision KEEP, DROP, FORWARD
+    (keep only the arc from start to end) or BACKWARD (keep only the arc
+    from end to start), count the removed arcs in the report"""
+    begin = time.perf_counter()
+    masks = compatibility_masks(arrays)
+    largest = _largest_capacities(arrays, masks)
+    is_customer = [id_customer > 0 for id_customer in arrays.id_customer]
+    demand = [value if customer else 0
+              for value, customer in zip(arrays.demand, is_customer)]
+    # a route leaves a customer at the earliest at the beginning of its
+    # time window, nothing is assumed for the depots
+    earliest = [tw_begin if customer else -INFINITY
+                for tw_begin, customer in zip(arrays.tw_begin, is_customer)]
+    latest = [window_end(tw_end) if customer else INFINITY
+              for tw_end, customer in zip(arrays.tw_end, is_customer)]
+
+    pair_masks = [masks[i] & masks[j]
+                  for i, j in zip(arrays.link_start, arrays.link_end)]
+    incompatible = [mask == 0 for mask in pair_masks]
+    over_capacity = [demand[i] + demand[j] > largest(mask)
+                     for i, j, mask in zip(arrays.link_start, arrays.link_end,
+                                           pair_masks)]
+    late_forward = [earliest[i] + link_time + arrays.service_time[j]
+                    > latest[j]
+                    for i, j, link_time in zip(arrays.link_start,
+                                               arrays.link_end,
+                                               arrays.link_time)]
+    late_backward = [earliest[j] + link_time + arrays.service_time[i]
+                     > latest[i]
+                     for i, j, link_time in zip(arrays.link_start,
+                                                arrays.link_end,
+                                                arrays.link_time)]
+
+    decisions = array("b", [KEEP]) * len(arrays.link_start)
+    counts = dict.fromkeys(INFEASIBLE_ARCS, 0)
+    for k, directed in enumerate(arrays.link_is_directed):
+        if incompatible[k]:
+            rule = "incompatibility"
+        elif over_capacity[k]:
+            rule = "capacity"
+        else:
+            rule = None
+        if rule is not None:
+            decisions[k] = DROP
+            counts[rule] += 1 if directed else 2
+            continue
+        if directed:
+            if late_forward[k]:
+                decisions[k] = DROP
+                counts["time"] += 1
+        elif late_forward[k] and late_backward[k]:
+            decisions[k] = DROP
+            counts["time"] += 2
+        elif late_forward[k]:
+            decisions[k] = BACKWARD
+            counts["time"] += 1
+        elif late_backward[k]:
+            decisions[k] = FORWARD
+            counts["time"] += 1
+    for rule in INFEASIBLE_ARCS:
+        report.add(rule, counts[rule])
+    report.add_time(time.perf_counter() - begin)
+    return decisions
+
+
+def _covers(first, second, starts, directed):
+    """Return True if the link first can be used in all the directions
+    of the link second"""
+    if not directed[first]:
+        return True
+    return bool(directed[second]) and starts[first] == starts[second]
+
+
+def dominated_links(starts, ends, directed, distance, time_, fixed_cost,
+                    var_cost_dist, var_cost_time, report):
+    """Return for each link True if a parallel link dominates it.
+
+    The links are given as columns, the variable costs are those of the
+    vehicle types. Nothing is removed if a variable cost is negative,
+    since a longer link could then be cheaper.
+    """
+    begin = time.perf_counter()
+    dominated = array("b", [False]) * len(starts)
+    if any(cost < 0 for cost in var_cost_dist) or \
+            any(cost < 0 for cost in var_cost_time):
+        report.add("dominated", 0)
+        return dominated
+    groups = {}
+    for k, (i, j) in enumerate(zip(starts, ends)):
+        groups.setdefault((min(i, j), max(i, j)), []).append(k)
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        for second in group:
+            for first in group:
+                if first == second or \
+                        not _covers(first, second, starts, directed):
+                    continue
+                if distance[first] > distance[second] or \
+                        time_[first] > time_[second] or \
+                        fixed_cost[first] > fixed_cost[second]:
+                    continue
+                equal = (distance[first] == distance[second]
+                         and time_[first] == time_[second]
+                         and fixed_cost[first] == fixed_cost[second])
+                # between two equivalent links the first one is kept
+                if equal and first > second and \
+                        _covers(second, first, starts, directed):
+                    continue
+                dominated[second] = True
+                break
+    report.add("dominated", sum(dominated))
+    report.add_time(time.perf_counter() - begin)
+    return dominated
+
+
+def _shortest_times(arrays):
+    """Return for each point the list of (successor, time of the fastest
+    link) and the list of (predecessor, time of the fastest link)"""
+    fastest = {}
+    for i, j, k in zip(*arrays.arcs()):
+        if (i, j) not in fastest or arrays.link_time[k] < fastest[i, j]:
+            fastest[i, j] = arrays.link_time[k]
+    successors = [[] for _ in range(arrays.nb_points)]
+    predecessors = [[] for _ in range(arrays.nb_points)]
+    for (i, j), link_time in fastest.items():
+        successors[i].append((j, link_time))
+        predecessors[j].append((i, link_time))
+    return successors, predecessors
+
+
+def _earliest(arrays, successors):
+    """Return for each point the earliest end of service of a path
+    coming from a start depot, the elementarity of paths is relaxed"""
+    earliest = [INFINITY] * arrays.nb_points
+    for veh, start in enumerate(arrays.start):
+        if start >= 0:
+            earliest[start] = min(earliest[start],
+                                  max(arrays.vehicle_tw_begin[veh],
+                                      arrays.tw_begin[start]))
+        else:
+            # a route without start point can begin at any point
+            for row in range(arrays.nb_points):
+                earliest[row] = min(earliest[row], max(
+                    arrays.tw_begin[row], arrays.vehicle_tw_begin[veh]
+                    + arrays.service_time[row]))
+    heap = [(clock, row) for row, clock in enumerate(earliest)
+            if clock < INFINITY]
+    heapq.heapify(heap)
+    while heap:
+        clock, i = heapq.heappop(heap)
+        if clock > earliest[i]:
+            continue
+        for j, link_time in successors[i]:
+            arrival = max(arrays.tw_begin[j],
+                          clock + link_time + arrays.service_time[j])
+            if arrival < earliest[j] and \
+                    arrival <= window_end(arrays.tw_end[j]):
+                earliest[j] = arrival
+                heapq.heappush(heap, (arrival, j))
+    return earliest
+
+
+def _latest(arrays, predecessors):
+    """Return for each point the latest end of service from which a path
+    can reach an end depot in time, the elementarity of paths is relaxed"""
+    latest = [-INFINITY] * arrays.nb_points
+    for veh, end in enumerate(arrays.end):
+        deadline = window_end(arrays.vehicle_tw_end[veh])
+        if end >= 0:
+            latest[end] = max(latest[end], min(
+                deadline, window_end(arrays.tw_end[end])))
+        else:
+            # a route without end point can finish at any point
+            for row in range(arrays.nb_points):
+                latest[row] = max(latest[row], min(
+                    deadline, window_end(arrays.tw_end[row])))
+    heap = [(-clock, row) for row, clock in enumerate(latest)
+            if clock > -INFINITY]
+    heapq.heapify(heap)
+    while heap:
+        clock, j = heapq.heappop(heap)
+        clock = -clock
+        if clock < latest[j]:
+            continue
+        for i, link_time in predecessors[j]:
+            departure = min(window_end(arrays.tw_end[i]),
+                            clock - link_time - arrays.service_time[j])
+            if departure > latest[i] and departure >= arrays.tw_begin[i]:
+                latest[i] = departure
+                heapq.heappush(heap, (-departure, i))
+    return latest
+
+
+def tighten_time_windows(arrays, report):
+    """Tighten in arrays the time windows of the customers, return the
+    rows of the customers whose time window changed"""
+    begin = time.perf_counter()
+    successors, predecessors = _shortest_times(arrays)
+    earliest = _earliest(arrays, successors)
+    latest = _latest(arrays, predecessors)
+    changed = []
+    unreachable = []
+    for row in arrays.customer_rows:
+        tw_begin = arrays.tw_begin[row]
+        tw_end = window_end(arrays.tw_end[row])
+        if earliest[row] > min(tw_end, latest[row]):
+            unreachable.append(arrays.point_ids[row])
+            continue
+        new_begin = max(tw_begin, earliest[row])
+        new_end = min(tw_end, latest[row])
+        if new_begin > tw_begin or new_end < tw_end:
+            arrays.tw_begin[row] = new_begin
+            if 0 < new_end < INFINITY:
+                arrays.tw_end[row] = new_end
+            changed.append(row)
+    report.set_windows(len(changed), unreachable)
+    report.add_time(time.perf_counter() - begin)
+    return changed
+
+
+def common_divisor(values):
+    """Return the greatest common divisor of values, 1 if one of them is
+    not an integer"""
+    divisor = 0
+    for value in values:
+        if value != int(value):
+            return 1
+        divisor = math.gcd(divisor, int(value))
+    return divisor or 1
+
+
+def _scale(elements, key, factor, rounding):
+    """Divide the value of key in elements by factor, the values are
+    rounded with rounding and the missing values are left missing"""
+    for element in elements:
+        if element.get(key, 0) != 0:
+            element[key] = rounding(element[key] / factor)
+
+
+def _ceil(value):
+    return int(math.ceil(value - 1e-9))
+
+
+def _floor(value):
+    return int(math.floor(value + 1e-9))
+
+
+def scale_resources(model, capacity_granularity=None,
+                    time_granularity=None, report=None):
+    """Divide in the json dictionary model the capacity resource
+    (demands and capacities) and the time resource (service times, times
+    of links and time windows), return the factors (capacity, time).
+
+    Without granularity the factor of a resource is the greatest common
+    divisor of its values. With a granularity, the values are rounded so
+    that a route feasible after the scaling is feasible before : demands
+    and times are rounded up, capacities and ends of time windows down.
+    The variable costs of time are multiplied by the time factor, so the
+    costs are unchanged when the times are multiples of the factor : a
+    time granularity is not applied when a vehicle type has a variable
+    cost of time, as the rounded times would change the costs.
+    """
+    begin = time.perf_counter()
+    point_key = constants.POINT
+    veh_key = constants.VEHICLE_TYPE
+    points = model[constants.JSON_OBJECT.POINTS.value]
+    vehicle_types = model[constants.JSON_OBJECT.VEHICLE_TYPES.value]
+    links = model[constants.JSON_OBJECT.LINKS.value]
+
+    capacity = capacity_granularity
+    if capacity is None:
+        capacity = common_divisor(
+            [point.get(point_key.DEMAND_OR_CAPACITY.value, 0)
+             for point in points]
+            + [veh.get(veh_key.CAPACITY.value, 0) for veh in vehicle_types])
+    if capacity != 1:
+        _scale([point for point in points
+                if point.get(point_key.ID_CUSTOMER.value, 0) > 0],
+               point_key.DEMAND_OR_CAPACITY.value, capacity, _ceil)
+        _scale([point for point in points
+                if point.get(point_key.ID_CUSTOMER.value, 0) == 0],
+               point_key.DEMAND_OR_CAPACITY.value, capacity, _floor)
+        _scale(vehicle_types, veh_key.CAPACITY.value, capacity, _floor)
+
+    time_ = time_granularity
+    ends = [element.get(point_key.TIME_WINDOWS_END.value, 0)
+            for element in points + vehicle_types]
+    if time_ is None:
+        time_ = common_divisor(
+            [point.get(key.value, 0) for point in points
+             for key in (point_key.SERVICE_TIME,
+                         point_key.TIME_WINDOWS_BEGIN)]
+            + [veh.get(veh_key.TIME_WINDOWS_BEGIN.value, 0)
+               for veh in vehicle_types]
+            + [link.get(constants.LINK.TIME.value, 0) for link in links]
+            + ends)
+    elif any(0 < end < time_ for end in ends):
+        # a time window would end at 0, which means no end
+        time_ = 1
+    elif any(veh.get(veh_key.VAR_COST_TIME.value, 0) != 0
+             for veh in vehicle_types):
+        # the costs of the routes would be computed with rounded times
+        time_ = 1
+    if time_ != 1:
+        for key, rounding in ((point_key.SERVICE_TIME, _ceil),
+                              (point_key.TIME_WINDOWS_BEGIN, _ceil),
+                              (point_key.TIME_WINDOWS_END, _floor)):
+            _scale(points, key.value, time_, rounding)
+        _scale(vehicle_types, veh_key.TIME_WINDOWS_BEGIN.value, time_, _ceil)
+        _scale(vehicle_types, veh_key.TIME_WINDOWS_END.value, time_, _floor)
+        _scale(links, constants.LINK.TIME.value, time_, _ceil)
+        for veh in vehicle_types:
+            if veh.get(veh_key.VAR_COST_TIME.value, 0) != 0:
+                veh[veh_key.VAR_COST_TIME.value] *= time_
+
+    if report is not None:
+        report.set_scaling(capacity, time_)
+        report.add_time(time.perf_counter() - begin)
+    return capacity, time_
+
+
+def unscale_routes(output, capacity, time_):
+    """Give back in original units the loads and times of the routes of
+    a solver output"""
+    solution = output.get("Solution")
+    if not isinstance(solution, dict) or (capacity == 1 and time_ == 1):
+        return
+    for route in solution.get("Routes", []):
+        for point in route[constants.ROUTE.VISITED_POINTS.value]:
+            point[constants.ROUTE.LOAD.value] *= capacity
+            point[constants.ROUTE.TIME.value] *= time_
+
+
+def bin_packing_bound(weights, capacity):
+    """Return the lower bound L2 of Martello and Toth on the number of
+    bins of a capacity needed to pack weights"""
+    weights = sorted(weights, reverse=True)
+    if not weights:
+        return 0
+    best = 0
+    half = capacity / 2
+    for threshold in set([0] + [w for w in weights if w <= half]):
+        large = [w for w in weights if w > capacity - threshold]
+        medium = [w for w in weights if capacity - threshold >= w > half]
+        small = sum(w for w in weights if half >= w >= threshold)
+        free = len(medium) * capacity - sum(medium)
+        bound = len(large) + len(medium) + max(
+            0, math.ceil((small - free) / capacity))
+        best = max(best, bound)
+    return best
+
+
+def fleet_bounds(arrays, report):
+    """Return the caps on the number of vehicles of each vehicle type (a
+    list following the rows of vehicle types, None for no cap) and on the
+    total number of vehicles, never above the numbers of the model. They
+    are set in the report with a lower bound on the number of vehicles
+    needed to serve the mandatory customers.
+
+    A route visits at least one customer, unless a link joins directly the
+    start and the end points of its vehicle type, and visits a customer
+    (or a group of alternatives) at most once, so a vehicle type is capped
+    by the number of groups of compatible customers.
+    """
+    begin = time.perf_counter()
+    groups = {}
+    for row in arrays.customer_rows:
+        groups.setdefault(arrays.id_customer[row], []).append(row)
+    arc_links = arrays.arc_links()
+    caps = []
+    for veh, vehicle_type_id in enumerate(arrays.vehicle_type_ids):
+        start, end = arrays.start[veh], arrays.end[veh]
+        if start < 0 or end < 0 or (start, end) in arc_links:
+            caps.append(None)
+            continue
+        compatible = sum(
+            1 for rows in groups.values()
+            if any(vehicle_type_id not in arrays.incompatible_vehicles[row]
+                   for row in rows))
+        caps.append(min(max(1, compatible),
+                        vehicle_limit(arrays.max_number[veh])))
+    total_cap = None
+    if all(cap is not None for cap in caps):
+        total_cap = min(max(1, len(groups)),
+                        arrays.max_total_vehicles_number)
+
+    # a group without penalty must be served, with at least the smallest
+    # demand of its points
+    weights = [min(arrays.demand[row] for row in rows)
+               for rows in groups.values()
+               if all(arrays.penalty[row] == 0 for row in rows)]
+    capacities = list(arrays.capacity)
+    if not weights:
+        lower_bound = 0
+    elif not capacities or min(capacities) <= 0:
+        lower_bound = 1
+    else:
+        lower_bound = max(1, bin_packing_bound(weights, max(capacities)))
+    report.set_fleet(lower_bound, total_cap, {
+        vehicle_type_id: cap for vehicle_type_id, cap
+        in zip(arrays.vehicle_type_ids, caps) if cap is not None})
+    report.add_time(time.perf_counter() - begin)
+    return caps, total_cap
+
+
+_VEHICLE_TYPE_DEFAULTS = (
+    (constants.VEHICLE_TYPE.START_POINT_ID, -1),
+    (constants.VEHICLE_TYPE.END_POINT_ID, -1),
+    (constants.VEHICLE_TYPE.CAPACITY, 0),
+    (constants.VEHICLE_TYPE.FIXED_COST, 0),
+    (constants.VEHICLE_TYPE.VAR_COST_DIST, 0),
+    (constants.VEHICLE_TYPE.VAR_COST_TIME, 0),
+    (constants.VEHICLE_TYPE.TIME_WINDOWS_BEGIN, 0),
+    (constants.VEHICLE_TYPE.TIME_WINDOWS_END, 0))
+
+
+def _dominates(first, second, first_incompatible, second_incompatible):
+    """Return True if the vehicle type first can make all the routes of
+    the vehicle type second at a cost not greater"""
+    (start, end, capacity, fixed_cost, var_cost_dist, var_cost_time,
+     tw_begin, tw_end) = first
+    (other_start, other_end, other_capacity, other_fixed_cost,
+     other_var_cost_dist, other_var_cost_time, other_tw_begin,
+     other_tw_end) = second
+    return (start == other_start and end == other_end
+            and (capacity if capacity > 0 else INFINITY)
+            >= (other_capacity if other_capacity > 0 else INFINITY)
+            and fixed_cost <= other_fixed_cost
+            and var_cost_dist <= other_var_cost_dist
+            and var_cost_time <= other_var_cost_time
+            and tw_begin <= other_tw_begin
+            and window_end(tw_end) >= window_end(other_tw_end)
+            and first_incompatible <= second_incompatible)
+
+
+def reduce_vehicle_types(model, report=None):
+    """Merge and remove vehicle types in the json dictionary model,
+    return for each kept vehicle type merged with others the list of
+    (original id, max number) to give back the routes to original types.
+
+    Types with the same characteristics and the same incompatible points
+    are merged, their numbers are summed. A type is removed when another
+    type dominates it (same start and end points, capacity and time window
+    at least as large, costs not greater, compatible with all its points)
+    and is available for all the routes a solution can have.
+    """
+    begin = time.perf_counter()
+    veh_key = constants.VEHICLE_TYPE
+    point_key = constants.POINT
+    vehicle_types = model[constants.JSON_OBJECT.VEHICLE_TYPES.value]
+    points = model[constants.JSON_OBJECT.POINTS.value]
+    ids = [veh[veh_key.ID.value] for veh in vehicle_types]
+    incompatible = {veh_id: set() for veh_id in ids}
+    for point in points:
+        for veh_id in point.get(point_key.INCOMPATIBLE_VEHICLES.value, []):
+            if veh_id in incompatible:
+                incompatible[veh_id].add(point[point_key.ID.value])
+    signatures = {veh[veh_key.ID.value]: tuple(
+        veh.get(key.value, default) for key, default in _VEHICLE_TYPE_DEFAULTS)
+                  for veh in vehicle_types}
+    numbers = {veh[veh_key.ID.value]: vehicle_limit(
+        veh.get(veh_key.MAX_NUMBER.value, 0)) for veh in vehicle_types}
+
+    # identical vehicle types
+    removed = set()
+    mapping = {}
+    representatives = {}
+    for veh_id in ids:
+        key = (signatures[veh_id], frozenset(incompatible[veh_id]))
+        if key not in representatives:
+            representatives[key] = veh_id
+            continue
+        kept = representatives[key]
+        mapping.setdefault(kept, [(kept, numbers[kept])]).append(
+            (veh_id, numbers[veh_id]))
+        removed.add(veh_id)
+    for kept, originals in mapping.items():
+        numbers[kept] = sum(number for _, number in originals)
+
+    # dominated vehicle types
+    groups = {point.get(point_key.ID_CUSTOMER.value, 0) for point in points}
+    groups.discard(0)
+    max_total = model.get(constants.JSON_OBJECT.MAXNUMBER.value, 10000)
+    arcs = set()
+    for link in model[constants.JSON_OBJECT.LINKS.value]:
+        start = link[constants.LINK.START_POINT_ID.value]
+        end = link[constants.LINK.END_POINT_ID.value]
+        arcs.add((start, end))
+        if not link.get(constants.LINK.IS_DIRECTED.value, False):
+            arcs.add((end, start))
+    dominated = {}
+    for veh_id in ids:
+        if veh_id in removed:
+            continue
+        for other_id in ids:
+            if other_id == veh_id or other_id in removed:
+                continue
+            start, end = signatures[other_id][:2]
+            # each route visits a customer group, unless it goes directly
+            # from its start point to its end point
+            needed = max_total
+            if start >= 0 and end >= 0 and (start, end) not in arcs:
+                needed = min(max_total, len(groups))
+            if numbers[other_id] >= needed and _dominates(
+                    signatures[other_id], signatures[veh_id],
+                    incompatible[other_id], incompatible[veh_id]):
+                dominated[veh_id] = other_id
+                removed.add(veh_id)
+                break
+    mapping = {kept: originals for kept, originals in mapping.items()
+               if kept not in removed}
+
+    if removed:
+        model[constants.JSON_OBJECT.VEHICLE_TYPES.value] = [
+            veh for veh in vehicle_types if veh[veh_key.ID.value] not in removed]
+        for veh in model[constants.JSON_OBJECT.VEHICLE_TYPES.value]:
+            if veh[veh_key.ID.value] in mapping:
+                number = numbers[veh[veh_key.ID.value]]
+                if number == INFINITY:
+                    veh.pop(veh_key.MAX_NUMBER.value, None)
+                else:
+                    veh[veh_key.MAX_NUMBER.value] = number
+        for point in points:
+            values = point.get(point_key.INCOMPATIBLE_VEHICLES.value)
+            if values and removed.intersection(values):
+                point[point_key.INCOMPATIBLE_VEHICLES.value] = [
+                    veh_id for veh_id in values if veh_id not in removed]
+    if report is not None:
+        report.set_vehicle_types(
+            {kept: [veh_id for veh_id, _ in originals[1:]]
+             for kept, originals in mapping.items()}, dominated)
+        report.add_time(time.perf_counter() - begin)
+    return mapping
+
+
+def restore_vehicle_types(output, mapping):
+    """Give back the routes of a solver output to the original vehicle
+    types merged by :py:func:`reduce_vehicle_types`, each original type
+    receives at most its number of routes"""
+    solution = output.get("Solution")
+    if not isinstance(solution, dict) or not mapping:
+        return
+    remaining = {kept: [list(original) for original in originals]
+                 for kept, originals in mapping.items()}
+    key = constants.ROUTE.VEHICLE_TYPE_ID.value
+    for route in solution.get("Routes", []):
+        originals = remaining.get(route[key])
+        if not originals:
+            continue
+        while originals[0][1] <= 0 and len(originals) > 1:
+            originals.pop(0)
+        route[key] = originals[0][0]
+        originals[0][1] -= 1
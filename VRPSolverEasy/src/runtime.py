@@ -0,0 +1,229 @@
+"""This module predicts the resolution time of a model from cheap features
+of the model and of its parameters, the predictor being fitted on the
+results of previous resolutions, see :py:func:`predict_runtime`"""
+
+import heapq
+import json
+import math
+import os
+import re
+
+FEATURES = ("log_customers", "demand_ratio", "tw_tightness",
+            "vehicle_types")
+CONFIG_FEATURES = ("cplex", "heuristic_used", "upper_bound")
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "runtime_model.json")
+# upper bound of the parameters when none is given
+NO_UPPER_BOUND = 1000000
+# the log files of the results are named
+# problem_instance_solver_upperbound[_heuristic].out
+_RESULT_NAME = re.compile(r"^(?P<problem>[A-Za-z]+)_(?P<instance>.+)_"
+                          r"(?P<solver>CLP|CPLEX)_(?P<upper_bound>yes|no|hgs)"
+                          r"(?:_(?P<heuristic>yes|no))?\.out$")
+
+
+def features(model):
+    """Return the features of a model as a dictionary :
+
+    - log_customers : logarithm of the number of customers
+    - demand_ratio : average demand over average capacity
+    - tw_tightness : 1 minus the average width of the time windows of
+      the customers over the horizon (0 without time windows)
+    - vehicle_types : number of vehicle types
+
+    The instances of the results have one depot and complete graphs, so
+    the number of depots and the density of the links are not features.
+    """
+    points = list(dict.values(model.points))
+    customers = [point for point in points if point.id_customer > 0]
+    vehicle_types = list(dict.values(model.vehicle_types))
+    capacities = [vehicle_type.capacity for vehicle_type in vehicle_types
+                  if vehicle_type.capacity > 0]
+    demand_ratio = 0.0
+    if customers and capacities:
+        demand_ratio = (sum(point.demand for point in customers)
+                        / len(customers)) / (sum(capacities)
+                                             / len(capacities))
+    horizon = max([point.tw_end for point in points]
+                  + [vehicle_type.tw_end for vehicle_type in vehicle_types],
+                  default=0)
+    tw_tightness = 0.0
+    if customers and horizon > 0:
+        widths = [min(point.tw_end if point.tw_end > 0 else horizon,
+                      horizon) - point.tw_begin for point in customers]
+        tw_tightness = 1.0 - sum(max(width, 0.0) for width in widths) \
+            / (len(customers) * horizon)
+    return {"log_customers": math.log(max(len(customers), 1)),
+            "demand_ratio": demand_ratio,
+            "tw_tightness": tw_tightness,
+            "vehicle_types": len(vehicle_types)}
+
+
+def config_features(parameters):
+    """Return the features of the parameters of a resolution"""
+    return {"cplex": float(parameters.solver_name == "CPLEX"),
+            "heuristic_used": float(parameters.heuristic_used),
+            "upper_bound": float(parameters.upper_bound < NO_UPPER_BOUND)}
+
+
+def parse_result(path):
+    """Return the record of a log file of the results (None if the
+    resolution did not finish) : problem, instance, solver name, use of
+    the built-in heuristic, upper bound given, solution value, time,
+    number of branch and bound nodes and status"""
+    match = _RESULT_NAME.match(os.path.basename(path))
+    if match is None:
+        return None
+    with open(path, "r", encoding="UTF-8", errors="replace") as infile:
+        lines = infile.read().splitlines()
+    for index, line in enumerate(lines[:-1]):
+        if line.startswith("instance_name solver_name"):
+            values = lines[index + 1].split()
+            break
+    else:
+        return None
+    return {"problem": match.group("problem"),
+            "instance": match.group("instance"),
+            "solver_name": values[1],
+            # the scripts disable the built-in heuristic for the files
+            # ending with _no
+            "heuristic_used": match.group("heuristic") != "no",
+            "upper_bound": match.group("upper_bound") != "no",
+            "value": float(values[3]),
+            "time": float(values[4]),
+            "nodes": int(values[8]),
+            "status": int(values[9])}
+
+
+def load_results(directory):
+    """Return the records of all log files of a directory"""
+    records = []
+    for name in sorted(os.listdir(directory)):
+        record = parse_result(os.path.join(directory, name))
+        if record is not None:
+            records.append(record)
+    return records
+
+
+def _solve(matrix, vector):
+    """Solve a linear system by Gaussian elimination with partial
+    pivoting"""
+    size = len(vector)
+    rows = [list(row) + [value] for row, value in zip(matrix, vector)]
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda row: abs(rows[row][column]))
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        if rows[column][column] == 0:
+            continue
+        for row in range(column + 1, size):
+            factor = rows[row][column] / rows[column][column]
+            for k in range(column, size + 1):
+                rows[row][k] -= factor * rows[column][k]
+    solution = [0.0] * size
+    for row in range(size - 1, -1, -1):
+        if rows[row][row] == 0:
+            continue
+        solution[row] = (rows[row][size] - sum(
+            rows[row][k] * solution[k] for k in range(row + 1, size))) \
+            / rows[row][row]
+    return solution
+
+
+class RuntimePredictor:
+    """Linear model of the logarithm of the resolution time.
+
+    Additional informations:
+        - the inputs are the features of the model (see :py:func:`features`)
+          and of the parameters (solver, built-in heuristic, upper bound)
+        - it is fitted by least squares with a small ridge penalty on
+          samples (model features, parameter features, time)
+        - the coefficients are saved and loaded in json, the default
+          predictor is fitted on the results of the repository
+    """
+
+    def __init__(self, coefficients=None, ridge=1e-3):
+        self.coefficients = coefficients or {}
+        self.ridge = ridge
+
+    @staticmethod
+    def __inputs(model_features, parameter_features):
+        """Return the vector of inputs of the linear model"""
+        inputs = [1.0]
+        inputs.extend(model_features[name] for name in FEATURES)
+        inputs.extend(parameter_features[name] for name in CONFIG_FEATURES)
+        return inputs
+
+    def fit(self, samples):
+        """Fit the coefficients on samples (model features, parameter
+        features, time in seconds)"""
+        size = 1 + len(FEATURES) + len(CONFIG_FEATURES)
+        matrix = [[0.0] * size for _ in range(size)]
+        vector = [0.0] * size
+        for model_features, parameter_features, time in samples:
+            inputs = self.__inputs(model_features, parameter_features)
+            target = math.log(max(time, 1e-3))
+            for i in range(size):
+                vector[i] += inputs[i] * target
+                for j in range(size):
+                    matrix[i][j] += inputs[i] * inputs[j]
+        for i in range(1, size):
+            matrix[i][i] += self.ridge * len(samples)
+        names = ("intercept",) + FEATURES + CONFIG_FEATURES
+        self.coefficients = dict(zip(names, _solve(matrix, vector)))
+        return self
+
+    def predict(self, model_features, parameter_features):
+        """Return the predicted resolution time in seconds"""
+        names = ("intercept",) + FEATURES + CONFIG_FEATURES
+        inputs = self.__inputs(model_features, parameter_features)
+        return math.exp(sum(self.coefficients.get(name, 0.0) * value
+                            for name, value in zip(names, inputs)))
+
+    def save(self, path=DEFAULT_PATH):
+        """Save the coefficients in a json file"""
+        with open(path, "w") as outfile:
+            json.dump({"coefficients": self.coefficients,
+                       "ridge": self.ridge}, outfile, indent=1)
+            outfile.write("\n")
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        """Load coefficients saved by :py:meth:`save`"""
+        with open(path, "r") as infile:
+            content = json.load(infile)
+        return cls(content["coefficients"], content.get("ridge", 1e-3))
+
+    def __repr__(self):
+        return repr(self.coefficients)
+
+
+_DEFAULT_PREDICTOR = None
+
+
+def predict_runtime(model, parameters=None, predictor=None):
+    """Return the predicted resolution time in seconds of a model with
+    parameters (those of the model by default), at most the time limit.
+    The default predictor is fitted on the results of the repository."""
+    global _DEFAULT_PREDICTOR
+    if predictor is None:
+        if _DEFAULT_PREDICTOR is None:
+            _DEFAULT_PREDICTOR = RuntimePredictor.load()
+        predictor = _DEFAULT_PREDICTOR
+    if parameters is None:
+        parameters = model.parameters
+    return min(predictor.predict(features(model),
+                                 config_features(parameters)),
+               parameters.time_limit)
+
+
+def longest_first(durations, nb_workers):
+    """Return the jobs of each worker when the jobs are given, longest
+    first, to the worker which is free first, and the makespan"""
+    workers = [(0.0, worker) for worker in range(nb_workers)]
+    jobs = [[] for _ in range(nb_workers)]
+    for index in sorted(range(len(durations)),
+                        key=lambda index: -durations[index]):
+        load, worker = heapq.heappop(workers)
+        jobs[worker].append(index)
+        heapq.heappush(workers, (load + durations[index], worker))
+    return jobs, max(load for load, _ in workers)
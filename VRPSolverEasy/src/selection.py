@@ -0,0 +1,183 @@
+"""This module selects the configuration of the solver (solver name, use of
+the built-in heuristic and its time limit) expected to be the fastest for
+a model, from the runs of similar models, see
+:py:meth:`Parameters.auto`"""
+
+import json
+import math
+import os
+
+from VRPSolverEasy.src import runtime
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "selection_model.json")
+
+
+def configuration_name(configuration):
+    """Return a readable name of a configuration (solver_name,
+    heuristic_used, time_limit_heuristic)"""
+    solver_name, heuristic_used, time_limit_heuristic = configuration
+    if not heuristic_used:
+        return solver_name + " without built-in heuristic"
+    return (solver_name + " with built-in heuristic ("
+            + str(time_limit_heuristic) + " s)")
+
+
+def _geometric_mean(times):
+    """Return the geometric mean of positive times"""
+    return math.exp(sum(math.log(max(time, 1e-3)) for time in times)
+                    / len(times))
+
+
+class ConfigurationSelector:
+    """Selection of the configuration of the solver by the nearest
+    neighbours of a model among the models of previous runs.
+
+    Additional informations:
+        - a run is given by the name of its instance, the features of its
+          model (see :py:func:`features`), its configuration (solver_name,
+          heuristic_used, time_limit_heuristic), the presence of an upper
+          bound and its resolution time
+        - the features are standardized and, for each configuration, the
+          time expected for a model is the geometric mean of its times on
+          the k nearest instances solved with it (with an upper bound if
+          the model has one and such runs exist)
+        - the default selector is trained on the results of the
+          repository, runs can be added with :py:meth:`add_run` and the
+          selector saved with :py:meth:`save`
+    """
+
+    def __init__(self, runs=None, k=5):
+        self.runs = runs or {}  # (name, upper bound) : features and times
+        self.k = k
+
+    def add(self, name, features, configuration, upper_bound, time):
+        """Add a run given by the features of its model"""
+        key = (name, bool(upper_bound))
+        entry = self.runs.setdefault(key, {"features": dict(features),
+                                           "times": {}})
+        entry["times"].setdefault(tuple(configuration), []).append(time)
+
+    def add_run(self, model, parameters, time, name=None):
+        """Add a run of a model with parameters which took time seconds,
+        the runs of the same name are grouped as the runs of one
+        instance"""
+        self.add(str(id(model)) if name is None else name,
+                 runtime.features(model),
+                 (parameters.solver_name, parameters.heuristic_used,
+                  parameters.time_limit_heuristic),
+                 parameters.upper_bound < runtime.NO_UPPER_BOUND, time)
+
+    def configurations(self):
+        """Return the configurations of the runs"""
+        return sorted({configuration for entry in self.runs.values()
+                       for configuration in entry["times"]})
+
+    def __scales(self):
+        """Return the mean and the standard deviation of each feature"""
+        scales = {}
+        entries = list(self.runs.values())
+        for name in runtime.FEATURES:
+            values = [entry["features"][name] for entry in entries]
+            mean = sum(values) / len(values)
+            deviation = math.sqrt(sum((value - mean) ** 2
+                                      for value in values) / len(values))
+            scales[name] = (mean, deviation if deviation > 0 else 1.0)
+        return scales
+
+    def expected_times(self, model_features, upper_bound=False,
+                       configurations=None, excluded=()):
+        """Return for each configuration its expected time and the names
+        of the nearest instances used, the instances named in excluded
+        are ignored"""
+        if not self.runs:
+            return {}
+        scales = self.__scales()
+        neighbours = {}
+        for (name, with_bound), entry in self.runs.items():
+            if name in excluded:
+                continue
+            distance = sum(((entry["features"][feature]
+                             - model_features[feature]) / scales[feature][1])
+                           ** 2 for feature in runtime.FEATURES)
+            for configuration, times in entry["times"].items():
+                if configurations is None or configuration in configurations:
+                    neighbours.setdefault(configuration, []).append(
+                        (with_bound != upper_bound, distance, name, times))
+        expected = {}
+        for configuration, candidates in neighbours.items():
+            # the runs with the same use of an upper bound come first
+            nearest = sorted(candidates)[:self.k]
+            expected[configuration] = (
+                _geometric_mean([_geometric_mean(times)
+                                 for _, _, _, times in nearest]),
+                [name for _, _, name, _ in nearest])
+        return expected
+
+    def select(self, model, parameters=None, solver_names=None):
+        """Return the configuration (solver_name, heuristic_used,
+        time_limit_heuristic) expected to be the fastest for a model and
+        the reason of the choice, None if there is no run. The solver
+        names can be restricted, for instance to ("CLP",) when cplex is
+        not available."""
+        if parameters is None:
+            parameters = model.parameters
+        configurations = [configuration for configuration
+                          in self.configurations() if solver_names is None
+                          or configuration[0] in solver_names]
+        expected = self.expected_times(
+            runtime.features(model),
+            parameters.upper_bound < runtime.NO_UPPER_BOUND, configurations)
+        if not expected:
+            return None, "no run to select a configuration"
+        ranking = sorted(expected, key=lambda key: expected[key][0])
+        best = ranking[0]
+        reason = (configuration_name(best) + " is expected to take "
+                  + str(round(expected[best][0], 2)) + " s")
+        if len(ranking) > 1:
+            reason += " against " + ", ".join(
+                str(round(expected[other][0], 2)) + " s for "
+                + configuration_name(other) for other in ranking[1:])
+        reason += (" (geometric mean of the times on the nearest instances "
+                   + ", ".join(expected[best][1]) + ")")
+        return best, reason
+
+    def save(self, path=DEFAULT_PATH):
+        """Save the runs in a json file"""
+        runs = [{"name": name, "upperBound": upper_bound,
+                 "features": entry["features"],
+                 "times": [{"configuration": list(configuration),
+                            "times": times} for configuration, times
+                           in entry["times"].items()]}
+                for (name, upper_bound), entry in self.runs.items()]
+        with open(path, "w") as outfile:
+            json.dump({"k": self.k, "runs": runs}, outfile)
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        """Load runs saved by :py:meth:`save`"""
+        with open(path, "r") as infile:
+            content = json.load(infile)
+        selector = cls(k=content.get("k", 5))
+        for run in content["runs"]:
+            for entry in run["times"]:
+                for time in entry["times"]:
+                    selector.add(run["name"], run["features"],
+                                 entry["configuration"], run["upperBound"],
+                                 time)
+        return selector
+
+    def __repr__(self):
+        return repr({"runs": len(self.runs), "k": self.k,
+                     "configurations": self.configurations()})
+
+
+_DEFAULT_SELECTOR = None
+
+
+def default_selector():
+    """Return the selector trained on the results of the repository"""
+    global _DEFAULT_SELECTOR
+    if _DEFAULT_SELECTOR is None:
+        _DEFAULT_SELECTOR = ConfigurationSelector.load()
+    return _DEFAULT_SELECTOR
@@ -1,11 +1,33 @@
 """This module solves vehicle routing problems using branch&cut&price methods"""
 
+import copy
 import ctypes as _c
+import gc
+import itertools
 import json
+import math
 import platform
 import os
 import sys
-from VRPSolverEasy.src import constants
+import time
+from VRPSolverEasy.src import (batch, binary, constants, decomposition,
+                               improvement, parallel)
+from VRPSolverEasy.src.arrays import ModelArrays
+from VRPSolverEasy.src.compatibility import CompatibilityMatrix
+from VRPSolverEasy.src.evaluation import EvaluationResult, SolutionEvaluator
+from VRPSolverEasy.src.incidence import RouteIncidence
+from VRPSolverEasy.src.insertion import InsertionCheck
+from VRPSolverEasy.src.pool import RoutePool
+from VRPSolverEasy.src.preprocessing import PreprocessingReport
+from VRPSolverEasy.src.runtime import (RuntimePredictor, longest_first,
+                                        predict_runtime)
+from VRPSolverEasy.src.selection import ConfigurationSelector
+from VRPSolverEasy.src import preprocessing, selection
+from VRPSolverEasy.src.heuristics import (UpperBoundProvider,
+                                          SavingsHeuristic,
+                                          ExternalHeuristic,
+                                          RoutesProvider,
+                                          evaluate_routes)
 if sys.version_info > (3, 7):
     import collections.abc as collections
 else:
@@ -87,8 +109,15 @@ class PointsDict(dict,collections.MutableMapping):
     key (int): Id of point
     value: class Customer or Depot
 
+    The number of points and their id_customer are limited to 1022,
+    unless the dictionary is created with large=True.
+
     """
 
+    def __init__(self, *args, large=False, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self.large = large
+
     def __getitem__(self, key):
         return dict.__getitem__(self, key)
 
@@ -99,10 +128,14 @@ class PointsDict(dict,collections.MutableMapping):
             raise PropertyError(str(), constants.POINT_PROPERTY)
         if value.id != key:
             raise PropertyError(str(), constants.DICT_PROPERTY)
-        if dict.__len__(self) + 1 > 1022:
-            raise PropertyError(
-                constants.NB_POINTS_STR,
-                constants.LESS_MAX_POINTS_PROPERTY)
+        if not self.large:
+            if dict.__len__(self) + 1 > constants.MAX_NB_POINTS:
+                raise PropertyError(
+                    constants.NB_POINTS_STR,
+                    constants.LESS_MAX_POINTS_PROPERTY)
+            if value.id_customer > constants.MAX_NB_POINTS:
+                raise PropertyError(constants.POINT.ID_CUSTOMER.value,
+                                    constants.LESS_MAX_POINTS_PROPERTY)
         dict.__setitem__(self, key, value)
 
             
@@ -130,8 +163,21 @@ class LinksDict(dict,collections.MutableMapping):
     key (str): name of link
     value: class Customer or Depot
 
+    The successors and predecessors of each point are indexed, so that
+    the links touching a point are found without scanning all keys.
     """
 
+    def __init__(self, links=None):
+        dict.__init__(self)
+        self.__successors = {}
+        self.__predecessors = {}
+        if links is not None:
+            for key, value in links.items():
+                self[key] = value
+
+    def __reduce__(self):
+        return (self.__class__, (dict(dict.items(self)),))
+
     def __getitem__(self, key):
         return dict.__getitem__(self, key)
 
@@ -142,9 +188,39 @@ class LinksDict(dict,collections.MutableMapping):
             if not isinstance(i,Link):
                 raise PropertyError(str(), 12)
         dict.__setitem__(self, key, value)
+        self.__index(key)
 
     def __delitem__(self, key):
         dict.__delitem__(self, key)
+        self.__unindex(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def pop(self, key, *default):
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = dict.__getitem__(self, key)
+        del self[key]
+        return value
+
+    def popitem(self):
+        key, value = dict.popitem(self)
+        self.__unindex(key)
+        return key, value
+
+    def clear(self):
+        dict.clear(self)
+        self.__successors = {}
+        self.__predecessors = {}
 
     def __iter__(self):
         return dict.__iter__(self)
@@ -155,10 +231,104 @@ class LinksDict(dict,collections.MutableMapping):
     def __contains__(self, x):
         return dict.__contains__(self, x)
 
-    def values(self, debug=False):
+    def __index(self, key):
+        start_point_id, end_point_id = key
+        self.__successors.setdefault(start_point_id, set()).add(end_point_id)
+        self.__predecessors.setdefault(end_point_id,
+                                       set()).add(start_point_id)
+
+    def __unindex(self, key):
+        start_point_id, end_point_id = key
+        self.__successors[start_point_id].discard(end_point_id)
+        self.__predecessors[end_point_id].discard(start_point_id)
+
+    def build_index(self):
+        """Rebuild the index of successors and predecessors, needed only
+        after keys were added by calling the methods of dict on the
+        dictionary (as dict.update(links, ...) when a model is loaded)"""
+        self.__successors = {}
+        self.__predecessors = {}
+        for key in dict.keys(self):
+            self.__index(key)
+
+    def successors(self, point_id):
+        """Return the set of points j such that (point_id, j) is a key"""
+        return set(self.__successors.get(point_id, ()))
+
+    def predecessors(self, point_id):
+        """Return the set of points i such that (i, point_id) is a key"""
+        return set(self.__predecessors.get(point_id, ()))
+
+    def neighbours(self, point_id):
+        """Return the set of points linked to point_id in any direction"""
+        return self.successors(point_id) | self.predecessors(point_id)
+
+    def incident_keys(self, point_id):
+        """Return the keys of all links touching point_id"""
+        keys = [(point_id, end_point_id) for end_point_id
+                in self.__successors.get(point_id, ())]
+        keys.extend((start_point_id, point_id) for start_point_id
+                    in self.__predecessors.get(point_id, ())
+                    if start_point_id != point_id)
+        return keys
+
+    def keys_between(self, point_ids):
+        """Return the keys of the links whose two points are in the set
+        point_ids"""
+        keys = []
+        for start_point_id in point_ids:
+            successors = self.__successors.get(start_point_id, ())
+            if len(successors) > len(point_ids):
+                keys.extend((start_point_id, end_point_id)
+                            for end_point_id in point_ids
+                            if end_point_id in successors)
+            else:
+                keys.extend((start_point_id, end_point_id)
+                            for end_point_id in successors
+                            if end_point_id in point_ids)
+        return keys
+
+    def values(self, debug=False, fold=False):
         if len(dict.values(self)) == 0:
             raise ModelError(constants.MIN_LINKS_ERROR)
-        return list(value.get_link(debug) for list_ in dict.values(self) for value in list_ )
+        if not fold:
+            return list(value.get_link(debug) for list_ in dict.values(self) for value in list_ )
+        return _fold_links(itertools.chain.from_iterable(dict.values(self)),
+                           debug)
+
+
+def _fold_links(links, debug=False):
+    """Get the components of links, each pair of reverse directed links
+    with the same name, distance, time and fixed cost being replaced by
+    one undirected link"""
+    links = list(links)
+    directed = {}
+    for link in links:
+        if link.is_directed:
+            directed.setdefault((link.start_point_id, link.end_point_id),
+                                []).append(link)
+    elements = []
+    folded = set()
+    for link in links:
+        if id(link) in folded:
+            continue
+        element = link.get_link(debug)
+        if link.is_directed and link.start_point_id != link.end_point_id:
+            twin = next((other for other in directed.get(
+                (link.end_point_id, link.start_point_id), ())
+                         if id(other) not in folded
+                         and other.name == link.name
+                         and other.distance == link.distance
+                         and other.time == link.time
+                         and other.fixed_cost == link.fixed_cost), None)
+            if twin is not None:
+                folded.add(id(twin))
+                if debug:
+                    element[constants.LINK.IS_DIRECTED.value] = False
+                else:
+                    del element[constants.LINK.IS_DIRECTED.value]
+        elements.append(element)
+    return elements
 
 
 class VehicleType:
@@ -466,9 +636,6 @@ class Point:
         if id_customer < 0:
             raise PropertyError(constants.POINT.ID_CUSTOMER.value,
                                 constants.GREATER_ZERO_PROPERTY)
-        if id_customer > 1022:
-            raise PropertyError(constants.POINT.ID_CUSTOMER.value,
-                                constants.LESS_MAX_POINTS_PROPERTY)
         self._id_customer = id_customer
 
     @property
@@ -631,7 +798,8 @@ class Customer(Point):
     """Define a point customer of graph.
 
     Additional informations:
-       - id_customer(int): must be inferior or equal to 1022
+       - id_customer(int): must be inferior or equal to 1022 to solve
+         the model directly
        - penalty(float): represents the penalty of non visited customer
        - tw_begin(float): time window begin
        - tw_end(float): time window end
@@ -856,6 +1024,7 @@ class Parameters:
         self.print_level = print_level
         self.action = action
         self.cplex_path = cplex_path
+        self.auto_reason = str()  # reason of the choice of auto
 
     @property
     def time_limit(self):
@@ -1003,6 +1172,35 @@ class Parameters:
                                 constants.STRING_PROPERTY)
         self._cplex_path = cplex_path
 
+    @classmethod
+    def auto(cls, model, selector=None, solver_names=None):
+        """Return a copy of the parameters of a model whose solver_name,
+        heuristic_used and time_limit_heuristic are the configuration
+        expected to be the fastest for this model.
+
+        Additional informations:
+            - the configuration is chosen by a
+              :py:class:`ConfigurationSelector` from the runs of the
+              nearest instances, the default selector is trained on the
+              results of the repository and can be replaced by a selector
+              trained on other runs
+            - solver_names restricts the solvers, it is ("CLP",) by
+              default when no cplex_path is given in the parameters
+            - the reason of the choice is stored in auto_reason, the
+              parameters are unchanged if there is no run
+        """
+        if selector is None:
+            selector = selection.default_selector()
+        parameters = copy.copy(model.parameters)
+        if solver_names is None and parameters.cplex_path == str():
+            solver_names = ("CLP",)
+        configuration, parameters.auto_reason = selector.select(
+            model, parameters, solver_names)
+        if configuration is not None:
+            (parameters.solver_name, parameters.heuristic_used,
+             parameters.time_limit_heuristic) = configuration
+        return parameters
+
     def get_parameters(self, debug=False):
         """Get all parameters which are different of
         default value"""
@@ -1232,21 +1430,319 @@ class Solution:
         """list(Route) : contains the set of routes"""
         return self.__routes
 
-    def export(self, name="instance"):
+    def insertion_check(self, model):
+        """Return an :py:class:`InsertionCheck` of the routes of the
+        solution, giving in a few milliseconds the cheapest feasible
+        insertion of a new customer of the model in each route"""
+        return InsertionCheck(model, self.__routes)
+
+    def route_incidence(self, model):
+        """Return the :py:class:`RouteIncidence` of the routes of the
+        solution, for instance all the feasible routes of the model when
+        it is solved with the action "enumAllFeasibleRoutes" """
+        routes = []
+        if isinstance(self.__json.get("Solution"), dict):
+            routes = self.__json["Solution"].get("Routes", [])
+        return RouteIncidence(model, routes)
+
+    def export(self, name="instance", format="json", compression=""):
         """Export solution for sharing or debugging model,
-        we can specify the name of the file"""
+        we can specify the name of the file.
+        The format is "json" or "binary", a binary file can be
+        compressed with "zlib" or "lzma"."""
+        if format == "binary":
+            binary.write(name + binary.EXTENSION, *self.__get_tables(),
+                         compression)
+            return
         with open(name + ".json", "w") as outfile:
             outfile.write(json.dumps(self.json, indent=1))
 
+    def __get_tables(self):
+        """Split the json of the solution in the data and the columns
+        of the routes for the binary format"""
+        data = dict(self.__json)
+        routes = []
+        if isinstance(data.get("Solution"), dict):
+            data["Solution"] = dict(data["Solution"])
+            routes = data["Solution"].pop("Routes", [])
+        key = constants.ROUTE
+        visited = [point for route in routes
+                   for point in route[key.VISITED_POINTS.value]]
+        return data, {
+            "Routes": [
+                (key.VEHICLE_TYPE_ID.value, "q",
+                 [route[key.VEHICLE_TYPE_ID.value] for route in routes]),
+                (key.ROUTE_COST.value, "d",
+                 [route[key.ROUTE_COST.value] for route in routes]),
+                (key.VISITED_POINTS.value, "q",
+                 [len(route[key.VISITED_POINTS.value]) for route in routes])],
+            key.VISITED_POINTS.value: [
+                (column.value, kind, [point[column.value]
+                                      for point in visited])
+                for column, kind in ((key.POINT_ID, "q"),
+                                     (key.POINT_NAME, "s"),
+                                     (key.LOAD, "d"), (key.TIME, "d"),
+                                     (key.INCOMING_ARC_NAME, "s"))]}
+
+    @classmethod
+    def __from_tables(cls, data, tables):
+        """Build a solution from the content of a binary file"""
+        key = constants.ROUTE
+        columns = tables[key.VISITED_POINTS.value]
+        names = [column.value for column in (
+            key.POINT_ID, key.POINT_NAME, key.LOAD, key.TIME,
+            key.INCOMING_ARC_NAME)]
+        visited = [dict(zip(names, values))
+                   for values in zip(*(columns[name] for name in names))]
+        columns = tables["Routes"]
+        routes = []
+        begin = 0
+        for vehicle_type_id, route_cost, size in zip(
+                columns[key.VEHICLE_TYPE_ID.value],
+                columns[key.ROUTE_COST.value],
+                columns[key.VISITED_POINTS.value]):
+            routes.append({key.VEHICLE_TYPE_ID.value: vehicle_type_id,
+                           key.ROUTE_COST.value: route_cost,
+                           key.VISITED_POINTS.value:
+                           visited[begin:begin + size]})
+            begin += size
+        if isinstance(data.get("Solution"), dict):
+            data["Solution"]["Routes"] = routes
+        status = data.get("Status", {}).get("code",
+                                            constants.MODEL_NOT_SOLVED)
+        return cls(data, status)
+
+    @classmethod
+    def from_json(cls, data):
+        """Build a solution from the json (str or bytes) written by
+        :py:meth:`export`"""
+        content = json.loads(data)
+        status = content.get("Status", {}).get("code",
+                                               constants.MODEL_NOT_SOLVED)
+        return cls(content, status)
+
+    @classmethod
+    def load(cls, path):
+        """Load a solution exported by :py:meth:`export`, in json or in
+        binary format"""
+        if binary.is_binary(path):
+            return cls.__from_tables(*binary.read(path))
+        with open(path, "rb") as infile:
+            return cls.from_json(infile.read())
+
+
+def _validate_column(values, prefix, types, type_code, lower=None,
+                     lower_code=constants.GREATER_ZERO_PROPERTY, upper=None,
+                     upper_code=constants.LESS_MAX_POINTS_PROPERTY):
+    """Check in one pass an attribute of all elements with the rules
+    of its setter"""
+    if not all(map(isinstance, values, itertools.repeat(types))):
+        raise PropertyError(prefix, type_code)
+    if lower is not None and values and min(values) < lower:
+        raise PropertyError(prefix, lower_code)
+    if upper is not None and values and max(values) > upper:
+        raise PropertyError(prefix, upper_code)
+
+
+def _validate_points(points, large=False):
+    """Check all points built without their setters, the limits of 1022
+    points and id_customer do not apply to a large model"""
+    if not large and len(points) > constants.MAX_NB_POINTS:
+        raise PropertyError(constants.NB_POINTS_STR,
+                            constants.LESS_MAX_POINTS_PROPERTY)
+    _validate_column([point._id for point in points],
+                     constants.POINT.ID.value, (int),
+                     constants.INTEGER_PROPERTY, 0,
+                     upper=10000,
+                     upper_code=constants.LESS_MAX_POINTS_ID_PROPERTY)
+    _validate_column([point._name for point in points],
+                     constants.POINT.NAME.value, (str),
+                     constants.STRING_PROPERTY)
+    _validate_column([point._id_customer for point in points],
+                     constants.POINT.ID_CUSTOMER.value, (int),
+                     constants.INTEGER_PROPERTY, 0,
+                     upper=None if large else constants.MAX_NB_POINTS)
+    for prefix, attribute in ((constants.POINT.SERVICE_TIME, "_service_time"),
+                              (constants.POINT.TIME_WINDOWS_BEGIN,
+                               "_tw_begin"),
+                              (constants.POINT.TIME_WINDOWS_END, "_tw_end"),
+                              (constants.POINT.PENALTY_OR_COST,
+                               "penalty_or_cost")):
+        _validate_column([point.__dict__[attribute] for point in points],
+                         prefix.value, (int, float),
+                         constants.NUMBER_PROPERTY)
+    _validate_column([point._demand for point in points],
+                     constants.POINT.DEMAND.value, (int),
+                     constants.INTEGER_PROPERTY, 0)
+    if not all(isinstance(point._incompatible_vehicles, list) and
+               all(isinstance(x, int) for x in point._incompatible_vehicles)
+               for point in points):
+        raise PropertyError(constants.POINT.INCOMPATIBLE_VEHICLES.value,
+                            constants.LIST_INTEGER_PROPERTY)
+
+
+def _validate_vehicle_types(vehicle_types):
+    """Check all vehicle types built without their setters"""
+    _validate_column([veh._id for veh in vehicle_types], constants.ID_STR,
+                     (int), constants.INTEGER_PROPERTY, 1,
+                     constants.GREATER_ONE_PROPERTY)
+    _validate_column([veh._name for veh in vehicle_types],
+                     constants.VEHICLE_TYPE.NAME.value, (str),
+                     constants.STRING_PROPERTY)
+    for prefix, attribute in ((constants.VEHICLE_TYPE.CAPACITY, "_capacity"),
+                              (constants.VEHICLE_TYPE.MAX_NUMBER,
+                               "_max_number")):
+        _validate_column([veh.__dict__[attribute] for veh in vehicle_types],
+                         prefix.value, (int), constants.INTEGER_PROPERTY, 0)
+    for prefix, attribute in ((constants.VEHICLE_TYPE.START_POINT_ID,
+                               "_start_point_id"),
+                              (constants.VEHICLE_TYPE.END_POINT_ID,
+                               "_end_point_id")):
+        _validate_column([veh.__dict__[attribute] for veh in vehicle_types],
+                         prefix.value, (int), constants.INTEGER_PROPERTY, -1)
+    for prefix, attribute in ((constants.VEHICLE_TYPE.FIXED_COST,
+                               "_fixed_cost"),
+                              (constants.VEHICLE_TYPE.VAR_COST_DIST,
+                               "_var_cost_dist"),
+                              (constants.VEHICLE_TYPE.VAR_COST_TIME,
+                               "_var_cost_time"),
+                              (constants.VEHICLE_TYPE.TIME_WINDOWS_BEGIN,
+                               "_tw_begin"),
+                              (constants.VEHICLE_TYPE.TIME_WINDOWS_END,
+                               "_tw_end")):
+        _validate_column([veh.__dict__[attribute] for veh in vehicle_types],
+                         prefix.value, (int, float),
+                         constants.NUMBER_PROPERTY)
+
+
+def _validate_links(links):
+    """Check all links built without their setters"""
+    _validate_column([link._name for link in links],
+                     constants.LINK.NAME.value, (str),
+                     constants.STRING_PROPERTY)
+    _validate_column([link._is_directed for link in links],
+                     constants.LINK.IS_DIRECTED.value, (bool),
+                     constants.BOOLEAN_PROPERTY)
+    for prefix, attribute in ((constants.LINK.START_POINT_ID,
+                               "_start_point_id"),
+                              (constants.LINK.END_POINT_ID,
+                               "_end_point_id")):
+        _validate_column([link.__dict__[attribute] for link in links],
+                         prefix.value, (int), constants.INTEGER_PROPERTY, 0)
+    for prefix, attribute in ((constants.LINK.DISTANCE, "_distance"),
+                              (constants.LINK.TIME, "_time")):
+        _validate_column([link.__dict__[attribute] for link in links],
+                         prefix.value, (int, float),
+                         constants.NUMBER_PROPERTY, 0)
+    _validate_column([link._fixed_cost for link in links],
+                     constants.LINK.FIXED_COST.value, (int, float),
+                     constants.NUMBER_PROPERTY)
+
+
+def _check_size(points):
+    """Check that the solver accepts the number of points and the
+    id_customer of all points"""
+    if len(points) > constants.MAX_NB_POINTS:
+        raise PropertyError(constants.NB_POINTS_STR,
+                            constants.LESS_MAX_POINTS_PROPERTY)
+    if any(point._id_customer > constants.MAX_NB_POINTS
+           for point in dict.values(points)):
+        raise PropertyError(constants.POINT.ID_CUSTOMER.value,
+                            constants.LESS_MAX_POINTS_PROPERTY)
+
+
+def load_bapcod(cplex_path=str()):
+    """Load the shared library bapcod (and cplex if a path is given)"""
+    _lib_bapcod = None
+    _lib_name = None
+    _lib_candidates = []
+
+
+    if platform.system() == constants.WINDOWS_PLATFORM:
+        _lib_name = constants.LIBRARY_WINDOWS
+    elif platform.system() == constants.LINUX_PLATFORM:
+        _lib_name = constants.LIBRARY_LINUX
+    elif platform.system() == constants.MAC_PLATFORM:
+        _lib_name = constants.LIBRARY_MAC
+
+    else:
+        raise ModelError(constants.PLATFORM_ERROR)
+
+    # Load solver
+    if cplex_path != str():
+        try:
+            _c.cdll.LoadLibrary(
+                os.path.realpath(
+                    cplex_path))
+        except BaseException:
+            raise ModelError(constants.BAPCOD_ERROR)
+
+    # Try three different locations to load the native library:
+    # 1. The current folder
+    # 2. The platform folder (lib/Windows for example)
+    # 3. The system folders (delegates the loading behavior to the system)
+
+    _lib_candidates.append(os.path.join(os.path.dirname
+                                        (os.path.realpath(__file__)),
+                                        _lib_name))
+
+    _lib_candidates.append(os.path.join(
+        os.path.join(os.path.realpath(__file__ + "/../../lib/"),
+                     platform.system()), _lib_name))
+
+    _lib_candidates.append(_lib_name)
+
+    _loaded_library = None
+    for candidate in _lib_candidates:
+        try:
+            # Python 3.8 has changed the behavior of CDLL on Windows.
+            if hasattr(os, 'add_dll_directory'):
+                _lib_bapcod = _c.CDLL(candidate, winmode=0)
+            else:
+                _lib_bapcod = _c.CDLL(candidate)
+            _loaded_library = candidate
+            break
+        except BaseException:
+            pass
+
+    if _loaded_library is None:
+        raise ModelError(constants.LOAD_LIB_ERROR)
+    return _lib_bapcod
+
+
+def solve_json(lib_bapcod, model_json):
+    """Solve a model given in json format with the library bapcod
+    and return the output of the solver"""
+    input = _c.c_char_p(model_json.encode('UTF-8'))
+    solve = lib_bapcod.solveModel
+    solve.argtypes = [_c.c_char_p]
+    solve.restype = _c.POINTER(_c.c_char_p)
+    free_memory = lib_bapcod.freeMemory
+    free_memory.argtypes = [_c.POINTER(_c.c_char_p)]
+    free_memory.restype = _c.c_void_p
+
+    output = solve(input)
+    result = json.loads((_c.c_char_p.from_buffer(output)).value)
+    free_memory(output)
+    return result
+
 
 class Model:
-    """Define a routing model."""
+    """Define a routing model.
+
+    Additional informations:
+        - a model has at most 1022 points and id_customer, a model created
+          with large=True has no such limit but is only solved with
+          :py:meth:`solve_decomposition`
+    """
 
-    def __init__(self):
+    def __init__(self, large=False):
         self.__json = {}
         self.vehicle_types = VehicleTypesDict()
-        self.points = PointsDict()
+        self.points = PointsDict(large=large)
         self.__customers = dict()
+        self.__alternatives = dict()
+        self.__locations = dict()
         self.links = LinksDict()
         self.max_total_vehicles_number = 10000
         self.parameters = Parameters()
@@ -1255,6 +1751,22 @@ class Model:
         self.statistics = Statistics()
         self.status = int(constants.MODEL_NOT_SOLVED)
         self.message = constants.ERRORS_MODEL[self.status]
+        self.upper_bound_provider = None
+        self.upper_bound_result = None
+        self.portfolio_result = None
+        self.decomposition_result = None
+        self.improvement_result = None
+        self.__preprocessing = {"infeasible_arcs": False,
+                                "dominated_links": False,
+                                "time_windows": False,
+                                "resource_scaling": False,
+                                "fleet_bounds": False,
+                                "vehicle_types": False}
+        self.__granularities = (None, None)
+        self.__scaling = (1, 1)
+        self.__vehicle_types_mapping = {}
+        self.preprocessing_report = None
+        self.__compatibility = CompatibilityMatrix()
 
     @property
     def vehicle_types(self):
@@ -1288,7 +1800,9 @@ class Model:
             Type:
                 - PointsDict : dictionary contains only points
             Informations:
-                - It's possible to resolve the problem until 1022 points.
+                - It's possible to resolve the problem until 1022 points,
+                  larger models are solved with
+                  :py:meth:`solve_decomposition`
                 - For the moment, the capacity of depot is not considered
         """
         return self._points
@@ -1371,6 +1885,22 @@ class Model:
             raise PropertyError(constants.JSON_OBJECT.PARAMETERS.value, 0)
         self._parameters = parameters
 
+    @property
+    def upper_bound_provider(self):
+        """UpperBoundProvider : heuristic run by :py:meth:`solve` before
+        the exact resolution, its value is given as upper bound
+        (None if no heuristic is used)"""
+        return self._upper_bound_provider
+
+    @upper_bound_provider.setter
+    def upper_bound_provider(self, provider):
+        """setter function of upper_bound_provider"""
+        if provider is not None and \
+                not isinstance(provider, UpperBoundProvider):
+            raise PropertyError(str(),
+                                constants.UPPER_BOUND_PROVIDER_PROPERTY)
+        self._upper_bound_provider = provider
+
     def add_vehicle_type(
             self,
             id: int,
@@ -1444,21 +1974,19 @@ class Model:
             del self.links[(start_point_id,end_point_id)]
 
     def __propagate_penalties(self,id_customer,id,penalty_or_cost=0):
-        """ Updates the penalties of the same cluster of customers """
-        if id_customer not in self.__customers:
-            self.__customers[id_customer] = [id]
-            
-        else:
-            if(penalty_or_cost != 0):
-                for point_id in self.__customers[id_customer]:
+        """ Updates the penalties of the same cluster of customers,
+        each cluster is the dictionary of its point ids """
+        group = self.__customers.setdefault(id_customer, {})
+        if group:
+            if penalty_or_cost != 0:
+                for point_id in group:
                     if point_id in self.points:
                         self.points[point_id].penalty_or_cost = penalty_or_cost
-                self.__customers[id_customer].append(id)
             else:
-                point_id = self.__customers[id_customer][0]
+                point_id = next(iter(group))
                 self.points[id].penalty_or_cost = self.points[point_id].penalty_or_cost
-                self.__customers[id_customer].append(id)
-        
+        group[id] = None
+
     def add_point(
             self,
             id,
@@ -1472,7 +2000,7 @@ class Model:
             incompatible_vehicles=[]):
         """Add Point in dictionary :py:attr:`points`, if we want to add Depot,
            id_customer must be equal to 0, otherwise it cannot be greater
-           than 1022 for a Customer"""
+           than 1022 for a Customer of a model solved directly"""
 
         if id in self.points:
             raise ModelError(constants.ADD_POINT_ERROR)
@@ -1540,13 +2068,124 @@ class Model:
                        incompatible_vehicles=incompatible_vehicles)
 
 
+    def add_alternative(self, id, customer_id, name=str(), tw_begin=0.0,
+                        tw_end=0.0):
+        """Add an alternative of a customer : a point at the same location
+        with its own time window. It has the id_customer, demand, service
+        time, penalty and incompatible vehicles of the customer, at most
+        one point of the group is visited.
+
+        Additional informations:
+            - the alternative shares the links of the customer, they are
+              stored once and repeated for each alternative only when the
+              model is serialized
+            - an alternative of an alternative is an alternative of the
+              same customer
+        """
+        if id in self.points:
+            raise ModelError(constants.ADD_POINT_ERROR)
+        if customer_id not in self.points:
+            raise ModelError(constants.UNKNOWN_POINT_ERROR)
+        location = self.__locations.get(customer_id, customer_id)
+        customer = self.points[location]
+        if customer.id_customer == 0:
+            raise ModelError(constants.ALTERNATIVE_ERROR)
+        self.add_point(id=id, name=name, id_customer=customer.id_customer,
+                       service_time=customer.service_time,
+                       penalty_or_cost=customer.penalty_or_cost,
+                       tw_begin=tw_begin, tw_end=tw_end,
+                       demand=customer.demand,
+                       incompatible_vehicles=list(
+                           customer.incompatible_vehicles))
+        self.__alternatives.setdefault(location, {})[id] = None
+        self.__locations[id] = location
+
+    def get_alternatives(self, id):
+        """Get the ids of the alternatives of a customer"""
+        return list(self.__alternatives.get(self.__locations.get(id, id),
+                                            ()))
+
+    def get_location(self, id):
+        """Get the id of the point whose links are used by a point, the
+        customer of an alternative or the point itself"""
+        return self.__locations.get(id, id)
+
+    def get_links(self):
+        """Get the list of links of the model, the links of a customer
+        being repeated for each of its alternatives"""
+        links = [link for list_ in dict.values(self.links)
+                 for link in list_]
+        if not self.__alternatives:
+            return links
+        expanded = []
+        for link in links:
+            starts = self.__alternatives.get(link.start_point_id, ())
+            ends = self.__alternatives.get(link.end_point_id, ())
+            expanded.append(link)
+            if not starts and not ends:
+                continue
+            for start_point_id in itertools.chain([link.start_point_id],
+                                                  starts):
+                for end_point_id in itertools.chain([link.end_point_id],
+                                                    ends):
+                    if start_point_id == link.start_point_id and \
+                            end_point_id == link.end_point_id:
+                        continue
+                    alternative = copy.copy(link)
+                    alternative._start_point_id = start_point_id
+                    alternative._end_point_id = end_point_id
+                    expanded.append(alternative)
+        return expanded
+
+    def __move_location(self, id):
+        """Give the links and the alternatives of a deleted customer to
+        its first alternative"""
+        alternatives = self.__alternatives.pop(id)
+        location = next(iter(alternatives))
+        del alternatives[location]
+        del self.__locations[location]
+        for alternative in alternatives:
+            self.__locations[alternative] = location
+        if alternatives:
+            self.__alternatives[location] = alternatives
+        for key in self.links.incident_keys(id):
+            links = []
+            # new links are built, the links may be shared with the
+            # models of views or submodels
+            for link in self.links[key]:
+                link = copy.copy(link)
+                if link._start_point_id == id:
+                    link._start_point_id = location
+                if link._end_point_id == id:
+                    link._end_point_id = location
+                links.append(link)
+            del self.links[key]
+            key = tuple(location if point_id == id else point_id
+                        for point_id in key)
+            self.links[key] = self.links.get(key, []) + links
+
     def delete_customer(self, id: int):
-        """ Delete a customer by giving his id """
+        """ Delete a customer by giving his id, with the links
+        touching it. The links of a customer having alternatives
+        are kept for its alternatives. """
         if id not in self.points:
             raise ModelError(constants.DEL_POINT_ERROR)
+        point = self.points[id]
         del self.points[id]
-        if id in self.__customers:
-            del self.__customers[id]
+        if id in self.__alternatives:
+            self.__move_location(id)
+        elif id in self.__locations:
+            location = self.__locations.pop(id)
+            del self.__alternatives[location][id]
+            if not self.__alternatives[location]:
+                del self.__alternatives[location]
+        for key in self.links.incident_keys(id):
+            del self.links[key]
+        group = self.__customers.get(point.id_customer)
+        if group is not None:
+            group.pop(id, None)
+            if not group:
+                del self.__customers[point.id_customer]
 
     def set_parameters(self, time_limit=300, upper_bound=1000000,
                        heuristic_used=False, time_limit_heuristic=20,
@@ -1572,77 +2211,562 @@ class Model:
     def set_max_total_vehicles_number(self, number=10000):
         self.max_total_vehicles_number = number
 
+    def set_upper_bound_provider(self, provider=None):
+        """Set the heuristic run before the exact resolution, for example
+        SavingsHeuristic(time_limit=10) or
+        ExternalHeuristic("./my_heuristic", time_limit=30).
+        The result of the last run is in :py:attr:`upper_bound_result`."""
+        self.upper_bound_provider = provider
+
+    def set_preprocessing(self, infeasible_arcs=False,
+                          dominated_links=False, time_windows=False,
+                          resource_scaling=False, capacity_granularity=None,
+                          time_granularity=None, fleet_bounds=False,
+                          vehicle_types=False):
+        """Set the reductions of the graph made before sending the model
+        to the solver :
+        infeasible_arcs removes the arcs which cannot be used because of
+        incompatibilities, capacities or time windows,
+        dominated_links removes the parallel links which are not better
+        than another one in distance, time and fixed cost,
+        time_windows tightens the time windows of the customers with the
+        earliest and latest times they can be served, and lists the
+        customers which cannot be served in time,
+        resource_scaling divides demands and capacities, and times, by
+        their greatest common divisor or by the given granularity (the
+        loads and times of the routes are given back in original units,
+        the time granularity is ignored when times have a variable cost),
+        fleet_bounds caps the numbers of vehicles by the numbers of
+        customers they can serve and computes a lower bound on the number
+        of vehicles needed,
+        vehicle_types merges the identical vehicle types and removes the
+        dominated ones (the routes are given back to the original types).
+        The model itself is not modified, the results are in
+        :py:attr:`preprocessing_report`."""
+        for name, value in (("infeasible_arcs", infeasible_arcs),
+                            ("dominated_links", dominated_links),
+                            ("time_windows", time_windows),
+                            ("resource_scaling", resource_scaling),
+                            ("fleet_bounds", fleet_bounds),
+                            ("vehicle_types", vehicle_types)):
+            if not isinstance(value, bool):
+                raise PropertyError(name, constants.BOOLEAN_PROPERTY)
+        for name, value in (("capacity_granularity", capacity_granularity),
+                            ("time_granularity", time_granularity)):
+            if value is None:
+                continue
+            if not isinstance(value, (int, float)):
+                raise PropertyError(name, constants.NUMBER_PROPERTY)
+            if value <= 0:
+                raise PropertyError(name, constants.GREATER_ZERO_PROPERTY)
+        self.__preprocessing.update({"infeasible_arcs": infeasible_arcs,
+                                     "dominated_links": dominated_links,
+                                     "time_windows": time_windows,
+                                     "resource_scaling": resource_scaling,
+                                     "fleet_bounds": fleet_bounds,
+                                     "vehicle_types": vehicle_types})
+        self.__granularities = (capacity_granularity, time_granularity)
+
+    def __preprocess(self):
+        """Return the links sent to the solver, without the arcs removed
+        by the preprocessing, and the tightened time windows of points"""
+        links = self.get_links()
+        windows = {}
+        fleet = ({}, None)
+        if not any(self.__preprocessing.values()):
+            self.preprocessing_report = None
+            return links, windows, fleet
+        report = PreprocessingReport()
+        arrays = ModelArrays(self)
+        if self.__preprocessing["fleet_bounds"]:
+            caps, total_cap = preprocessing.fleet_bounds(arrays, report)
+            fleet = ({vehicle_type_id: cap for vehicle_type_id, cap
+                      in zip(arrays.vehicle_type_ids, caps)
+                      if cap is not None}, total_cap)
+        if self.__preprocessing["time_windows"]:
+            for row in preprocessing.tighten_time_windows(arrays, report):
+                point = self.points[arrays.point_ids[row]]
+                windows[point.id] = tuple(
+                    new if new != old else old for new, old in (
+                        (arrays.tw_begin[row], point.tw_begin),
+                        (arrays.tw_end[row], point.tw_end)))
+        decisions = {}
+        if self.__preprocessing["infeasible_arcs"]:
+            graph_links = [link for link in links
+                           if link.start_point_id in self.points
+                           and link.end_point_id in self.points]
+            decisions = {id(link): decision for link, decision in zip(
+                graph_links, preprocessing.infeasible_arcs(arrays, report))}
+        kept = []
+        directed = 0
+        for link in links:
+            decision = decisions.get(id(link), preprocessing.KEEP)
+            if decision == preprocessing.KEEP:
+                kept.append(link)
+            elif decision != preprocessing.DROP:
+                start_point_id, end_point_id = (link.start_point_id,
+                                                link.end_point_id)
+                if decision == preprocessing.BACKWARD:
+                    start_point_id, end_point_id = end_point_id, start_point_id
+                kept.append(Link(start_point_id, end_point_id, link.name, True,
+                                 link.distance, link.time, link.fixed_cost))
+                directed += 1
+        if self.__preprocessing["dominated_links"]:
+            dominated = preprocessing.dominated_links(
+                [link.start_point_id for link in kept],
+                [link.end_point_id for link in kept],
+                [link.is_directed for link in kept],
+                [link.distance for link in kept],
+                [link.time for link in kept],
+                [link.fixed_cost for link in kept],
+                arrays.var_cost_dist, arrays.var_cost_time, report)
+            kept = [link for link, is_dominated in zip(kept, dominated)
+                    if not is_dominated]
+        report.set_links(len(links), len(kept), directed)
+        self.preprocessing_report = report
+        return kept, windows, fleet
 
     def check_depots(self):
-        """Update the model if there are defined intermediate 
-        depots not used by vehicles"""
-
-        depots_ids_defined = set()
-        for id in self.points:
-            if self.points[id].id_customer == 0:
-                depots_ids_defined.add(id) 
-
-        
-        ids_vehicles_types = list(self.vehicle_types.keys())
-        for id_veh in ids_vehicles_types:
-            depots_ids_used = set()
-            depots_ids_used.add(self.vehicle_types[id_veh].start_point_id)
-            depots_ids_used.add(self.vehicle_types[id_veh].end_point_id)
-            depot_not_used = depots_ids_defined.difference(depots_ids_used)
-            for id_depot in depot_not_used:
-                values = self.points[id_depot].incompatible_vehicles + [id_veh]
-                self.points[id_depot].incompatible_vehicles = list(set(values))
-        
-
+        """Update the compatibility of points with vehicle types, the
+        depots are incompatible with the vehicle types which neither
+        start nor end at them. The points of the model are not changed,
+        only the elements changed since the last call are updated."""
+        self.__compatibility.refresh(self.points, self.vehicle_types)
+
+    def get_incompatible_vehicles(self):
+        """Get for each point id the ids of the incompatible vehicle
+        types, including the vehicle types not using a depot"""
+        self.check_depots()
+        return {point_id: self.__compatibility.incompatible_vehicles(
+            point_id) for point_id in self.points}
+
+    def get_model(self, debug=False, fold=False, links=None,
+                  all_elements=False):
+        """Get all elements of the model in a dictionary, the default
+        values are included if debug is True and the reverse directed
+        links which are equal are folded if fold is True.
+        A list of links can be given to replace the links of the model.
+        The depots are given the vehicle types not using them as
+        incompatible vehicles if all_elements is True."""
+        points = list(self.points.values(debug))
+        if all_elements:
+            incompatible_vehicles = self.get_incompatible_vehicles()
+            key = constants.POINT.INCOMPATIBLE_VEHICLES.value
+            for point in points:
+                values = incompatible_vehicles[point[constants.POINT.ID.value]]
+                if values or debug:
+                    point[key] = values
+        if links is None:
+            if not self.__alternatives:
+                links = self.links.values(debug, fold)
+            elif fold:
+                links = _fold_links(self.get_links(), debug)
+            else:
+                links = [link.get_link(debug) for link in self.get_links()]
+        elif fold:
+            links = _fold_links(links, debug)
+        else:
+            links = [link.get_link(debug) for link in links]
+        return {constants.JSON_OBJECT.MAXNUMBER.value:
+                self.max_total_vehicles_number,
+                constants.JSON_OBJECT.POINTS.value:
+                points,
+                constants.JSON_OBJECT.VEHICLE_TYPES.value:
+                list(self.vehicle_types.values(debug)),
+                constants.JSON_OBJECT.LINKS.value:
+                links,
+                constants.JSON_OBJECT.PARAMETERS.value:
+                self.parameters.get_parameters(debug)}
 
     def set_json(self):
         """Set model in json format with all elements of model"""
-        self.__json = json.dumps({constants.JSON_OBJECT.MAXNUMBER.value:
-                                  self.max_total_vehicles_number,
-                                  constants.JSON_OBJECT.POINTS.value:
-                                  list(self.points.values()),
-                                  constants.JSON_OBJECT.
-                                  VEHICLE_TYPES.value:
-                                  list(self.vehicle_types.values()),
-                                  constants.JSON_OBJECT.LINKS.value:
-                                  list(self.links.values()),
-                                  constants.JSON_OBJECT.
-                                  PARAMETERS.value:
-                                  self.parameters.get_parameters()},
-                                 indent=1)
+        links, windows, (max_numbers, max_total) = self.__preprocess()
+        model = self.get_model(fold=True, links=links, all_elements=True)
+        for vehicle_type in model[constants.JSON_OBJECT.VEHICLE_TYPES.value]:
+            if vehicle_type[constants.VEHICLE_TYPE.ID.value] in max_numbers:
+                vehicle_type[constants.VEHICLE_TYPE.MAX_NUMBER.value] = \
+                    max_numbers[vehicle_type[constants.VEHICLE_TYPE.ID.value]]
+        if max_total is not None:
+            model[constants.JSON_OBJECT.MAXNUMBER.value] = max_total
+        for point in model[constants.JSON_OBJECT.POINTS.value]:
+            if point[constants.POINT.ID.value] in windows:
+                (point[constants.POINT.TIME_WINDOWS_BEGIN.value],
+                 point[constants.POINT.TIME_WINDOWS_END.value]) = windows[
+                     point[constants.POINT.ID.value]]
+        self.__vehicle_types_mapping = {}
+        if self.__preprocessing["vehicle_types"]:
+            self.__vehicle_types_mapping = \
+                preprocessing.reduce_vehicle_types(model,
+                                                   self.preprocessing_report)
+        self.__scaling = (1, 1)
+        if self.__preprocessing["resource_scaling"]:
+            self.__scaling = preprocessing.scale_resources(
+                model, *self.__granularities, self.preprocessing_report)
+        result = self.upper_bound_result
+        if result is not None and \
+                result.status == constants.UPPER_BOUND_APPLIED:
+            model[constants.JSON_OBJECT.PARAMETERS.value][
+                constants.PARAMETERS.UPPER_BOUND.value] = result.value
+        self.__json = json.dumps(model, indent=1)
 
     def __str__(self):
-        self.set_json()
-        return self.__json
+        # the model as defined, the preprocessing only runs when solving
+        return json.dumps(self.get_model(fold=True, all_elements=True),
+                          indent=1)
 
     def __repr__(self):
         return self.__str__()
 
-    def export(self, name="instance",all_elements=False):
+    @classmethod
+    def from_json(cls, data, large=False):
+        """Build a model from the json (str or bytes) written by
+        :py:meth:`export`. The elements are created in bulk and
+        validated all at once at the end. A large model has no limit
+        of 1022 points (see :py:class:`Model`)."""
+        # the garbage collector is paused while the elements are created,
+        # it would otherwise scan them again and again
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return cls.__from_content(json.loads(data), large)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    @classmethod
+    def __from_content(cls, content, large):
+        """Build a model from the content of an exported json"""
+        point_key = constants.POINT
+        (point_id, point_name, point_id_customer, point_service_time,
+         point_tw_begin, point_tw_end, point_penalty, point_demand,
+         point_incompatibilities) = (
+             key.value for key in (
+                 point_key.ID, point_key.NAME, point_key.ID_CUSTOMER,
+                 point_key.SERVICE_TIME, point_key.TIME_WINDOWS_BEGIN,
+                 point_key.TIME_WINDOWS_END, point_key.PENALTY_OR_COST,
+                 point_key.DEMAND_OR_CAPACITY,
+                 point_key.INCOMPATIBLE_VEHICLES))
+        points = []
+        for element in content.get(constants.JSON_OBJECT.POINTS.value, []):
+            point = Point.__new__(Point)
+            tw_begin = element.get(point_tw_begin, 0)
+            tw_end = element.get(point_tw_end, 0)
+            point.__dict__ = {
+                "_name": element.get(point_name, str()),
+                "_id_customer": element.get(point_id_customer, 0),
+                "_id": element[point_id],
+                "_service_time": element.get(point_service_time, 0),
+                "_tw_begin": tw_begin,
+                "_tw_end": tw_end,
+                "_time_windows": (tw_begin, tw_end),
+                "penalty_or_cost": element.get(point_penalty, 0),
+                "_demand": element.get(point_demand, 0),
+                "_incompatible_vehicles": element.get(
+                    point_incompatibilities, [])}
+            points.append(point)
+
+        veh_key = constants.VEHICLE_TYPE
+        vehicle_types = []
+        for element in content.get(
+                constants.JSON_OBJECT.VEHICLE_TYPES.value, []):
+            vehicle_type = VehicleType.__new__(VehicleType)
+            vehicle_type.__dict__ = {
+                "_name": element.get(veh_key.NAME.value, str()),
+                "_id": element[veh_key.ID.value],
+                "_capacity": element.get(veh_key.CAPACITY.value, 0),
+                "_fixed_cost": element.get(veh_key.FIXED_COST.value, 0),
+                "_var_cost_dist": element.get(veh_key.VAR_COST_DIST.value,
+                                              0),
+                "_var_cost_time": element.get(veh_key.VAR_COST_TIME.value,
+                                              0),
+                "_max_number": element.get(veh_key.MAX_NUMBER.value, 0),
+                "_start_point_id": element.get(veh_key.START_POINT_ID.value,
+                                               -1),
+                "_end_point_id": element.get(veh_key.END_POINT_ID.value, -1),
+                "_tw_begin": element.get(veh_key.TIME_WINDOWS_BEGIN.value,
+                                         0),
+                "_tw_end": element.get(veh_key.TIME_WINDOWS_END.value, 0)}
+            vehicle_types.append(vehicle_type)
+
+        link_key = constants.LINK
+        (link_name, link_is_directed, link_start, link_end, link_distance,
+         link_time, link_fixed_cost) = (
+             key.value for key in (
+                 link_key.NAME, link_key.IS_DIRECTED,
+                 link_key.START_POINT_ID, link_key.END_POINT_ID,
+                 link_key.DISTANCE, link_key.TIME, link_key.FIXED_COST))
+        new_link = Link.__new__
+        links = []
+        for element in content.get(constants.JSON_OBJECT.LINKS.value, []):
+            get = element.get
+            link = new_link(Link)
+            link.__dict__ = {
+                "_name": get(link_name, str()),
+                "_is_directed": get(link_is_directed, False),
+                "_start_point_id": element[link_start],
+                "_end_point_id": element[link_end],
+                "_distance": get(link_distance, 0),
+                "_time": get(link_time, 0),
+                "_fixed_cost": get(link_fixed_cost, 0)}
+            links.append(link)
+
+        return cls.__from_elements(
+            points, vehicle_types, links,
+            content.get(constants.JSON_OBJECT.MAXNUMBER.value, 10000),
+            content.get(constants.JSON_OBJECT.PARAMETERS.value, {}), large)
+
+    @classmethod
+    def __from_elements(cls, points, vehicle_types, links,
+                        max_total_vehicles_number, parameters, large):
+        """Validate elements built without their setters and gather them
+        in a new model"""
+        _validate_points(points, large)
+        _validate_vehicle_types(vehicle_types)
+        _validate_links(links)
+        model = cls(large)
+        dict.update(model.points, ((point.id, point) for point in points))
+        if len(model.points) != len(points):
+            raise ModelError(constants.ADD_POINT_ERROR)
+        dict.update(model.vehicle_types,
+                    ((veh.id, veh) for veh in vehicle_types))
+        if len(model.vehicle_types) != len(vehicle_types):
+            raise ModelError(constants.ADD_VEHICLE_TYPE_ERROR)
+        grouped_links = {}
+        for link in links:
+            grouped_links.setdefault((link._start_point_id,
+                                      link._end_point_id), []).append(link)
+        dict.update(model.links, grouped_links)
+        model.links.build_index()
+        for point in points:
+            if point.id_customer > 0:
+                model.__customers.setdefault(point.id_customer,
+                                             {})[point.id] = None
+        model.max_total_vehicles_number = max_total_vehicles_number
+
+        param_key = constants.PARAMETERS
+        default = Parameters()
+        model.parameters = Parameters(
+            parameters.get(param_key.TIME_LIMIT.value, default.time_limit),
+            parameters.get(param_key.UPPER_BOUND.value, default.upper_bound),
+            parameters.get(param_key.HEURISTIC_USED.value,
+                           default.heuristic_used),
+            parameters.get(param_key.TIME_LIMIT_HEURISTIC.value,
+                           default.time_limit_heuristic),
+            parameters.get(param_key.CONFIG_FILE.value, default.config_file),
+            parameters.get(param_key.SOLVER_NAME.value, default.solver_name),
+            parameters.get(param_key.PRINT_LEVEL.value, default.print_level),
+            parameters.get(param_key.ACTION.value, default.action),
+            parameters.get(param_key.CPLEX_PATH.value, default.cplex_path))
+        return model
+
+    @classmethod
+    def load(cls, path, large=False):
+        """Load a model exported by :py:meth:`export`, in json or in
+        binary format, a large model has no limit of 1022 points"""
+        if not binary.is_binary(path):
+            with open(path, "rb") as infile:
+                return cls.from_json(infile.read(), large)
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return cls.__from_tables(*binary.read(path), large)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def export(self, name="instance", all_elements=False, format="json",
+               compression=""):
         """Export the model for debugging model,
            we can specify the file name.
            If you put all_elements to True, 
-           it exports the model with preprocessing elements."""
-
-        #add preprocessing elements in model
-        if all_elements:
-            self.check_depots()
-
-        model = json.dumps({constants.JSON_OBJECT.MAXNUMBER.value:
-                            self.max_total_vehicles_number,
-                            constants.JSON_OBJECT.POINTS.
-                            value: list(self.points.values(True)),
-                            constants.JSON_OBJECT.VEHICLE_TYPES.value:
-                           list(self.vehicle_types.values(True)),
-                            constants.JSON_OBJECT.LINKS.value:
-                           list(self.links.values(True)),
-                            constants.JSON_OBJECT.PARAMETERS.value:
-                           self.parameters.get_parameters(True)},
+           it exports the model with preprocessing elements.
+           The format is "json" or "binary", a binary file can be
+           compressed with "zlib" or "lzma"."""
+
+        if format == "binary":
+            binary.write(name + binary.EXTENSION,
+                         {constants.JSON_OBJECT.MAXNUMBER.value:
+                          self.max_total_vehicles_number,
+                          constants.JSON_OBJECT.PARAMETERS.value:
+                          self.parameters.get_parameters(True)},
+                         self.__get_tables(all_elements), compression)
+            return
+        model = json.dumps(self.get_model(True, all_elements=all_elements),
                            indent=1)
         # Writing to sample.json
         with open(name + ".json", "w") as outfile:
             outfile.write(model)
+
+    def __get_tables(self, all_elements=False):
+        """Get the columns of points, vehicle types and links for the
+        binary format"""
+        points = list(dict.values(self.points))
+        if all_elements:
+            incompatible_vehicles = self.get_incompatible_vehicles()
+            incompatible_vehicles = [incompatible_vehicles[p._id]
+                                     for p in points]
+        else:
+            incompatible_vehicles = [p._incompatible_vehicles
+                                     for p in points]
+        vehicle_types = list(dict.values(self.vehicle_types))
+        links = self.get_links()
+        point_key = constants.POINT
+        veh_key = constants.VEHICLE_TYPE
+        link_key = constants.LINK
+        return {
+            constants.JSON_OBJECT.POINTS.value: [
+                (point_key.ID.value, "q", [p._id for p in points]),
+                (point_key.NAME.value, "s", [p._name for p in points]),
+                (point_key.ID_CUSTOMER.value, "q",
+                 [p._id_customer for p in points]),
+                (point_key.SERVICE_TIME.value, "d",
+                 [p._service_time for p in points]),
+                (point_key.TIME_WINDOWS_BEGIN.value, "d",
+                 [p._tw_begin for p in points]),
+                (point_key.TIME_WINDOWS_END.value, "d",
+                 [p._tw_end for p in points]),
+                (point_key.PENALTY_OR_COST.value, "d",
+                 [p.penalty_or_cost for p in points]),
+                (point_key.DEMAND_OR_CAPACITY.value, "q",
+                 [p._demand for p in points]),
+                (point_key.INCOMPATIBLE_VEHICLES.value, "l",
+                 incompatible_vehicles)],
+            constants.JSON_OBJECT.VEHICLE_TYPES.value: [
+                (veh_key.ID.value, "q", [v._id for v in vehicle_types]),
+                (veh_key.START_POINT_ID.value, "q",
+                 [v._start_point_id for v in vehicle_types]),
+                (veh_key.END_POINT_ID.value, "q",
+                 [v._end_point_id for v in vehicle_types]),
+                (veh_key.NAME.value, "s", [v._name for v in vehicle_types]),
+                (veh_key.CAPACITY.value, "q",
+                 [v._capacity for v in vehicle_types]),
+                (veh_key.FIXED_COST.value, "d",
+                 [v._fixed_cost for v in vehicle_types]),
+                (veh_key.VAR_COST_DIST.value, "d",
+                 [v._var_cost_dist for v in vehicle_types]),
+                (veh_key.VAR_COST_TIME.value, "d",
+                 [v._var_cost_time for v in vehicle_types]),
+                (veh_key.MAX_NUMBER.value, "q",
+                 [v._max_number for v in vehicle_types]),
+                (veh_key.TIME_WINDOWS_BEGIN.value, "d",
+                 [v._tw_begin for v in vehicle_types]),
+                (veh_key.TIME_WINDOWS_END.value, "d",
+                 [v._tw_end for v in vehicle_types])],
+            constants.JSON_OBJECT.LINKS.value: [
+                (link_key.START_POINT_ID.value, "q",
+                 [l._start_point_id for l in links]),
+                (link_key.END_POINT_ID.value, "q",
+                 [l._end_point_id for l in links]),
+                (link_key.NAME.value, "s", [l._name for l in links]),
+                (link_key.IS_DIRECTED.value, "b",
+                 [l._is_directed for l in links]),
+                (link_key.DISTANCE.value, "d", [l._distance for l in links]),
+                (link_key.TIME.value, "d", [l._time for l in links]),
+                (link_key.FIXED_COST.value, "d",
+                 [l._fixed_cost for l in links])]}
+
+    @classmethod
+    def __from_tables(cls, data, tables, large):
+        """Build a model from the content of a binary file"""
+        point_key = constants.POINT
+        columns = tables[constants.JSON_OBJECT.POINTS.value]
+        points = []
+        for (id, name, id_customer, service_time, tw_begin, tw_end,
+             penalty_or_cost, demand, incompatible_vehicles) in zip(
+                 *(columns[key.value] for key in (
+                     point_key.ID, point_key.NAME, point_key.ID_CUSTOMER,
+                     point_key.SERVICE_TIME, point_key.TIME_WINDOWS_BEGIN,
+                     point_key.TIME_WINDOWS_END, point_key.PENALTY_OR_COST,
+                     point_key.DEMAND_OR_CAPACITY,
+                     point_key.INCOMPATIBLE_VEHICLES))):
+            point = Point.__new__(Point)
+            point.__dict__ = {
+                "_name": name, "_id_customer": id_customer, "_id": id,
+                "_service_time": service_time, "_tw_begin": tw_begin,
+                "_tw_end": tw_end, "_time_windows": (tw_begin, tw_end),
+                "penalty_or_cost": penalty_or_cost, "_demand": demand,
+                "_incompatible_vehicles": incompatible_vehicles}
+            points.append(point)
+
+        veh_key = constants.VEHICLE_TYPE
+        columns = tables[constants.JSON_OBJECT.VEHICLE_TYPES.value]
+        vehicle_types = []
+        for (id, start_point_id, end_point_id, name, capacity, fixed_cost,
+             var_cost_dist, var_cost_time, max_number, tw_begin,
+             tw_end) in zip(
+                 *(columns[key.value] for key in (
+                     veh_key.ID, veh_key.START_POINT_ID,
+                     veh_key.END_POINT_ID, veh_key.NAME, veh_key.CAPACITY,
+                     veh_key.FIXED_COST, veh_key.VAR_COST_DIST,
+                     veh_key.VAR_COST_TIME, veh_key.MAX_NUMBER,
+                     veh_key.TIME_WINDOWS_BEGIN,
+                     veh_key.TIME_WINDOWS_END))):
+            vehicle_type = VehicleType.__new__(VehicleType)
+            vehicle_type.__dict__ = {
+                "_name": name, "_id": id, "_capacity": capacity,
+                "_fixed_cost": fixed_cost, "_var_cost_dist": var_cost_dist,
+                "_var_cost_time": var_cost_time, "_max_number": max_number,
+                "_start_point_id": start_point_id,
+                "_end_point_id": end_point_id, "_tw_begin": tw_begin,
+                "_tw_end": tw_end}
+            vehicle_types.append(vehicle_type)
+
+        link_key = constants.LINK
+        columns = tables[constants.JSON_OBJECT.LINKS.value]
+        new_link = Link.__new__
+        links = []
+        for (start_point_id, end_point_id, name, is_directed, distance,
+             time_, fixed_cost) in zip(
+                 *(columns[key.value] for key in (
+                     link_key.START_POINT_ID, link_key.END_POINT_ID,
+                     link_key.NAME, link_key.IS_DIRECTED, link_key.DISTANCE,
+                     link_key.TIME, link_key.FIXED_COST))):
+            link = new_link(Link)
+            link.__dict__ = {
+                "_name": name, "_is_directed": is_directed,
+                "_start_point_id": start_point_id,
+                "_end_point_id": end_point_id, "_distance": distance,
+                "_time": time_, "_fixed_cost": fixed_cost}
+            links.append(link)
+
+        return cls.__from_elements(
+            points, vehicle_types, links,
+            data[constants.JSON_OBJECT.MAXNUMBER.value],
+            data[constants.JSON_OBJECT.PARAMETERS.value], large)
    
+    def __read_output(self, output, action):
+        """Update status, message, solution and statistics from the
+        output of the solver"""
+        self.__output = output
+        self.status = self.__output["Status"]["code"]
+        self.message = self.__output["Status"]["message"]
+        self.__keep_heuristic_solution()
+        self.solution = Solution(self.__output,self.status)
+
+        if self.status > -1 and self.status < 4 and \
+                action != "enumAllFeasibleRoutes":
+            self.statistics = Statistics(self.solution.json["Statistics"])
+
+    def scenarios(self):
+        """Return a :py:class:`ScenarioSet` whose scenarios are variants
+        of this model (see :py:meth:`ScenarioSet.add`)"""
+        return ScenarioSet(self)
+
+    def __keep_heuristic_solution(self):
+        """Replace the solution of the output by the routes of the upper
+        bound provider when the solver did not find a better one"""
+        result = self.upper_bound_result
+        if result is None or result.status != constants.UPPER_BOUND_APPLIED \
+                or not result.route_jsons:
+            return
+        if self.status not in (constants.BETTER_SOL_DOES_NOT_EXISTS,
+                               constants.BETTER_SOL_NOT_FOUND):
+            return
+        solution = dict(self.__output.get("Solution", {}))
+        solution["bestSolutionValue"] = result.value
+        solution["Routes"] = result.route_jsons
+        self.__output["Solution"] = solution
+
     def solve(self):
         """
         Solve the routing problem by using the shared library bapcod.
@@ -1651,82 +2775,1081 @@ class Model:
         Additional informations:
             VRPSolverEasy is compatible with Windows 64x,  Linux and macOS only
         """
-        _lib_bapcod = None
-        _lib_name = None
-        _lib_candidates = []
+        _check_size(self.points)
+        _lib_bapcod = load_bapcod(self.parameters.cplex_path)
+        self.upper_bound_result = None
+        if self.upper_bound_provider is not None and \
+                self.parameters.action == "solve":
+            self.upper_bound_result = self.upper_bound_provider.run(self)
+        self.set_json()
+
+        try:
+            output = solve_json(_lib_bapcod, self.__json)
+            preprocessing.unscale_routes(output, *self.__scaling)
+            preprocessing.restore_vehicle_types(output,
+                                                self.__vehicle_types_mapping)
+            self.__read_output(output, self.parameters.action)
+        except BaseException:
+            raise ModelError(constants.BAPCOD_ERROR)
 
+    def solve_portfolio(self, configs, time_limit=None, max_workers=None):
+        """Solve the model with several parameters (list of
+        :py:class:`Parameters`) at the same time in separate processes.
 
-        if platform.system() == constants.WINDOWS_PLATFORM:
-            _lib_name = constants.LIBRARY_WINDOWS
-        elif platform.system() == constants.LINUX_PLATFORM:
-            _lib_name = constants.LIBRARY_LINUX
-        elif platform.system() == constants.MAC_PLATFORM:
-            _lib_name = constants.LIBRARY_MAC
+        Additional informations:
+            - it returns as soon as a configuration proves optimality,
+              otherwise when all configurations are finished or when the
+              time limit is reached
+            - the best result is kept (lowest solution value, then best
+              lower bound) and the other processes are killed
+            - the model is updated with the result of the winner and the
+              returned :py:class:`PortfolioResult` (also stored in
+              :py:attr:`portfolio_result`) reports all configurations
+        """
+        configs = list(configs)
+        if not configs or \
+                not all(isinstance(config, Parameters) for config in configs):
+            raise PropertyError(constants.JSON_OBJECT.PARAMETERS.value, 0)
+        _check_size(self.points)
+        runs = [{"status": None, "value": None, "bestLB": None,
+                 "time": None, "finished": False, "error": str()}
+                for _ in configs]
+        results = {}
+        begin = time.perf_counter()
+        jobs = parallel.run_in_processes(
+            parallel.solve_job, [(self, config) for config in configs],
+            max_workers or len(configs), time_limit)
+        try:
+            for index, result, error in jobs:
+                run = runs[index]
+                run["finished"] = True
+                run["time"] = time.perf_counter() - begin
+                if error != str():
+                    run["error"] = error
+                    continue
+                status, _, output, _, _ = result
+                results[index] = result
+                solution = Solution(output, status)
+                run["status"] = status
+                if solution.is_defined():
+                    run["value"] = solution.value
+                if -1 < status < 4 and "Statistics" in output:
+                    run["bestLB"] = Statistics(output["Statistics"]).best_lb
+                if parallel.is_proven(status):
+                    break
+        finally:
+            jobs.close()
+
+        def rank(index):
+            run = runs[index]
+            return (not parallel.is_proven(run["status"]),
+                    run["value"] is None,
+                    run["value"] if run["value"] is not None else 0,
+                    -run["bestLB"] if run["bestLB"] is not None
+                    else float("inf"))
+
+        winner = min(results, key=rank) if results else -1
+        if winner >= 0:
+            status, _, output, upper_bound_result, _ = results[winner]
+            self.upper_bound_result = upper_bound_result
+            self.__read_output(output, configs[winner].action)
+        self.portfolio_result = parallel.PortfolioResult(configs, runs,
+                                                         winner)
+        return self.portfolio_result
+
+    def __submodel(self, point_ids, depot_ids=()):
+        """Return a model made of the depots, the vehicle types and the
+        given customers, with the links between them. The id_customer
+        are renumbered from 1 so that the solver accepts them.
+        The points of depot_ids become depots."""
+        model = Model()
+        depots = [copy.copy(point) for point in dict.values(self.points)
+                  if point.id_customer == 0]
+        depots.extend(Depot(point_id, self.points[point_id].name)
+                      for point_id in depot_ids)
+        numbers = {}
+        customers = []
+        for point_id in point_ids:
+            if self.points[point_id].id_customer == 0:
+                continue
+            point = copy.copy(self.points[point_id])
+            point._id_customer = numbers.setdefault(point.id_customer,
+                                                    len(numbers) + 1)
+            customers.append(point)
+        dict.update(model.points, ((point.id, point)
+                                   for point in depots + customers))
+        dict.update(model.vehicle_types,
+                    ((vehicle_type_id, copy.copy(vehicle_type))
+                     for vehicle_type_id, vehicle_type
+                     in dict.items(self.vehicle_types)))
+        # the links are copied so that the links added to the model or
+        # changed in it are not changed in the base model
+        dict.update(model.links, ((key, [copy.copy(link) for link
+                                         in dict.__getitem__(self.links,
+                                                             key)])
+                                  for key in self.links.keys_between(
+                                      dict.keys(model.points))))
+        model.links.build_index()
+        for point in customers:
+            model.__customers.setdefault(point.id_customer,
+                                         {})[point.id] = None
+            if point.id in self.__alternatives:
+                model.__alternatives[point.id] = dict(
+                    self.__alternatives[point.id])
+            if point.id in self.__locations:
+                model.__locations[point.id] = self.__locations[point.id]
+        model.max_total_vehicles_number = self.max_total_vehicles_number
+        model.parameters = copy.copy(self.parameters)
+        model.upper_bound_provider = self.upper_bound_provider
+        model.__preprocessing = dict(self.__preprocessing)
+        model.__granularities = self.__granularities
+        return model
+
+    def subset(self, point_ids, depot_ids=()):
+        """Return a :py:class:`ModelView` of the model restricted to the
+        depots and to the given customers with their alternatives.
+        The points of depot_ids are given as depots, without service
+        time and time window, for instance to start vehicles from
+        them."""
+        for point_id in depot_ids:
+            if point_id not in self.points:
+                raise ModelError(constants.UNKNOWN_POINT_ERROR)
+        selected = {}
+        for point_id in point_ids:
+            if point_id not in self.points:
+                raise ModelError(constants.UNKNOWN_POINT_ERROR)
+            selected[point_id] = None
+            selected.update(dict.fromkeys(self.get_alternatives(point_id)))
+            if point_id in self.__locations:
+                selected[self.__locations[point_id]] = None
+        return ModelView(self, tuple(selected), self.__submodel,
+                         tuple(depot_ids))
+
+    def solve_decomposition(self, max_cluster_size=100, time_limit=None,
+                            max_workers=None, coordinates=None):
+        """Solve a large model by partitioning its customers into clusters
+        of at most about max_cluster_size points, each cluster being
+        solved separately in a parallel process with all depots and
+        vehicle types. The routes of the clusters are stitched into the
+        solution of the model.
 
+        Additional informations:
+            - a model of more than 1022 points is created with
+              large=True, see :py:class:`Model`
+            - the clusters are angular around the depots when coordinates
+              {point id : (x, y)} are given, otherwise they are grown
+              from the link distances
+            - time_limit is shared by the clusters, each cluster being
+              given the part of the time of its wave of processes
+            - the vehicles of the vehicle types with a max_number, and
+              the total number of vehicles, are split between the
+              clusters in proportion to their demands, each cluster
+              being given at least one vehicle (there are never more
+              clusters than vehicles)
+            - the returned :py:class:`DecompositionResult` (also stored
+              in :py:attr:`decomposition_result`) reports all clusters
+        """
+        if not isinstance(max_cluster_size, int):
+            raise PropertyError("max_cluster_size",
+                                constants.INTEGER_PROPERTY)
+        if not 0 < max_cluster_size <= constants.MAX_NB_POINTS:
+            raise PropertyError("max_cluster_size",
+                                constants.LESS_MAX_POINTS_PROPERTY)
+        begin = time.perf_counter()
+        arrays = ModelArrays(self)
+        clusters = decomposition.clusters(arrays, max_cluster_size,
+                                          coordinates)
+        submodels = [self.subset(cluster) for cluster in clusters]
+        for view, max_numbers, total in zip(
+                submodels, *decomposition.split_fleet(arrays, clusters)):
+            view.max_numbers = max_numbers
+            view.max_total_vehicles_number = total
+        max_workers = max_workers or os.cpu_count() or 1
+        deadline = None
+        if time_limit is not None:
+            waves = math.ceil(len(clusters) / max_workers)
+            # part of the time is left to start the processes
+            for view in submodels:
+                view.parameters = copy.copy(self.parameters)
+                view.parameters.time_limit = 0.9 * time_limit / waves
+            deadline = time_limit
+        runs = [{"customers": len(cluster), "status": None, "value": None,
+                 "bestLB": None, "nodes": None, "time": None,
+                 "finished": False, "error": str()} for cluster in clusters]
+        outputs = [None] * len(clusters)
+        jobs = parallel.run_in_processes(
+            parallel.solve_job, [(view,) for view in submodels],
+            max_workers, deadline)
+        for index, result, error in jobs:
+            run = runs[index]
+            run["finished"] = True
+            if error != str():
+                run["error"] = error
+                continue
+            status, _, output, _, run["time"] = result
+            run["status"] = status
+            solution = Solution(output, status)
+            if solution.is_defined() or status in (
+                    constants.OPTIMAL_SOL_FOUND, constants.BETTER_SOL_FOUND):
+                run["value"] = solution.value
+                outputs[index] = output
+            if -1 < status < 4 and "Statistics" in output:
+                statistics = Statistics(output["Statistics"])
+                run["bestLB"] = statistics.best_lb
+                run["nodes"] = statistics.nb_branch_and_bound_nodes
+
+        output = decomposition.merge_outputs(outputs)
+        self.statistics = Statistics()
+        if output is not None and decomposition.exceeds_fleet(
+                arrays, output["Solution"]["Routes"]):
+            output = None
+            self.status = constants.INTERRUPTED_BY_ERROR
+            self.message = "the routes of the clusters exceed the fleet"
+            self.solution = Solution()
+        elif output is None:
+            failed = next(run for run in runs if run["value"] is None)
+            self.status = constants.INTERRUPTED_BY_ERROR
+            if failed["status"] is not None:
+                self.status = failed["status"]
+            self.message = failed["error"] or "a cluster has no solution"
+            self.solution = Solution()
         else:
-            raise ModelError(constants.PLATFORM_ERROR)
-
-        # Load solver
-        if self.parameters.cplex_path != str():
-            try:
-                _c.cdll.LoadLibrary(
-                    os.path.realpath(
-                        self.parameters.cplex_path))
-            except BaseException:
-                raise ModelError(constants.BAPCOD_ERROR)
-
-        # Try three different locations to load the native library:
-        # 1. The current folder
-        # 2. The platform folder (lib/Windows for example)
-        # 3. The system folders (delegates the loading behavior to the system)
-
-        _lib_candidates.append(os.path.join(os.path.dirname
-                                            (os.path.realpath(__file__)),
-                                            _lib_name))
-
-        _lib_candidates.append(os.path.join(
-            os.path.join(os.path.realpath(__file__ + "/../../lib/"),
-                         platform.system()), _lib_name))
-
-        _lib_candidates.append(_lib_name)
-
-        _loaded_library = None
-        for candidate in _lib_candidates:
-            try:
-                # Python 3.8 has changed the behavior of CDLL on Windows.
-                if hasattr(os, 'add_dll_directory'):
-                    _lib_bapcod = _c.CDLL(candidate, winmode=0)
-                else:
-                    _lib_bapcod = _c.CDLL(candidate)
-                _loaded_library = candidate
+            self.__output = output
+            self.status = output["Status"]["code"]
+            self.message = output["Status"]["message"]
+            self.solution = Solution(output, self.status)
+        self.decomposition_result = decomposition.DecompositionResult(
+            clusters, runs, None if output is None else self.solution.value,
+            time.perf_counter() - begin)
+        return self.decomposition_result
+
+
+
+    def __improvement_model(self, routes, used, time_limit):
+        """Return the view of a subproblem of :py:meth:`improve` : the
+        customers visited by the routes with the vehicles left by the
+        other routes, the cost of the routes being the upper bound"""
+        point_ids = []
+        for route in routes:
+            for point_id in improvement.route_point_ids(route):
+                id_customer = self.points[point_id].id_customer
+                if id_customer > 0:
+                    point_ids.extend(self.__customers[id_customer])
+        view = self.subset(point_ids)
+        counts = {}
+        for route in routes:
+            vehicle_type_id = route[constants.ROUTE.VEHICLE_TYPE_ID.value]
+            counts[vehicle_type_id] = counts.get(vehicle_type_id, 0) + 1
+        view.max_numbers = {
+            vehicle_type_id: max(vehicle_type.max_number
+                                 - used.get(vehicle_type_id, 0)
+                                 + counts.get(vehicle_type_id, 0), 0)
+            for vehicle_type_id, vehicle_type
+            in dict.items(self.vehicle_types)
+            if vehicle_type.max_number > 0}
+        view.max_total_vehicles_number = max(
+            self.max_total_vehicles_number - sum(used.values())
+            + len(routes), 1)
+        view.upper_bound_provider = None
+        view.parameters = copy.copy(self.parameters)
+        view.parameters.time_limit = time_limit
+        view.parameters.upper_bound = sum(
+            route[constants.ROUTE.ROUTE_COST.value] for route in routes)
+        return view
+
+    def improve(self, solution=None, nb_routes=4, time_limit=60.0,
+                sub_time_limit=5.0, max_workers=None, callback=None):
+        """Improve a solution by solving again groups of nearby routes
+        (POPMUSIC). Each group of routes gives a model made of their
+        customers, solved with the cost of the routes as upper bound,
+        and the routes of a better solution replace them.
+
+        Additional informations:
+            - solution is a :py:class:`Solution` or a list of routes
+              (vehicle_type_id, point_ids), by default the solution of
+              the model
+            - disjoint groups are solved at the same time in parallel
+              processes, each one within sub_time_limit seconds
+            - a route starts a group until it is proven that its group
+              cannot be improved, the routes of an improvement start
+              groups again
+            - callback(time, value) is called after each improvement
+            - the returned :py:class:`ImprovementResult` (also stored in
+              :py:attr:`improvement_result`) reports the trace of the
+              values
+        """
+        begin = time.perf_counter()
+        if solution is None:
+            solution = self.solution
+        arrays = ModelArrays(self)
+        if isinstance(solution, Solution):
+            if not solution.is_defined():
+                raise ModelError(constants.NO_SOLUTION_ERROR)
+            value = solution.value
+            routes = [route for route in solution.json["Solution"]["Routes"]
+                      if route[constants.ROUTE.VISITED_POINTS.value]]
+        else:
+            value, routes = evaluate_routes(arrays, solution)
+        max_workers = max_workers or os.cpu_count() or 1
+        trace = [(0.0, value)]
+        unimproved = list(range(len(routes)))
+        nb_subproblems = 0
+        nb_improvements = 0
+        while unimproved:
+            remaining = time_limit - (time.perf_counter() - begin)
+            if remaining <= 0:
                 break
-            except BaseException:
-                pass
+            used = {}
+            for route in routes:
+                vehicle_type_id = route[constants.ROUTE.VEHICLE_TYPE_ID.value]
+                used[vehicle_type_id] = used.get(vehicle_type_id, 0) + 1
+            subproblems = improvement.select_subproblems(
+                unimproved, improvement.route_distances(arrays, routes),
+                nb_routes, max_workers)
+            models = [self.__improvement_model(
+                [routes[index] for index in subproblem], used,
+                min(sub_time_limit, remaining))
+                for subproblem in subproblems]
+            replaced = {}
+            jobs = parallel.run_in_processes(
+                parallel.solve_job, [(model,) for model in models],
+                max_workers, remaining)
+            for index, result, error in jobs:
+                nb_subproblems += 1
+                subproblem = subproblems[index]
+                if error == str():
+                    status, _, output, _, _ = result
+                    sub_solution = Solution(output, status)
+                    upper_bound = models[index].parameters.upper_bound
+                    if sub_solution.is_defined() and \
+                            sub_solution.value < upper_bound - 1e-6:
+                        replaced[index] = [
+                            route for route in output["Solution"]["Routes"]
+                            if route[constants.ROUTE.VISITED_POINTS.value]]
+                        value += sub_solution.value - upper_bound
+                        nb_improvements += 1
+                        trace.append((time.perf_counter() - begin, value))
+                        if callback is not None:
+                            callback(*trace[-1])
+                        continue
+                unimproved.remove(subproblem[0])
+            if not replaced:
+                continue
+            removed = {route for index in replaced
+                       for route in subproblems[index]}
+            kept = [index for index in range(len(routes))
+                    if index not in removed]
+            positions = {index: row for row, index in enumerate(kept)}
+            unimproved = [positions[index] for index in unimproved
+                          if index not in removed]
+            routes = [routes[index] for index in kept]
+            for new_routes in replaced.values():
+                unimproved.extend(range(len(routes),
+                                        len(routes) + len(new_routes)))
+                routes.extend(new_routes)
+
+        self.__output = {"Status": {"code": constants.BETTER_SOL_FOUND,
+                                    "message": constants.SOLUTION_STATUS[
+                                        constants.BETTER_SOL_FOUND]},
+                         "Solution": {"bestSolutionValue": value,
+                                      "Routes": routes}}
+        self.status = constants.BETTER_SOL_FOUND
+        self.message = constants.SOLUTION_STATUS[self.status]
+        self.solution = Solution(self.__output, self.status)
+        self.statistics = Statistics()
+        self.improvement_result = improvement.ImprovementResult(
+            value, trace, nb_subproblems, nb_improvements,
+            time.perf_counter() - begin)
+        return self.improvement_result
+
+    @classmethod
+    def solve_batch(cls, models, budget, time_limit=10.0, growth=2.0,
+                    max_workers=None, callback=None):
+        """Solve a batch of models (a list or a dictionary {name : model})
+        within a total time budget in seconds by iterative deepening :
+        all models are solved with a short time limit, then the models
+        whose optimality is not proven are solved again with time limits
+        multiplied by growth at each round.
 
-        if _loaded_library is None:
-            raise ModelError(constants.LOAD_LIB_ERROR)
-        self.check_depots()
-        self.set_json()
+        Additional informations:
+            - the budget is the sum of the times of the resolutions, the
+              resolutions of a round run at the same time in at most
+              max_workers processes
+            - a round starts from the best solution value of the model as
+              upper bound, the best solution is kept when the solver
+              only proves that no better solution exists
+            - when the jobs of a round do not fit in the remaining budget,
+              only the first models are solved, the last job being given
+              the remaining budget, and the models not solved yet are
+              given the time limit of the first round before the others
+              are solved again
+            - the jobs of a round are started longest predicted first
+              (see :py:func:`predict_runtime`)
+            - callback(spent, solved, total) is called after each
+              resolution
+            - each model is updated with its best result, the returned
+              :py:class:`BatchResult` reports all models and rounds
+        """
+        if isinstance(models, dict):
+            names, models = list(models.keys()), list(models.values())
+        else:
+            models = list(models)
+            names = list(range(len(models)))
+        if not all(isinstance(model, cls) for model in models):
+            raise PropertyError("models", constants.INVALID_PROPERTY)
+        for name, value in (("budget", budget), ("time_limit", time_limit),
+                            ("growth", growth)):
+            if not isinstance(value, (int, float)):
+                raise PropertyError(name, constants.NUMBER_PROPERTY)
+        if growth <= 1:
+            raise PropertyError("growth", constants.GREATER_THAN_ONE_PROPERTY)
+        for model in models:
+            _check_size(model.points)
+        max_workers = max_workers or os.cpu_count() or 1
+        runs = [{"name": name, "status": None, "value": None,
+                 "bestLB": None, "rounds": 0, "timeLimit": None,
+                 "time": 0.0, "solved": False} for name in names]
+        outputs = [None] * len(models)
+        rounds = []
+        progress = []
+        spent = 0.0
+        unsolved = list(range(len(models)))
+        depth = 0
+        previous_limit = 0.0
+        while unsolved and spent < budget:
+            # the models never solved are first given the time limit of
+            # the first round, then the others are solved again
+            untried = [index for index in unsolved
+                       if runs[index]["rounds"] == 0]
+            if untried:
+                limit, count = batch.round_jobs(0, time_limit, growth,
+                                                budget - spent, len(untried))
+                previous_limit = max(previous_limit, limit)
+                selected = untried[:count]
+            else:
+                depth += 1
+                limit, count = batch.round_jobs(depth, time_limit, growth,
+                                                budget - spent,
+                                                len(unsolved))
+                if limit <= previous_limit:
+                    break
+                previous_limit = limit
+                selected = unsolved[:count]
+            configs = []
+            for index in selected:
+                config = copy.copy(models[index].parameters)
+                # part of the time is left to start the processes
+                config.time_limit = 0.9 * limit
+                if runs[index]["value"] is not None:
+                    config.upper_bound = min(config.upper_bound,
+                                             runs[index]["value"])
+                configs.append(config)
+                runs[index]["rounds"] += 1
+                runs[index]["timeLimit"] = limit
+            # the longest jobs are started first
+            durations = [predict_runtime(models[index], config)
+                         for index, config in zip(selected, configs)]
+            order = sorted(range(count),
+                           key=lambda position: -durations[position])
+            selected = [selected[position] for position in order]
+            configs = [configs[position] for position in order]
+            jobs = parallel.run_in_processes(
+                parallel.solve_job,
+                [(models[index], config)
+                 for index, config in zip(selected, configs)],
+                max_workers, limit * math.ceil(count / max_workers))
+            finished = set()
+            for position, result, error in jobs:
+                index = selected[position]
+                run = runs[index]
+                finished.add(index)
+                if error != str():
+                    run["time"] += limit
+                    spent += limit
+                else:
+                    status, _, output, _, job_time = result
+                    run["time"] += job_time
+                    spent += job_time
+                    run["status"] = status
+                    solution = Solution(output, status)
+                    if solution.is_defined() and (
+                            run["value"] is None
+                            or solution.value < run["value"]):
+                        run["value"] = solution.value
+                        outputs[index] = output
+                    elif parallel.is_proven(status) and \
+                            outputs[index] is not None:
+                        # the previous solution is proven optimal
+                        outputs[index] = dict(outputs[index],
+                                              Status=output["Status"])
+                    elif outputs[index] is None:
+                        outputs[index] = output
+                    if -1 < status < 4 and "Statistics" in output:
+                        run["bestLB"] = Statistics(
+                            output["Statistics"]).best_lb
+                    run["solved"] = parallel.is_proven(status)
+                solved = sum(run["solved"] for run in runs)
+                progress.append((spent, solved))
+                if callback is not None:
+                    callback(spent, solved, len(models))
+            # the jobs killed at the deadline used their time limit
+            spent += limit * len(set(selected) - finished)
+            for index in set(selected) - finished:
+                runs[index]["time"] += limit
+            unsolved = [index for index in unsolved
+                        if not runs[index]["solved"]]
+            rounds.append({"timeLimit": limit, "jobs": len(configs),
+                           "solved": len(models) - len(unsolved)})
+
+        for model, output in zip(models, outputs):
+            if output is not None:
+                model.__read_output(output, model.parameters.action)
+        return batch.BatchResult(runs, rounds, progress, budget, spent)
+
+
+
+class ModelView:
+    """Model restricted to the depots and to some customers, created by
+    :py:meth:`Model.subset`.
 
-        input = _c.c_char_p(self.__json.encode('UTF-8'))
-        solve = _lib_bapcod.solveModel
-        solve.argtypes = [_c.c_char_p]
-        solve.restype = _c.POINTER(_c.c_char_p)
-        free_memory = _lib_bapcod.freeMemory
-        free_memory.argtypes = [_c.POINTER(_c.c_char_p)]
-        free_memory.restype = _c.c_void_p
+    Additional informations:
+        - the view only keeps the ids of its points, the points, vehicle
+          types and links are those of the base model, a model is built
+          from them when the view is solved or serialized
+        - parameters, max_numbers {vehicle type id : max number},
+          max_total_vehicles_number and upper_bound_provider replace
+          the values of the base model when they are set, a vehicle
+          type given no vehicle in max_numbers is removed
+        - the id_customer of the points are renumbered from 1
+    """
 
+    def __init__(self, base, point_ids, build, depot_ids=()):
+        self.__base = base
+        self.__point_ids = point_ids
+        self.__depot_ids = depot_ids
+        self.__build = build
+        self.parameters = None
+        self.max_numbers = {}
+        self.max_total_vehicles_number = None
+        self.upper_bound_provider = base.upper_bound_provider
+        self.upper_bound_result = None
+        self.status = int(constants.MODEL_NOT_SOLVED)
+        self.message = constants.ERRORS_MODEL[self.status]
+        self.solution = Solution()
+        self.statistics = Statistics()
+
+    @property
+    def base(self):
+        """Model : the model seen by the view"""
+        return self.__base
+
+    @property
+    def point_ids(self):
+        """tuple(int) : ids of the customers of the view"""
+        return self.__point_ids
+
+    @property
+    def depot_ids(self):
+        """tuple(int) : ids of the points given as depots"""
+        return self.__depot_ids
+
+    def to_model(self):
+        """Return the model of the view"""
+        model = self.__build(self.__point_ids, self.__depot_ids)
+        if self.parameters is not None:
+            model.parameters = self.parameters
+        for vehicle_type_id, max_number in self.max_numbers.items():
+            if max_number == 0:
+                dict.__delitem__(model.vehicle_types, vehicle_type_id)
+                continue
+            vehicle_type = copy.copy(model.vehicle_types[vehicle_type_id])
+            vehicle_type.max_number = max_number
+            dict.__setitem__(model.vehicle_types, vehicle_type_id,
+                             vehicle_type)
+        if self.max_total_vehicles_number is not None:
+            model.max_total_vehicles_number = self.max_total_vehicles_number
+        model.upper_bound_provider = self.upper_bound_provider
+        return model
+
+    def get_model(self, debug=False):
+        """Get all elements of the view in a dictionary, as they are
+        sent to the solver"""
+        return self.to_model().get_model(debug, fold=True,
+                                         all_elements=True)
+
+    def solve(self):
+        """Solve the model of the view, the status, message, solution,
+        statistics and upper bound result are those of this model"""
+        model = self.to_model()
+        model.solve()
+        self.status = model.status
+        self.message = model.message
+        self.solution = model.solution
+        self.statistics = model.statistics
+        self.upper_bound_result = model.upper_bound_result
+
+    def __repr__(self):
+        return repr({"points": self.__point_ids, "status": self.status,
+                     "value": self.solution.value})
+
+
+class RollingHorizon:
+    """Re-optimization of the plan of a model while its routes are
+    executed.
+
+    Additional informations:
+        - the plan starts from the solution of the model, new orders are
+          added to the model before calling :py:meth:`replan`
+        - each vehicle makes one route : the vehicle of a started route
+          leaves the last committed point of its route with its remaining
+          capacity, the other vehicles leave their depot
+        - the remaining routes of the plan, with the new orders inserted,
+          are given to the solver as upper bound
+        - a started route whose vehicle is not used by the new solution
+          goes directly to its end point
+        - a started route whose vehicle has no capacity left is kept
+          as a fixed route to its end point, the cost of this return is
+          counted in the value of the event
+    """
+
+    def __init__(self, model):
+        self.__model = model
+        self.__routes = []
+        for route in model.solution.routes:
+            self.__routes.append({"vehicleTypeId": route.vehicle_type_id,
+                                  "pointIds": list(route.point_ids),
+                                  "times": list(route.time_consumption),
+                                  "loads": list(route.cap_consumption),
+                                  "committed": 0})
+        self.__events = []
+
+    @property
+    def plan(self):
+        """list(tuple) : routes (vehicle_type_id, point_ids) of the plan"""
+        return [(route["vehicleTypeId"], route["pointIds"])
+                for route in self.__routes]
+
+    @property
+    def events(self):
+        """list(dict) : time, latency, status, value, number of customers
+        and status of the upper bound of each call of replan"""
+        return self.__events
+
+    def replan(self, current_time, committed=None, time_limit=None):
+        """Solve again the customers which are not served, committed gives
+        for routes of the plan (by index) the number of their first points
+        which are committed at current_time (indexes of the current
+        :py:attr:`plan`). The plan is updated and the model solved is
+        returned."""
+        begin = time.perf_counter()
+        model = self.__model
+        for index, number in (committed or {}).items():
+            route = self.__routes[index]
+            route["committed"] = max(route["committed"],
+                                     min(number, len(route["pointIds"])))
+        served = set()
+        used = {}
+        for route in self.__routes:
+            if route["committed"] > 0:
+                used[route["vehicleTypeId"]] = \
+                    used.get(route["vehicleTypeId"], 0) + 1
+            for point_id in route["pointIds"][:route["committed"]]:
+                if model.points[point_id].id_customer > 0:
+                    served.add(model.points[point_id].id_customer)
+        started = [index for index, route in enumerate(self.__routes)
+                   if 0 < route["committed"] < len(route["pointIds"])]
+        return_cost = 0.0
+        full = [index for index in started if self.__is_full(index)]
+        if full:
+            arrays = ModelArrays(model)
+            for index in full:
+                return_cost += self.__return(arrays, index)
+            started = [index for index in started if index not in full]
+        positions = [self.__routes[index]["pointIds"][
+            self.__routes[index]["committed"] - 1] for index in started]
+        remaining = [point_id for point_id, point
+                     in dict.items(model.points)
+                     if point.id_customer > 0
+                     and point.id_customer not in served]
+
+        view = model.subset(remaining, [point_id for point_id in positions
+                                        if model.points[point_id]
+                                        .id_customer > 0])
+        if time_limit is not None:
+            view.parameters = copy.copy(model.parameters)
+            view.parameters.time_limit = time_limit
+        reduced = view.to_model()
+        for point in dict.values(reduced.points):
+            if point.id_customer > 0 and point.tw_begin < current_time:
+                point.tw_begin = current_time
+        for vehicle_type_id, vehicle_type in dict.items(model.vehicle_types):
+            vehicle_type = copy.copy(vehicle_type)
+            vehicle_type.tw_begin = max(vehicle_type.tw_begin, current_time)
+            number = used.get(vehicle_type_id, 0)
+            if number > 0 and vehicle_type.max_number > 0:
+                if vehicle_type.max_number <= number:
+                    dict.__delitem__(reduced.vehicle_types, vehicle_type_id)
+                    continue
+                vehicle_type.max_number -= number
+            dict.__setitem__(reduced.vehicle_types, vehicle_type_id,
+                             vehicle_type)
+        seeds = [(route["vehicleTypeId"], route["pointIds"])
+                 for route in self.__routes if route["committed"] == 0]
+        starts = {}
+        next_id = max(dict.keys(model.vehicle_types)) + 1
+        for index, position in zip(started, positions):
+            route = self.__routes[index]
+            vehicle_type = copy.copy(
+                model.vehicle_types[route["vehicleTypeId"]])
+            number = route["committed"]
+            if vehicle_type.capacity > 0:
+                vehicle_type.capacity -= route["loads"][number - 1]
+            vehicle_type.id = next_id
+            vehicle_type.start_point_id = position
+            vehicle_type.fixed_cost = 0.0
+            vehicle_type.max_number = 1
+            vehicle_type.tw_begin = max(route["times"][number - 1],
+                                        current_time)
+            dict.__setitem__(reduced.vehicle_types, next_id, vehicle_type)
+            for point in dict.values(reduced.points):
+                if route["vehicleTypeId"] in point.incompatible_vehicles:
+                    point.incompatible_vehicles = \
+                        point.incompatible_vehicles + [next_id]
+            seeds.append((next_id, route["pointIds"][number - 1:]))
+            starts[next_id] = index
+            next_id += 1
+        reduced.max_total_vehicles_number = max(
+            model.max_total_vehicles_number - sum(used.values())
+            + len(starts), 1)
+        reduced.upper_bound_provider = RoutesProvider(seeds)
+        reduced.solve()
+
+        if reduced.solution.is_defined():
+            self.__update_plan(reduced, starts)
+        result = reduced.upper_bound_result
+        self.__events.append({
+            "time": current_time, "latency": time.perf_counter() - begin,
+            "status": reduced.status,
+            "value": reduced.solution.value + return_cost
+            if reduced.solution.is_defined() else None,
+            "customers": len(remaining),
+            "upperBound": None if result is None else result.status})
+        return reduced
+
+    def __is_full(self, index):
+        """Return True if the vehicle of a started route has no capacity
+        left"""
+        route = self.__routes[index]
+        capacity = self.__model.vehicle_types[
+            route["vehicleTypeId"]].capacity
+        return 0 < capacity <= route["loads"][route["committed"] - 1]
+
+    def __return(self, arrays, index):
+        """Make a started route go from its last committed point to its
+        end point and commit it, return the cost of this return"""
+        route = self.__routes[index]
+        number = route["committed"]
+        veh = arrays.vehicle_type_index[route["vehicleTypeId"]]
+        position = arrays.index[route["pointIds"][number - 1]]
+        route["pointIds"] = route["pointIds"][:number]
+        route["times"] = route["times"][:number]
+        route["loads"] = route["loads"][:number]
+        cost = 0.0
+        if arrays.end[veh] >= 0 and arrays.end[veh] != position:
+            time_ = route["times"][-1]
+            link = arrays.best_link(position, arrays.end[veh], veh)
+            if link >= 0:
+                cost = (arrays.var_cost_dist[veh] * arrays.link_distance[link]
+                        + arrays.var_cost_time[veh] * arrays.link_time[link]
+                        + arrays.link_fixed_cost[link])
+                time_ += arrays.link_time[link]
+            route["pointIds"].append(arrays.point_ids[arrays.end[veh]])
+            route["times"].append(time_)
+            route["loads"].append(route["loads"][-1])
+        route["committed"] = len(route["pointIds"])
+        return cost
+
+    def __update_plan(self, reduced, starts):
+        """Replace the routes which are not committed by the routes of
+        the solution of the reduced model, the committed routes keep
+        their order at the beginning of the plan"""
+        continued = {}
+        new_routes = []
+        for new_route in reduced.solution.routes:
+            route = {"vehicleTypeId": new_route.vehicle_type_id,
+                     "pointIds": list(new_route.point_ids),
+                     "times": list(new_route.time_consumption),
+                     "loads": list(new_route.cap_consumption),
+                     "committed": 0}
+            if new_route.vehicle_type_id in starts:
+                continued[starts[new_route.vehicle_type_id]] = route
+            else:
+                new_routes.append(route)
+        routes = []
+        for index, route in enumerate(self.__routes):
+            committed = route["committed"]
+            if committed in (0, len(route["pointIds"])):
+                if committed > 0:
+                    routes.append(route)
+                continue
+            prefix = committed - 1
+            if index in continued:
+                tail = continued[index]
+                load = route["loads"][prefix]
+                tail["loads"] = [load + value for value in tail["loads"]]
+            else:
+                # the vehicle is not used anymore and goes to its end point
+                end_point_id = self.__model.vehicle_types[
+                    route["vehicleTypeId"]].end_point_id
+                tail = {"pointIds": [route["pointIds"][prefix]],
+                        "times": [route["times"][prefix]],
+                        "loads": [route["loads"][prefix]]}
+                if end_point_id >= 0 and end_point_id != \
+                        route["pointIds"][prefix]:
+                    tail["pointIds"].append(end_point_id)
+                    tail["times"].append(route["times"][prefix])
+                    tail["loads"].append(route["loads"][prefix])
+            routes.append({
+                "vehicleTypeId": route["vehicleTypeId"],
+                "pointIds": route["pointIds"][:prefix] + tail["pointIds"],
+                "times": route["times"][:prefix] + tail["times"],
+                "loads": route["loads"][:prefix] + tail["loads"],
+                "committed": committed})
+        self.__routes = routes + new_routes
+
+class Scenario:
+    """Variant of a base model made of small changes,
+    created by :py:meth:`ScenarioSet.add`"""
+
+    def __init__(self, base, name, points, vehicle_types,
+                 max_total_vehicles_number, parameters):
+        self.__base = base
+        self.__name = name
+        self.__points = points
+        self.__vehicle_types = vehicle_types
+        self.__max_total_vehicles_number = max_total_vehicles_number
+        self.__parameters = parameters
+        self.status = int(constants.MODEL_NOT_SOLVED)
+        self.message = constants.ERRORS_MODEL[self.status]
+        self.solution = Solution()
+        self.statistics = Statistics()
+
+    @property
+    def name(self):
+        """str : name of the scenario"""
+        return self.__name
+
+    @property
+    def points(self):
+        """dict : json of the changed points by row of the base"""
+        return self.__points
+
+    @property
+    def vehicle_types(self):
+        """dict : json of the changed vehicle types by row of the base"""
+        return self.__vehicle_types
+
+    @property
+    def max_total_vehicles_number(self):
+        """int : the maximum total vehicles number of the scenario"""
+        return self.__max_total_vehicles_number
+
+    @property
+    def parameters(self):
+        """Parameters : parameters of the scenario"""
+        return self.__parameters
+
+    def to_json(self):
+        """Return the scenario in the json format of the solver"""
+        return self.__base.to_json(self)
+
+    def read_output(self, output):
+        """Update status, message, solution and statistics from the
+        output of the solver"""
+        self.status = output["Status"]["code"]
+        self.message = output["Status"]["message"]
+        self.solution = Solution(output, self.status)
+        if self.status > -1 and self.status < 4 and \
+                self.__parameters.action != "enumAllFeasibleRoutes":
+            self.statistics = Statistics(output["Statistics"])
+
+    def solve(self):
+        """Solve the scenario in the current process"""
+        _lib_bapcod = load_bapcod(self.__parameters.cplex_path)
         try:
-            output = solve(input)
-            self.__output = json.loads((_c.c_char_p.from_buffer(output)).value)
-            self.status = self.__output["Status"]["code"]
-            self.message = self.__output["Status"]["message"]
-            self.solution = Solution(self.__output,self.status)
-
-            if self.status > -1 and self.status < 4 and self.parameters.action != "enumAllFeasibleRoutes":
-                self.statistics = Statistics(self.solution.json["Statistics"])
-                
-            free_memory(output)
+            self.read_output(solve_json(_lib_bapcod, self.to_json()))
         except BaseException:
             raise ModelError(constants.BAPCOD_ERROR)
 
+    def __repr__(self):
+        return repr({"name": self.__name, "status": self.status,
+                     "value": self.solution.value})
+
+
+def _solve_scenario(scenario_set, index):
+    """Solve a scenario in a child process and return the output"""
+    scenario = scenario_set[index]
+    _lib_bapcod = load_bapcod(scenario.parameters.cplex_path)
+    return solve_json(_lib_bapcod, scenario.to_json())
+
+
+class ScenarioSet:
+    """Set of scenarios sharing a frozen base model.
+
+    Additional informations:
+        - the points, vehicle types and links of the base are serialized
+          once when the set is created, later changes of the model are
+          not seen by the scenarios
+        - a scenario only stores the elements it changes, the other
+          elements and all the links are shared with the base
+        - :py:meth:`solve` solves all scenarios in parallel processes
+    """
+
+    def __init__(self, model):
+        _check_size(model.points)
+        incompatible_vehicles = model.get_incompatible_vehicles()
+        self.__points = [copy.copy(point)
+                         for point in dict.values(model.points)]
+        for point in self.__points:
+            point.incompatible_vehicles = incompatible_vehicles[point.id]
+        self.__point_index = {point.id: row
+                              for row, point in enumerate(self.__points)}
+        self.__vehicle_types = [copy.copy(vehicle_type) for vehicle_type
+                                in dict.values(model.vehicle_types)]
+        self.__vehicle_type_index = {
+            vehicle_type.id: row
+            for row, vehicle_type in enumerate(self.__vehicle_types)}
+        self.__groups = {}
+        for row, point in enumerate(self.__points):
+            if point.id_customer > 0:
+                self.__groups.setdefault(point.id_customer, []).append(row)
+        self.__point_jsons = [json.dumps(point.get_point())
+                              for point in self.__points]
+        self.__vehicle_type_jsons = [
+            json.dumps(vehicle_type.get_vehicle_type())
+            for vehicle_type in self.__vehicle_types]
+        self.__points_json = ", ".join(self.__point_jsons)
+        self.__vehicle_types_json = ", ".join(self.__vehicle_type_jsons)
+        self.__links_json = ", ".join(json.dumps(link)
+                                      for link in _fold_links(
+                                          model.get_links()))
+        self.__max_total_vehicles_number = model.max_total_vehicles_number
+        self.__parameters = model.parameters
+        self.__scenarios = []
+
+    def __len__(self):
+        return len(self.__scenarios)
+
+    def __getitem__(self, index):
+        return self.__scenarios[index]
+
+    def __iter__(self):
+        return iter(self.__scenarios)
+
+    def add(self, name=str(), max_number=None, demands=None, penalties=None,
+            max_total_vehicles_number=None, parameters=None):
+        """Add a scenario and return it.
+
+        Additional informations:
+            - max_number : dictionary {vehicle type id : max number}
+            - demands : dictionary {point id : demand} and penalties :
+              dictionary {point id : penalty}, the demand or the penalty
+              is given to all points with the same id_customer
+            - max_total_vehicles_number and parameters replace the values
+              of the base model if they are given
+        """
+        points = {}
+        for point_id, demand in (demands or {}).items():
+            for row in self.__group_rows(point_id):
+                point = points.setdefault(row,
+                                          copy.copy(self.__points[row]))
+                point.demand = demand
+        for point_id, penalty in (penalties or {}).items():
+            for row in self.__group_rows(point_id):
+                point = points.setdefault(row,
+                                          copy.copy(self.__points[row]))
+                point.penalty = penalty
+                point.penalty_or_cost = penalty
+        vehicle_types = {}
+        for vehicle_type_id, number in (max_number or {}).items():
+            if vehicle_type_id not in self.__vehicle_type_index:
+                raise ModelError(constants.UNKNOWN_VEHICLE_TYPE_ERROR)
+            row = self.__vehicle_type_index[vehicle_type_id]
+            vehicle_type = copy.copy(self.__vehicle_types[row])
+            vehicle_type.max_number = number
+            vehicle_types[row] = json.dumps(vehicle_type.get_vehicle_type())
+
+        if max_total_vehicles_number is None:
+            max_total_vehicles_number = self.__max_total_vehicles_number
+        if not isinstance(max_total_vehicles_number, (int)):
+            raise PropertyError(constants.JSON_OBJECT.MAXNUMBER.value,
+                                constants.INTEGER_PROPERTY)
+        if max_total_vehicles_number < 1:
+            raise PropertyError(constants.JSON_OBJECT.MAXNUMBER.value,
+                                constants.GREATER_ONE_PROPERTY)
+        if parameters is None:
+            parameters = self.__parameters
+        if not isinstance(parameters, (Parameters)):
+            raise PropertyError(constants.JSON_OBJECT.PARAMETERS.value, 0)
+
+        scenario = Scenario(self, name,
+                            {row: json.dumps(point.get_point())
+                             for row, point in points.items()},
+                            vehicle_types, max_total_vehicles_number,
+                            parameters)
+        self.__scenarios.append(scenario)
+        return scenario
+
+    def __point_row(self, point_id):
+        """Return the row of a point of the base"""
+        if point_id not in self.__point_index:
+            raise ModelError(constants.UNKNOWN_POINT_ERROR)
+        return self.__point_index[point_id]
+
+    def __group_rows(self, point_id):
+        """Return the rows of the points with the same id_customer as a
+        point of the base"""
+        row = self.__point_row(point_id)
+        return self.__groups.get(self.__points[row].id_customer, [row])
+
+    @staticmethod
+    def __join(jsons, joined, changes):
+        """Join the json of elements with the changes of a scenario"""
+        if not changes:
+            return joined
+        jsons = list(jsons)
+        for row, element in changes.items():
+            jsons[row] = element
+        return ", ".join(jsons)
+
+    def to_json(self, scenario):
+        """Return a scenario in the json format of the solver"""
+        return "{" + ", ".join([
+            json.dumps(constants.JSON_OBJECT.MAXNUMBER.value) + ": "
+            + json.dumps(scenario.max_total_vehicles_number),
+            json.dumps(constants.JSON_OBJECT.POINTS.value) + ": ["
+            + self.__join(self.__point_jsons, self.__points_json,
+                          scenario.points) + "]",
+            json.dumps(constants.JSON_OBJECT.VEHICLE_TYPES.value) + ": ["
+            + self.__join(self.__vehicle_type_jsons,
+                          self.__vehicle_types_json,
+                          scenario.vehicle_types) + "]",
+            json.dumps(constants.JSON_OBJECT.LINKS.value) + ": ["
+            + self.__links_json + "]",
+            json.dumps(constants.JSON_OBJECT.PARAMETERS.value) + ": "
+            + json.dumps(scenario.parameters.get_parameters())]) + "}"
+
+    def solve(self, max_workers=None, time_limit=None):
+        """Solve all scenarios in parallel processes, the results are
+        stored in each scenario which are returned"""
+        jobs = parallel.run_in_processes(
+            _solve_scenario, [(self, index) for index in range(len(self))],
+            max_workers, time_limit)
+        for index, output, error in jobs:
+            scenario = self.__scenarios[index]
+            if error != str():
+                scenario.status = constants.INTERRUPTED_BY_ERROR
+                scenario.message = error
+                continue
+            scenario.read_output(output)
+        return self.__scenarios
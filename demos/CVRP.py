@@ -4,7 +4,6 @@ Capacitated Vehicle Routing Problem """
 from VRPSolverEasy.src import solver
 import os,sys,getopt
 import math
-import numpy as np
 
 def read_instance(name : str):
     """ Read an instance in the folder data from a given name """
@@ -20,13 +19,8 @@ def compute_euclidean_distance(x_i, y_i, x_j, y_j,number_digit=3):
     return round(math.sqrt((x_i - x_j)**2 +
                            (y_i - y_j)**2), number_digit)
 
-def solve_demo(instance_path,
-               solver_name="CLP",
-               solver_path="",
-               time_resolution=30,
-               disableBuiltInHeur=False,
-               upper_bound=-1):
-    """return a solution from modelisation"""
+def build_model(instance_path):
+    """Return the model of an instance"""
 
     # read instance
     data = read_cvrp_instances(instance_path)
@@ -64,6 +58,19 @@ def solve_demo(instance_path,
                        distance=link["distance"]
                        )
 
+    return model
+
+
+def solve_demo(instance_path,
+               solver_name="CLP",
+               solver_path="",
+               time_resolution=30,
+               disableBuiltInHeur=False,
+               upper_bound=-1):
+    """return a solution from modelisation"""
+
+    model = build_model(instance_path)
+
     # set parameters
     if disableBuiltInHeur:
         model.set_parameters(time_limit=time_resolution, solver_name=solver_name, 
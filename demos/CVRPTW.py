@@ -28,13 +28,8 @@ def compute_one_decimal_floor_euclidean_distance(x_i, y_i, x_j, y_j):
     return math.floor(math.sqrt((x_i - x_j)**2 + (y_i - y_j)**2) * 10) / 10
 
 
-def solve_demo(instance_path,
-               solver_name="CLP",
-               solver_path="",
-               time_resolution=30,
-               disableBuiltInHeur=False,
-               upper_bound=-1):
-    """Return a solution from modelisation"""
+def build_model(instance_path):
+    """Return the model of an instance"""
 
     # read instance
     data = read_cvrptw_instances(instance_path)
@@ -82,6 +77,19 @@ def solve_demo(instance_path,
                        time=link["time"]
                        )
 
+    return model
+
+
+def solve_demo(instance_path,
+               solver_name="CLP",
+               solver_path="",
+               time_resolution=30,
+               disableBuiltInHeur=False,
+               upper_bound=-1):
+    """Return a solution from modelisation"""
+
+    model = build_model(instance_path)
+
     # set parameters
     if disableBuiltInHeur:
         model.set_parameters(time_limit=time_resolution, solver_name=solver_name, 
@@ -22,13 +22,8 @@ def compute_one_decimal_floor_euclidean_distance(x_i, y_i, x_j, y_j):
     """Compute the euclidean distance between 2 points from graph"""
     return math.floor(math.sqrt((x_i - x_j)**2 + (y_i - y_j)**2) * 10) / 10
 
-def solve_demo(instance_path,
-               solver_name="CLP",
-               solver_path="",
-               time_resolution=30,
-               disableBuiltInHeur=False,
-               upper_bound=-1):
-    """return a solution from modelisation"""
+def build_model(instance_path):
+    """Return the model of an instance"""
 
     # read instance
     data = read_hfvrp_instances(instance_path)
@@ -66,6 +61,19 @@ def solve_demo(instance_path,
                        end_point_id=link["end_point_id"],
                        distance=link["distance"])
 
+    return model
+
+
+def solve_demo(instance_path,
+               solver_name="CLP",
+               solver_path="",
+               time_resolution=30,
+               disableBuiltInHeur=False,
+               upper_bound=-1):
+    """return a solution from modelisation"""
+
+    model = build_model(instance_path)
+
     # set parameters
     if disableBuiltInHeur:
         model.set_parameters(time_limit=time_resolution, solver_name=solver_name, 
@@ -145,45 +145,44 @@ def solve_demo(instance_name,
     customer_ids = {customer.id : [customer.id] for customer in data.customers}
     # Add customers
     for customer in data.customers:
-        # Add a point for each time window of a customer
-        for i, tw in enumerate(customer.time_windows):
-            point_id = customer.id
-            if i > 0: # Is it an alternative point?
-                point_id = next_id
-                customer_ids[customer.id].append(next_id)
-                next_id += 1 # Get the next alternative ID
-            model.add_customer(id = point_id,
-                                id_customer = customer.id,
-                                demand = customer.demand,
-                                service_time = customer.service_time,
-                                tw_begin = tw[0],
-                                tw_end = tw[1],
-                                penalty = 1.0 if customer.optional else 0.0,
-                                incompatible_vehicles = big_vehicle_ids if customer.only_small_veh else [])
+        # Add a point for the first time window of a customer
+        tw = customer.time_windows[0]
+        model.add_customer(id = customer.id,
+                            demand = customer.demand,
+                            service_time = customer.service_time,
+                            tw_begin = tw[0],
+                            tw_end = tw[1],
+                            penalty = 1.0 if customer.optional else 0.0,
+                            incompatible_vehicles = big_vehicle_ids if customer.only_small_veh else [])
+        # Add an alternative point for each other time window, it shares
+        # the links of the customer
+        for tw in customer.time_windows[1:]:
+            model.add_alternative(id = next_id,
+                                  customer_id = customer.id,
+                                  tw_begin = tw[0],
+                                  tw_end = tw[1])
+            customer_ids[customer.id].append(next_id)
+            next_id += 1 # Get the next alternative ID
 
-    # Compute the links between depots and other points
+    # Compute the links between depots and customers
     for depot in data.depots:
         for customer in data.customers:
             dist = compute_euclidean_distance(customer.x, customer.y, depot.x, depot.y)
-            for point_id in customer_ids[customer.id]:
-                model.add_link(start_point_id = depot.id,
-                                end_point_id = point_id,
-                                distance = dist,
-                                time = dist)
+            model.add_link(start_point_id = depot.id,
+                            end_point_id = customer.id,
+                            distance = dist,
+                            time = dist)
                 
-    # Compute the links between customer points
+    # Compute the links between customers
     for i, c1 in enumerate(data.customers):
         for j, c2 in enumerate(data.customers):
             if j <= i:
                 continue
             dist = compute_euclidean_distance(c1.x, c1.y, c2.x, c2.y)
-            # Add a link for each pair of points from c1 to c2
-            for point_id_c1 in customer_ids[c1.id]:
-                for point_id_c2 in customer_ids[c2.id]:
-                    model.add_link(start_point_id = point_id_c1,
-                                    end_point_id = point_id_c2,
-                                    distance = dist,
-                                    time = dist)
+            model.add_link(start_point_id = c1.id,
+                            end_point_id = c2.id,
+                            distance = dist,
+                            time = dist)
 
     # set parameters
     model.set_parameters(time_limit=time_resolution,
@@ -0,0 +1,100 @@
+""" This module measures the time needed to load an exported model,
+in json and binary formats, compared to the time needed to build it
+with the add functions """
+
+import json
+import os
+import random
+import tempfile
+import time
+
+from VRPSolverEasy.src import solver
+
+
+def build_model(nb_points=1000, seed=0):
+    """Build a random model on a full graph of nb_points points"""
+    rng = random.Random(seed)
+    coordinates = [(rng.uniform(0, 1000), rng.uniform(0, 1000))
+                   for _ in range(nb_points)]
+    model = solver.Model()
+    model.add_vehicle_type(id=1, start_point_id=0, end_point_id=0,
+                           capacity=100, var_cost_dist=1)
+    model.add_depot(id=0)
+    for i in range(1, nb_points):
+        model.add_customer(id=i, demand=rng.randint(1, 20))
+    for i in range(nb_points):
+        for j in range(i + 1, nb_points):
+            distance = round(((coordinates[i][0] - coordinates[j][0]) ** 2
+                              + (coordinates[i][1] - coordinates[j][1]) ** 2)
+                             ** 0.5, 3)
+            model.add_link(start_point_id=i, end_point_id=j,
+                           distance=distance)
+    return model
+
+
+def rebuild_model(path):
+    """Rebuild an exported model with the add functions"""
+    with open(path, "rb") as infile:
+        content = json.loads(infile.read())
+    model = solver.Model()
+    for veh in content["VehicleTypes"]:
+        model.add_vehicle_type(
+            id=veh["id"], start_point_id=veh["startPointId"],
+            end_point_id=veh["endPointId"], name=veh["name"],
+            capacity=veh["capacity"], fixed_cost=veh["fixedCost"],
+            var_cost_dist=veh["varCostDist"],
+            var_cost_time=veh["varCostTime"], max_number=veh["maxNumber"],
+            tw_begin=veh["twBegin"], tw_end=veh["twEnd"])
+    for point in content["Points"]:
+        if point["idCustomer"] == 0:
+            model.add_depot(id=point["id"], name=point["name"],
+                            service_time=point["serviceTime"],
+                            cost=point["penaltyOrCost"],
+                            tw_begin=point["twBegin"],
+                            tw_end=point["twEnd"])
+        else:
+            model.add_customer(
+                id=point["id"], id_customer=point["idCustomer"],
+                name=point["name"], demand=point["demandOrCapacity"],
+                penalty=point["penaltyOrCost"],
+                service_time=point["serviceTime"],
+                tw_begin=point["twBegin"], tw_end=point["twEnd"],
+                incompatible_vehicles=point["incompatibleVehicles"])
+    for link in content["Links"]:
+        model.add_link(start_point_id=link["startPointId"],
+                       end_point_id=link["endPointId"], name=link["name"],
+                       is_directed=link["isDirected"],
+                       distance=link["distance"], time=link["time"],
+                       fixed_cost=link["fixedCost"])
+    return model
+
+
+def measure(function, repeat=3):
+    """Return the best time of several calls of function"""
+    best = float("inf")
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - begin)
+    return best
+
+
+if __name__ == "__main__":
+    model = build_model()
+    with tempfile.TemporaryDirectory() as directory:
+        name = os.path.join(directory, "instance")
+        model.export(name, all_elements=True)
+        time_build = measure(lambda: rebuild_model(name + ".json"))
+        print("rebuild with add functions (s) :", round(time_build, 3))
+        files = [("json", name + ".json")]
+        for compression in ("", "zlib", "lzma"):
+            path = name + "_" + compression
+            model.export(path, all_elements=True, format="binary",
+                         compression=compression)
+            files.append(("binary " + (compression or "uncompressed"),
+                          path + ".vrpb"))
+        for format, path in files:
+            time_load = measure(lambda: solver.Model.load(path))
+            print(format, ": size of the file (MB) :",
+                  round(os.path.getsize(path) / 2 ** 20, 2),
+                  "- load (s) :", round(time_load, 3))
@@ -0,0 +1,86 @@
+""" This module fits the runtime predictor of VRPSolverEasy on the log
+files of the folder results and saves its coefficients, then compares
+the longest first order of the runs with the order of the files """
+
+import math
+import os
+import sys
+
+from VRPSolverEasy.src import runtime
+
+import CVRP
+import CVRPTW
+import HFVRP
+
+BUILDERS = {"CVRP": (CVRP.build_model, ".vrp"),
+            "CVRPTW": (CVRPTW.build_model, ".txt"),
+            "HFVRP": (HFVRP.build_model, ".vrp")}
+
+
+def instance_features(project_path, records):
+    """Return the features of the model of each instance of the records"""
+    features = {}
+    for record in records:
+        key = (record["problem"], record["instance"])
+        if key in features or record["problem"] not in BUILDERS:
+            continue
+        build_model, extension = BUILDERS[record["problem"]]
+        path = os.path.join(project_path, "data", record["problem"],
+                            record["instance"] + extension)
+        if os.path.exists(path):
+            features[key] = runtime.features(build_model(path))
+    return features
+
+
+def samples(records, features):
+    """Return the samples of the records whose instance is known"""
+    result = []
+    for record in records:
+        key = (record["problem"], record["instance"])
+        if key in features:
+            result.append((features[key], {
+                "cplex": float(record["solver_name"] == "CPLEX"),
+                "heuristic_used": float(record["heuristic_used"]),
+                "upper_bound": float(record["upper_bound"])},
+                record["time"]))
+    return result
+
+
+def makespan(times, order, nb_workers):
+    """Return the makespan of runs started in an order on the first free
+    worker"""
+    loads = [0.0] * nb_workers
+    for index in order:
+        loads[loads.index(min(loads))] += times[index]
+    return max(loads)
+
+
+if __name__ == "__main__":
+    project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    nb_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    records = runtime.load_results(os.path.join(project_path, "results"))
+    features = instance_features(project_path, records)
+    data = samples(records, features)
+    predictor = runtime.RuntimePredictor().fit(data)
+    predictor.save()
+    print("samples :", len(data), "- instances :", len(features))
+    print("coefficients :", predictor)
+
+    errors = [abs(math.log(predictor.predict(model, parameters))
+                  - math.log(max(time, 1e-3)))
+              for model, parameters, time in data]
+    print("median error factor :",
+          round(math.exp(sorted(errors)[len(errors) // 2]), 2))
+
+    # makespan of the runs on nb_workers cores, each run being started on
+    # the first free core, in the order of the files or longest predicted
+    # first (the runs had a time limit of 1800 seconds)
+    times = [time for _, _, time in data]
+    predicted = [min(predictor.predict(model, parameters), 1800.0)
+                 for model, parameters, _ in data]
+    order = sorted(range(len(data)), key=lambda index: -predicted[index])
+    print("makespan on", nb_workers, "cores (s) - order of the files :",
+          round(makespan(times, range(len(data)), nb_workers)),
+          "- longest predicted first :",
+          round(makespan(times, order, nb_workers)),
+          "- lower bound :", round(sum(times) / nb_workers))
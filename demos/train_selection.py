@@ -0,0 +1,74 @@
+""" This module trains the configuration selector of VRPSolverEasy on the
+log files of the folder results and saves it, then evaluates it offline :
+the configuration of each instance is selected without its own runs and
+the times of the selected configurations are compared with the times of
+each fixed configuration """
+
+import math
+import os
+
+from VRPSolverEasy.src import runtime, selection
+
+from train_runtime import instance_features
+
+
+def train(records, features):
+    """Return the selector trained on the records whose instance is
+    known"""
+    selector = selection.ConfigurationSelector()
+    for record in records:
+        key = (record["problem"], record["instance"])
+        if key in features:
+            selector.add(record["problem"] + "_" + record["instance"],
+                         features[key],
+                         (record["solver_name"], record["heuristic_used"],
+                          20.0), record["upper_bound"], record["time"])
+    return selector
+
+
+def evaluate(selector):
+    """Return the times of the selected configuration and of each fixed
+    configuration on the instances solved with all configurations"""
+    configurations = selector.configurations()
+    times = {"selected": [], "best": []}
+    times.update({configuration: [] for configuration in configurations})
+    for (name, upper_bound), entry in selector.runs.items():
+        if len(entry["times"]) < len(configurations):
+            continue
+        expected = selector.expected_times(entry["features"], upper_bound,
+                                           excluded=(name,))
+        selected = min(expected, key=lambda key: expected[key][0])
+        real = {configuration: sum(entry["times"][configuration])
+                / len(entry["times"][configuration])
+                for configuration in configurations}
+        times["selected"].append(real[selected])
+        times["best"].append(min(real.values()))
+        for configuration in configurations:
+            times[configuration].append(real[configuration])
+    return times
+
+
+def geometric_mean(values):
+    """Return the geometric mean of positive values"""
+    return math.exp(sum(math.log(max(value, 1e-3)) for value in values)
+                    / len(values))
+
+
+if __name__ == "__main__":
+    project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    records = runtime.load_results(os.path.join(project_path, "results"))
+    selector = train(records, instance_features(project_path, records))
+    selector.save()
+    print("selector :", selector)
+
+    times = evaluate(selector)
+    print("instances solved with all configurations :",
+          len(times["selected"]))
+    print("{0:<45} {1:>12} {2:>16} {3:>10}".format(
+        "configuration", "total (s)", "geometric mean", "speed-up"))
+    for key, values in times.items():
+        name = key if isinstance(key, str) else \
+            selection.configuration_name(key)
+        print("{0:<45} {1:>12.0f} {2:>16.2f} {3:>10.2f}".format(
+            name, sum(values), geometric_mean(values),
+            geometric_mean(values) / geometric_mean(times["selected"])))
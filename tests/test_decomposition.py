@@ -0,0 +1,140 @@
+"""Tests of the decomposition of large models, they do not need the
+solver"""
+
+import pytest
+
+from VRPSolverEasy.src import constants, decomposition, solver
+from VRPSolverEasy.src.arrays import ModelArrays
+
+
+def ring_model(nb_customers, max_numbers, max_total=10000):
+    """Return a model whose customers are on a circle around the depot 0,
+    with a vehicle type of each max number, and their coordinates"""
+    model = solver.Model()
+    for vehicle_type_id, max_number in enumerate(max_numbers, 1):
+        model.add_vehicle_type(id=vehicle_type_id, start_point_id=0,
+                               end_point_id=0, capacity=100,
+                               var_cost_dist=vehicle_type_id,
+                               max_number=max_number)
+    model.max_total_vehicles_number = max_total
+    model.add_depot(id=0)
+    coordinates = {0: (0.0, 0.0)}
+    for point_id in range(1, nb_customers + 1):
+        model.add_customer(id=point_id, demand=1 + point_id % 3)
+        coordinates[point_id] = (
+            [1, 0, -1, 0][point_id % 4] * (1 + point_id / nb_customers),
+            [0, 1, 0, -1][point_id % 4] * (1 + point_id / nb_customers))
+    for i in range(nb_customers + 1):
+        for j in range(i + 1, nb_customers + 1):
+            (xi, yi), (xj, yj) = coordinates[i], coordinates[j]
+            model.add_link(start_point_id=i, end_point_id=j,
+                           distance=((xi - xj) ** 2 + (yi - yj) ** 2) ** 0.5)
+    return model, coordinates
+
+
+def test_share():
+    assert decomposition.share(10, [1, 1, 1]) == [4, 3, 3]
+    assert decomposition.share(7, [5, 0, 2]) == [5, 0, 2]
+    assert sum(decomposition.share(5, [3, 1, 1, 2])) == 5
+
+
+@pytest.mark.parametrize("coordinates", [True, False])
+def test_clusters(coordinates):
+    model, points = ring_model(40, [0])
+    arrays = ModelArrays(model)
+    clusters = decomposition.clusters(arrays, 10,
+                                      points if coordinates else None)
+    assert len(clusters) == 4
+    assert sorted(point_id for cluster in clusters
+                  for point_id in cluster) == list(range(1, 41))
+
+
+def test_clusters_keep_alternatives_together():
+    model, _ = ring_model(20, [0])
+    model.add_alternative(id=21, customer_id=1)
+    arrays = ModelArrays(model)
+    for cluster in decomposition.clusters(arrays, 5):
+        assert (1 in cluster) == (21 in cluster)
+
+
+@pytest.mark.parametrize("max_numbers, max_total", [
+    ([2], 10000), ([2, 1], 10000), ([3, 0], 10000), ([0], 2),
+    ([40], 10000), ([6, 6], 3)])
+def test_split_fleet(max_numbers, max_total):
+    model, points = ring_model(40, max_numbers, max_total)
+    arrays = ModelArrays(model)
+    clusters = decomposition.clusters(arrays, 10, points)
+    numbers, totals = decomposition.split_fleet(arrays, clusters)
+    fleet = min(sum(max_number or float("inf")
+                    for max_number in max_numbers), max_total)
+    assert len(clusters) == min(4, fleet)
+    for vehicle_type_id, max_number in enumerate(max_numbers, 1):
+        if max_number > 0:
+            assert sum(cluster_numbers[vehicle_type_id]
+                       for cluster_numbers in numbers) == max_number
+    assert sum(totals) <= max(max_total, len(clusters))
+    for cluster_numbers, total in zip(numbers, totals):
+        # each cluster has a vehicle
+        assert total >= 1
+        assert 0 in max_numbers or sum(cluster_numbers.values()) >= 1
+
+
+def output(value, routes):
+    """Return a solver output with routes given as (vehicle type id,
+    point ids)"""
+    key = constants.ROUTE
+    code = constants.BETTER_SOL_FOUND
+    return {"Status": {"code": code,
+                       "message": constants.SOLUTION_STATUS[code]},
+            "Solution": {"bestSolutionValue": value, "Routes": [
+                {key.VEHICLE_TYPE_ID.value: vehicle_type_id,
+                 key.VISITED_POINTS.value: [{key.POINT_ID.value: point_id}
+                                            for point_id in point_ids]}
+                for vehicle_type_id, point_ids in routes]}}
+
+
+def test_merge_outputs():
+    merged = decomposition.merge_outputs([
+        output(10.0, [(1, [0, 1, 0])]), output(5.5, [(2, [0, 2, 3, 0])])])
+    assert merged["Solution"]["bestSolutionValue"] == 15.5
+    assert [route[constants.ROUTE.VEHICLE_TYPE_ID.value]
+            for route in merged["Solution"]["Routes"]] == [1, 2]
+    assert merged["Status"]["code"] == constants.BETTER_SOL_FOUND
+
+
+def test_merge_outputs_without_routes():
+    # a cluster of optional customers may have no route
+    empty = output(3.0, [])
+    del empty["Solution"]["Routes"]
+    merged = decomposition.merge_outputs([output(10.0, [(1, [0, 1, 0])]),
+                                          empty])
+    assert merged["Solution"]["bestSolutionValue"] == 13.0
+    assert len(merged["Solution"]["Routes"]) == 1
+
+
+def test_merge_outputs_missing_solution():
+    assert decomposition.merge_outputs([output(1.0, []), None]) is None
+    assert decomposition.merge_outputs([output(1.0, []),
+                                        {"Solution": {}}]) is None
+
+
+def test_exceeds_fleet():
+    model, _ = ring_model(4, [1, 0], max_total=3)
+    arrays = ModelArrays(model)
+    routes = output(0.0, [(1, [0, 1, 0]), (2, [0, 2, 0]),
+                          (2, [0, 3, 0])])["Solution"]["Routes"]
+    assert not decomposition.exceeds_fleet(arrays, routes)
+    assert decomposition.exceeds_fleet(arrays, routes + routes[:1])
+    assert decomposition.exceeds_fleet(
+        arrays, output(0.0, [(1, [0, 1, 0]), (1, [0, 2, 0])])[
+            "Solution"]["Routes"])
+
+
+def test_large_model():
+    with pytest.raises(solver.PropertyError):
+        ring_model(constants.MAX_NB_POINTS + 1, [0])
+    model = solver.Model(large=True)
+    model.add_depot(id=0)
+    for point_id in range(1, constants.MAX_NB_POINTS + 2):
+        model.add_customer(id=point_id)
+    assert len(model.points) == constants.MAX_NB_POINTS + 2
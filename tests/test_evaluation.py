@@ -0,0 +1,112 @@
+"""Tests of the evaluation and validation of solutions, they do not need
+the solver"""
+
+import pytest
+
+from VRPSolverEasy.src import constants, solver
+from VRPSolverEasy.src.evaluation import SolutionEvaluator
+from VRPSolverEasy.src.heuristics import evaluate_route
+
+
+def small_model():
+    """Return a model with 4 customers, the customer 4 being optional"""
+    model = solver.Model()
+    model.add_vehicle_type(id=1, start_point_id=0, end_point_id=0,
+                           capacity=5, fixed_cost=10, var_cost_dist=1,
+                           max_number=2, tw_end=100)
+    model.add_vehicle_type(id=2, start_point_id=0, end_point_id=0,
+                           capacity=0, var_cost_dist=2, max_number=0)
+    model.add_depot(id=0)
+    for point_id in range(1, 5):
+        model.add_customer(id=point_id, demand=2, tw_end=50,
+                           penalty=7 * (point_id == 4),
+                           incompatible_vehicles=[2] * (point_id == 3))
+    for i in range(5):
+        for j in range(i + 1, 5):
+            model.add_link(start_point_id=i, end_point_id=j,
+                           distance=10 * abs(i - j), time=10 * abs(i - j))
+    model.max_total_vehicles_number = 3
+    return model
+
+
+def test_feasible_solution():
+    result = SolutionEvaluator(small_model()).evaluate(
+        [(1, [0, 1, 2, 0]), (1, [0, 3, 0])])
+    assert result.feasible
+    assert result.costs == [50.0, 70.0]
+    # the optional customer 4 is not visited
+    assert result.value == 127.0
+    assert result.violations == [[], []]
+
+
+@pytest.mark.parametrize("routes, violation", [
+    ([(1, [0, 1, 2, 3, 0])], "capacity of vehicle type 1 is exceeded"),
+    ([(2, [0, 1, 2, 3, 0])], "point 3 is incompatible with vehicle type 2"),
+    ([(1, [1, 2, 0]), (1, [0, 3, 0])], "route does not start at its depot"),
+    ([(1, [0, 1, 2]), (1, [0, 3, 0])], "route does not end at its depot"),
+    ([(2, [0, 4, 3, 2, 1, 0])], "time window of point 1 is violated"),
+    ([(3, [0, 1, 0])], "unknown vehicle type 3"),
+    ([(1, [0, 9, 0])], "unknown point in route [0, 9, 0]")])
+def test_route_violations(routes, violation):
+    result = SolutionEvaluator(small_model()).evaluate(routes)
+    assert not result.feasible
+    assert violation in [violation for violations in result.violations
+                         for violation in violations]
+
+
+def test_vehicle_time_window():
+    model = small_model()
+    model.vehicle_types[1].tw_end = 30
+    result = SolutionEvaluator(model).evaluate([(1, [0, 1, 2, 0]),
+                                                (1, [0, 3, 0])])
+    assert "time window of vehicle type 1 is violated" in \
+        result.violations[0]
+
+
+def test_missing_link():
+    model = small_model()
+    del model.links[(1, 2)]
+    result = SolutionEvaluator(model).evaluate([(1, [0, 1, 2, 0]),
+                                                (1, [0, 3, 0])])
+    assert result.violations[0] == ["no link between points 1 and 2"]
+
+
+@pytest.mark.parametrize("routes, violation", [
+    ([(1, [0, 1, 0]), (1, [0, 2, 0]), (1, [0, 3, 0])],
+     "too many vehicles of type 1"),
+    ([(1, [0, 1, 0]), (2, [0, 2, 0]), (1, [0, 3, 0]), (2, [0, 4, 0])],
+     "too many vehicles"),
+    ([(1, [0, 1, 2, 0]), (1, [0, 2, 3, 0])], "customer 2 is visited twice"),
+    ([(1, [0, 1, 2, 0])], "customer 3 is not visited")])
+def test_solution_violations(routes, violation):
+    result = SolutionEvaluator(small_model()).evaluate(routes)
+    assert not result.feasible
+    assert violation in result.solution_violations
+
+
+def test_vehicle_type_without_limit():
+    # a max_number of 0 is no limit
+    result = SolutionEvaluator(small_model()).evaluate(
+        [(2, [0, 1, 0]), (2, [0, 2, 0]), (1, [0, 3, 0])])
+    assert result.solution_violations == []
+
+
+def test_route_cost_of_solution():
+    evaluator = SolutionEvaluator(small_model())
+    routes = [evaluate_route(evaluator.arrays, 1, point_ids)[1]
+              for point_ids in ([0, 1, 2, 0], [0, 3, 0])]
+    routes[1][constants.ROUTE.ROUTE_COST.value] = 60.0
+    code = constants.BETTER_SOL_FOUND
+    solution = solver.Solution(
+        {"Status": {"code": code,
+                    "message": constants.SOLUTION_STATUS[code]},
+         "Solution": {"bestSolutionValue": 110.0, "Routes": routes}}, code)
+    result = evaluator.evaluate(solution)
+    assert result.violations == [[], ["cost 60.0 differs from 70.0"]]
+
+
+def test_evaluate_batch():
+    evaluator = SolutionEvaluator(small_model())
+    results = evaluator.evaluate_batch([[(1, [0, 1, 2, 0]), (1, [0, 3, 0])],
+                                        [(1, [0, 1, 2, 3, 0])]])
+    assert [result.feasible for result in results] == [True, False]
@@ -0,0 +1,76 @@
+"""Tests of the upper bound providers, they do not need the solver"""
+
+import json
+import sys
+
+import pytest
+
+from VRPSolverEasy.src import constants, solver
+from VRPSolverEasy.src.heuristics import ExternalHeuristic, SavingsHeuristic
+
+
+def small_cvrp():
+    """Return a CVRP with 6 customers on a line and a depot at 0"""
+    model = solver.Model()
+    model.add_vehicle_type(id=1, start_point_id=0, end_point_id=0,
+                           capacity=3, var_cost_dist=1, max_number=0)
+    model.add_depot(id=0)
+    for point_id in range(1, 7):
+        model.add_customer(id=point_id, demand=1)
+    for i in range(7):
+        for j in range(i + 1, 7):
+            model.add_link(start_point_id=i, end_point_id=j,
+                           distance=abs(i - j))
+    return model
+
+
+def external(output):
+    """Return an external heuristic printing output"""
+    return ExternalHeuristic([sys.executable, "-c",
+                              "print(" + repr(output) + ")"])
+
+
+def test_savings_heuristic():
+    result = SavingsHeuristic().run(small_cvrp())
+    assert result.status == constants.UPPER_BOUND_APPLIED
+    visited = sorted(point_id for _, point_ids in result.routes
+                     for point_id in point_ids if point_id != 0)
+    assert visited == list(range(1, 7))
+    assert all(point_ids[0] == point_ids[-1] == 0
+               for _, point_ids in result.routes)
+    # the two routes 0-1-2-3-0 and 0-4-5-6-0 are optimal
+    assert result.value == pytest.approx(18.0)
+
+
+def test_external_heuristic_routes():
+    output = json.dumps({"value": 0, "routes": [
+        {"vehicleTypeId": 1, "pointIds": [0, 1, 2, 3, 0]},
+        {"vehicleTypeId": 1, "pointIds": [0, 4, 5, 6, 0]}]})
+    result = external(output).run(small_cvrp())
+    assert result.status == constants.UPPER_BOUND_APPLIED
+    assert result.value == pytest.approx(18.0)
+
+
+def test_external_heuristic_value():
+    result = external("25.5").run(small_cvrp())
+    assert result.status == constants.UPPER_BOUND_APPLIED
+    assert result.value == 25.5
+    assert result.routes == []
+
+
+@pytest.mark.parametrize("output", [
+    "[1, 2]",
+    '"x"',
+    "true",
+    '{"value": "abc"}',
+    '{"routes": {"vehicleTypeId": 1}}',
+    '{"routes": [[1, [0, 1, 0]]]}',
+    '{"routes": [{"pointIds": [0, 1, 2, 3, 0]}]}',
+    '{"routes": [{"vehicleTypeId": 1}]}',
+    '{"routes": [{"vehicleTypeId": [1], "pointIds": [0, 1, 0]}]}',
+    '{"routes": [{"vehicleTypeId": 1, "pointIds": "0 1 0"}]}',
+    "not json"])
+def test_external_heuristic_malformed_output(output):
+    result = external(output).run(small_cvrp())
+    assert result.status == constants.UPPER_BOUND_FAILED
+    assert result.message != str()
@@ -0,0 +1,139 @@
+"""Tests of the insertion check against a brute-force insertion, they do
+not need the solver"""
+
+import random
+
+import pytest
+
+from VRPSolverEasy.src import constants, solver
+from VRPSolverEasy.src.arrays import ModelArrays
+from VRPSolverEasy.src.heuristics import evaluate_route
+from VRPSolverEasy.src.insertion import EPSILON
+
+
+def random_model(seed, nb_customers=12):
+    """Return a model with time windows on random coordinates, with the
+    coordinates"""
+    rng = random.Random(seed)
+    model = solver.Model()
+    model.add_vehicle_type(id=1, start_point_id=0, end_point_id=0,
+                           capacity=30, var_cost_dist=1, var_cost_time=0.1,
+                           max_number=0, tw_end=400)
+    model.add_vehicle_type(id=2, start_point_id=0, end_point_id=0,
+                           capacity=10, var_cost_dist=0.8, max_number=0,
+                           tw_end=400)
+    model.add_depot(id=0, tw_end=400)
+    coordinates = {0: (50.0, 50.0)}
+    for point_id in range(1, nb_customers + 1):
+        tw_begin = rng.randint(0, 200)
+        model.add_customer(id=point_id, demand=rng.randint(1, 8),
+                           service_time=rng.randint(0, 10),
+                           tw_begin=tw_begin,
+                           tw_end=tw_begin + rng.randint(30, 150))
+        coordinates[point_id] = (rng.uniform(0, 100), rng.uniform(0, 100))
+    for i in range(nb_customers + 1):
+        add_links(model, coordinates, i, range(i))
+    return model, coordinates, rng
+
+
+def add_links(model, coordinates, point_id, others):
+    """Add the links between a point and other points"""
+    x, y = coordinates[point_id]
+    for other in others:
+        distance = ((x - coordinates[other][0]) ** 2
+                    + (y - coordinates[other][1]) ** 2) ** 0.5
+        model.add_link(start_point_id=other, end_point_id=point_id,
+                       distance=round(distance, 1),
+                       time=round(distance, 1))
+
+
+def checked_route(arrays, vehicle_type_id, point_ids):
+    """Return the cost and the json of a route, None if the route is not
+    feasible"""
+    try:
+        return evaluate_route(arrays, vehicle_type_id, point_ids)[:2]
+    except ValueError:
+        return None
+
+
+def greedy_routes(model):
+    """Return feasible routes built by appending the customers, by
+    beginning of time window, to the first route which stays feasible,
+    or to a new route"""
+    arrays = ModelArrays(model)
+    routes = []
+    customers = sorted((point for point in dict.values(model.points)
+                        if point.id_customer > 0),
+                       key=lambda point: point.tw_begin)
+    for index, point in enumerate(customers):
+        vehicle_type_id = 1 + index % 2
+        for route in routes:
+            point_ids = route[1][:-1] + [point.id, 0]
+            if checked_route(arrays, route[0], point_ids) is not None:
+                route[1] = point_ids
+                break
+        else:
+            # the customers which cannot be served in time are left out
+            if checked_route(arrays, vehicle_type_id,
+                             [0, point.id, 0]) is not None:
+                routes.append([vehicle_type_id, [0, point.id, 0]])
+    return routes
+
+
+def brute_force(model, routes, point_id):
+    """Return for each route the cheapest feasible insertion of a
+    customer as (cost delta, position), None if there is none"""
+    arrays = ModelArrays(model)
+    results = []
+    for vehicle_type_id, point_ids in routes:
+        cost = checked_route(arrays, vehicle_type_id, point_ids)[0]
+        best = None
+        for position in range(1, len(point_ids)):
+            route = checked_route(
+                arrays, vehicle_type_id,
+                point_ids[:position] + [point_id] + point_ids[position:])
+            if route is not None and (best is None or
+                                      route[0] - cost < best[0] - EPSILON):
+                best = (route[0] - cost, position)
+        results.append(best)
+    return results
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_insertion_check(seed):
+    model, coordinates, rng = random_model(seed)
+    routes = greedy_routes(model)
+    arrays = ModelArrays(model)
+    code = constants.BETTER_SOL_FOUND
+    solution = solver.Solution(
+        {"Status": {"code": code,
+                    "message": constants.SOLUTION_STATUS[code]},
+         "Solution": {"bestSolutionValue": 0.0, "Routes": [
+             checked_route(arrays, vehicle_type_id, point_ids)[1]
+             for vehicle_type_id, point_ids in routes]}}, code)
+    check = solution.insertion_check(model)
+    assert check.nb_routes == len(routes)
+
+    # the new customer is added after the check is built
+    for point_id in range(100, 105):
+        tw_begin = rng.randint(0, 250)
+        model.add_customer(id=point_id, demand=rng.randint(1, 8),
+                           service_time=rng.randint(0, 10),
+                           tw_begin=tw_begin,
+                           tw_end=tw_begin + rng.randint(20, 150),
+                           incompatible_vehicles=[2] * (point_id == 104))
+        coordinates[point_id] = (rng.uniform(0, 100), rng.uniform(0, 100))
+        add_links(model, coordinates, point_id,
+                  [other for other in coordinates if other < 100])
+        expected = brute_force(model, routes, point_id)
+        results = check.evaluate(point_id)
+        for result, reference in zip(results, expected):
+            assert (result is None) == (reference is None)
+            if result is not None:
+                assert result[0] == pytest.approx(reference[0], abs=1e-6)
+        feasible = [(result[0], index) for index, result
+                    in enumerate(expected) if result is not None]
+        best = check.best(point_id)
+        assert (best is None) == (not feasible)
+        if best is not None:
+            assert best[1] == pytest.approx(min(feasible)[0], abs=1e-6)
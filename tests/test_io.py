@@ -0,0 +1,85 @@
+"""Tests of the export and load of models and solutions, in json and in
+binary format, they do not need the solver"""
+
+import pytest
+
+from VRPSolverEasy.src import binary, constants, solver
+from VRPSolverEasy.src.arrays import ModelArrays
+from VRPSolverEasy.src.heuristics import evaluate_routes
+
+FORMATS = [("json", "", ".json")] + [
+    ("binary", compression, binary.EXTENSION)
+    for compression in binary.COMPRESSIONS]
+
+
+def small_model():
+    """Return a model with every kind of element"""
+    model = solver.Model()
+    model.add_vehicle_type(id=1, start_point_id=0, end_point_id=0,
+                           name="truck", capacity=10, fixed_cost=5.5,
+                           var_cost_dist=1, var_cost_time=0.5,
+                           max_number=3, tw_begin=0, tw_end=100)
+    model.add_vehicle_type(id=2, start_point_id=0, end_point_id=-1,
+                           capacity=4, var_cost_dist=2, max_number=0)
+    model.add_depot(id=0, name="depot", tw_end=100)
+    for point_id in range(1, 5):
+        model.add_customer(id=point_id, name="customer " + str(point_id),
+                           demand=point_id, service_time=1.5,
+                           tw_begin=point_id, tw_end=50 + point_id,
+                           penalty=100 * (point_id == 4),
+                           incompatible_vehicles=[2] * (point_id == 3))
+    for i in range(5):
+        for j in range(i + 1, 5):
+            model.add_link(start_point_id=i, end_point_id=j,
+                           name="link " + str(i) + "-" + str(j),
+                           is_directed=(i + j) % 2 == 1,
+                           distance=abs(i - j) + 0.25, time=abs(i - j),
+                           fixed_cost=(j == 4))
+    model.max_total_vehicles_number = 4
+    model.set_parameters(time_limit=30, solver_name="CLP")
+    return model
+
+
+@pytest.mark.parametrize("format_, compression, extension", FORMATS)
+def test_model_round_trip(tmp_path, format_, compression, extension):
+    model = small_model()
+    name = str(tmp_path / "model")
+    model.export(name, format=format_, compression=compression)
+    assert binary.is_binary(name + extension) == (format_ == "binary")
+    loaded = solver.Model.load(name + extension)
+    assert loaded.get_model(True) == model.get_model(True)
+    assert loaded.max_total_vehicles_number == 4
+    assert loaded.parameters.time_limit == 30
+
+
+@pytest.mark.parametrize("format_, compression, extension", FORMATS)
+def test_solution_round_trip(tmp_path, format_, compression, extension):
+    value, route_jsons = evaluate_routes(
+        ModelArrays(small_model()), [(1, [0, 1, 2, 0]), (1, [0, 3, 4, 0])])
+    code = constants.BETTER_SOL_FOUND
+    solution = solver.Solution(
+        {"Status": {"code": code,
+                    "message": constants.SOLUTION_STATUS[code]},
+         "Solution": {"bestSolutionValue": value, "Routes": route_jsons}},
+        code)
+    assert solution.is_defined()
+    name = str(tmp_path / "solution")
+    solution.export(name, format=format_, compression=compression)
+    loaded = solver.Solution.load(name + extension)
+    assert loaded.json == solution.json
+    assert loaded.value == solution.value
+    assert [route.point_ids for route in loaded.routes] == \
+        [route.point_ids for route in solution.routes]
+
+
+def test_load_rejects_invalid_elements(tmp_path):
+    model = small_model()
+    name = str(tmp_path / "model")
+    model.export(name)
+    with open(name + ".json") as infile:
+        content = infile.read()
+    with open(name + ".json", "w") as outfile:
+        outfile.write(content.replace('"demandOrCapacity": 3',
+                                      '"demandOrCapacity": "3"'))
+    with pytest.raises(solver.PropertyError):
+        solver.Model.load(name + ".json")
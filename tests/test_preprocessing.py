@@ -0,0 +1,252 @@
+"""Tests of the preprocessing passes, they do not need the solver"""
+
+from VRPSolverEasy.src import constants, preprocessing, solver
+from VRPSolverEasy.src.arrays import ModelArrays
+from VRPSolverEasy.src.preprocessing import PreprocessingReport
+
+
+def line_model(nb_customers=4, capacity=10, demand=1):
+    """Return a model whose customers are on a line with the depot 0"""
+    model = solver.Model()
+    model.add_vehicle_type(id=1, start_point_id=0, end_point_id=0,
+                           capacity=capacity, var_cost_dist=1, max_number=0)
+    model.add_depot(id=0)
+    for point_id in range(1, nb_customers + 1):
+        model.add_customer(id=point_id, demand=demand)
+    for i in range(nb_customers + 1):
+        for j in range(i + 1, nb_customers + 1):
+            model.add_link(start_point_id=i, end_point_id=j,
+                           distance=abs(i - j), time=abs(i - j))
+    return model
+
+
+def decisions_of(model):
+    """Return the decision of the infeasible arcs pass for each link
+    (start, end) and the report"""
+    arrays = ModelArrays(model)
+    report = PreprocessingReport()
+    decisions = preprocessing.infeasible_arcs(arrays, report)
+    return {(arrays.point_ids[i], arrays.point_ids[j]): decision
+            for i, j, decision in zip(arrays.link_start, arrays.link_end,
+                                      decisions)}, report
+
+
+def test_infeasible_arcs_capacity():
+    model = line_model(capacity=10)
+    model.points[1].demand = 6
+    model.points[2].demand = 6
+    decisions, report = decisions_of(model)
+    assert decisions[1, 2] == preprocessing.DROP
+    assert decisions[0, 1] == preprocessing.KEEP
+    assert report.removed["capacity"] == 2
+
+
+def test_infeasible_arcs_incompatibility():
+    model = line_model()
+    model.points[1].incompatible_vehicles = [1]
+    decisions, report = decisions_of(model)
+    assert all(decision == preprocessing.DROP
+               for (i, j), decision in decisions.items() if 1 in (i, j))
+    assert report.removed["incompatibility"] == 2 * 4
+
+
+def test_infeasible_arcs_time():
+    model = line_model()
+    # 3 cannot be reached from 2 before 4, 2 can be reached from 3
+    model.points[2].tw_begin = 10
+    model.points[3].tw_end = 5
+    decisions, report = decisions_of(model)
+    assert decisions[2, 3] == preprocessing.BACKWARD
+    assert report.removed["time"] >= 1
+
+
+def test_dominated_links():
+    report = PreprocessingReport()
+    # 0-1 undirected twice, the second is dominated by the first ;
+    # 1-2 directed is dominated by the cheaper undirected 2-1 ;
+    # 2-3 undirected is not dominated by the cheaper directed 2-3
+    dominated = preprocessing.dominated_links(
+        starts=[0, 0, 1, 2, 2, 2], ends=[1, 1, 2, 1, 3, 3],
+        directed=[False, False, True, False, False, True],
+        distance=[1, 1, 5, 4, 3, 2], time_=[1, 1, 1, 1, 1, 1],
+        fixed_cost=[0, 0, 0, 0, 0, 0], var_cost_dist=[1],
+        var_cost_time=[0], report=report)
+    assert list(dominated) == [False, True, True, False, False, False]
+    assert report.removed["dominated"] == 2
+
+
+def test_dominated_links_negative_cost():
+    report = PreprocessingReport()
+    dominated = preprocessing.dominated_links(
+        starts=[0, 0], ends=[1, 1], directed=[False, False],
+        distance=[1, 2], time_=[0, 0], fixed_cost=[0, 0],
+        var_cost_dist=[-1], var_cost_time=[0], report=report)
+    assert not any(dominated)
+
+
+def test_tighten_time_windows():
+    model = line_model(nb_customers=3)
+    model.vehicle_types[1].tw_end = 20
+    model.points[3].service_time = 1
+    model.points[3].tw_begin = 0
+    model.points[3].tw_end = 30
+    model.points[2].tw_begin = 0
+    model.points[2].tw_end = 1
+    arrays = ModelArrays(model)
+    report = PreprocessingReport()
+    changed = preprocessing.tighten_time_windows(arrays, report)
+    row = arrays.index[3]
+    # 3 is reached at the earliest at 3 + 1, and must be left at the
+    # latest at 20 - 3 to return to the depot
+    assert row in changed
+    assert arrays.tw_begin[row] == 4
+    assert arrays.tw_end[row] == 17
+    # 2 cannot be reached before the end of its time window
+    assert report.unreachable == [2]
+
+
+def scaled_json(capacity_granularity=None, time_granularity=None,
+                var_cost_time=0):
+    """Return the json of a model with demands multiple of 5 and times
+    multiple of 10, scaled, with the factors"""
+    model = line_model(nb_customers=2, capacity=20, demand=5)
+    model.vehicle_types[1].var_cost_time = var_cost_time
+    model.vehicle_types[1].tw_end = 1000
+    model.points[1].tw_begin = 20
+    model.points[1].tw_end = 90
+    model.points[2].service_time = 30
+    for links in dict.values(model.links):
+        for link in links:
+            link.time = 10 * link.distance
+    content = model.get_model()
+    factors = preprocessing.scale_resources(
+        content, capacity_granularity, time_granularity)
+    return content, factors
+
+
+def test_scale_resources_common_divisor():
+    content, factors = scaled_json()
+    assert factors == (5, 10)
+    points = {point[constants.POINT.ID.value]: point
+              for point in content[constants.JSON_OBJECT.POINTS.value]}
+    assert points[1][constants.POINT.DEMAND_OR_CAPACITY.value] == 1
+    assert points[1][constants.POINT.TIME_WINDOWS_BEGIN.value] == 2
+    assert points[1][constants.POINT.TIME_WINDOWS_END.value] == 9
+    assert points[2][constants.POINT.SERVICE_TIME.value] == 3
+    vehicle_type = content[constants.JSON_OBJECT.VEHICLE_TYPES.value][0]
+    assert vehicle_type[constants.VEHICLE_TYPE.CAPACITY.value] == 4
+    assert vehicle_type[constants.VEHICLE_TYPE.TIME_WINDOWS_END.value] == 100
+
+
+def test_scale_resources_granularity():
+    content, factors = scaled_json(capacity_granularity=3,
+                                   time_granularity=40)
+    assert factors == (3, 40)
+    points = {point[constants.POINT.ID.value]: point
+              for point in content[constants.JSON_OBJECT.POINTS.value]}
+    # demands and begins are rounded up, capacities and ends down
+    assert points[1][constants.POINT.DEMAND_OR_CAPACITY.value] == 2
+    assert points[1][constants.POINT.TIME_WINDOWS_BEGIN.value] == 1
+    assert points[1][constants.POINT.TIME_WINDOWS_END.value] == 2
+    vehicle_type = content[constants.JSON_OBJECT.VEHICLE_TYPES.value][0]
+    assert vehicle_type[constants.VEHICLE_TYPE.CAPACITY.value] == 6
+
+
+def test_scale_resources_time_cost():
+    # the costs would be computed with rounded times
+    _, factors = scaled_json(time_granularity=40, var_cost_time=1)
+    assert factors[1] == 1
+    content, factors = scaled_json(var_cost_time=1)
+    assert factors[1] == 10
+    vehicle_type = content[constants.JSON_OBJECT.VEHICLE_TYPES.value][0]
+    assert vehicle_type[constants.VEHICLE_TYPE.VAR_COST_TIME.value] == 10
+
+
+def test_unscale_routes():
+    load, time_ = constants.ROUTE.LOAD.value, constants.ROUTE.TIME.value
+    output = {"Solution": {"Routes": [{
+        constants.ROUTE.VEHICLE_TYPE_ID.value: 1,
+        constants.ROUTE.VISITED_POINTS.value: [
+            {load: 0, time_: 0}, {load: 1, time_: 3},
+            {load: 2, time_: 5}]}]}}
+    preprocessing.unscale_routes(output, 5, 10)
+    points = output["Solution"]["Routes"][0][
+        constants.ROUTE.VISITED_POINTS.value]
+    assert [point[load] for point in points] == [0, 5, 10]
+    assert [point[time_] for point in points] == [0, 30, 50]
+
+
+def test_bin_packing_bound():
+    assert preprocessing.bin_packing_bound([], 10) == 0
+    assert preprocessing.bin_packing_bound([6, 6, 6], 10) == 3
+    assert preprocessing.bin_packing_bound([5, 5, 5, 5], 10) == 2
+    assert preprocessing.bin_packing_bound([4, 4, 4, 4, 4], 10) == 2
+
+
+def test_fleet_bounds():
+    model = line_model(nb_customers=4, capacity=10, demand=6)
+    model.add_vehicle_type(id=2, start_point_id=0, end_point_id=0,
+                           capacity=10, var_cost_dist=2, max_number=2)
+    model.points[4].incompatible_vehicles = [1]
+    arrays = ModelArrays(model)
+    report = PreprocessingReport()
+    caps, total_cap = preprocessing.fleet_bounds(arrays, report)
+    # the first type has no limit and serves 3 customers, the second
+    # keeps its limit of 2
+    assert caps == [3, 2]
+    assert total_cap == 4
+    assert report.fleet["lowerBound"] == 4
+
+
+def reduced_json(max_numbers):
+    """Return the json of a model with three vehicle types of the given
+    max numbers, the first two identical and the third more expensive,
+    with the mapping of the reduction and the report"""
+    model = line_model(nb_customers=3)
+    del model.vehicle_types[1]
+    for vehicle_type_id, max_number in enumerate(max_numbers, 1):
+        model.add_vehicle_type(id=vehicle_type_id, start_point_id=0,
+                               end_point_id=0, capacity=10,
+                               var_cost_dist=1 + (vehicle_type_id == 3),
+                               max_number=max_number)
+    content = model.get_model()
+    report = PreprocessingReport()
+    mapping = preprocessing.reduce_vehicle_types(content, report)
+    return content, mapping, report
+
+
+def test_reduce_vehicle_types():
+    content, mapping, report = reduced_json([1, 2, 1])
+    vehicle_types = content[constants.JSON_OBJECT.VEHICLE_TYPES.value]
+    # the merged type has 3 vehicles, enough for the 3 customers
+    assert [veh[constants.VEHICLE_TYPE.ID.value]
+            for veh in vehicle_types] == [1]
+    assert vehicle_types[0][constants.VEHICLE_TYPE.MAX_NUMBER.value] == 3
+    assert mapping == {1: [(1, 1), (2, 2)]}
+    assert report.vehicle_types["merged"] == {1: [2]}
+    assert report.vehicle_types["dominated"] == {3: 1}
+
+
+def test_reduce_vehicle_types_without_limit():
+    content, mapping, _ = reduced_json([1, 0, 1])
+    vehicle_types = content[constants.JSON_OBJECT.VEHICLE_TYPES.value]
+    assert [veh[constants.VEHICLE_TYPE.ID.value]
+            for veh in vehicle_types] == [1]
+    assert constants.VEHICLE_TYPE.MAX_NUMBER.value not in vehicle_types[0]
+
+
+def test_reduce_vehicle_types_too_few():
+    # 2 vehicles cannot make all the routes, the third type is kept
+    content, _, _ = reduced_json([1, 1, 1])
+    vehicle_types = content[constants.JSON_OBJECT.VEHICLE_TYPES.value]
+    assert [veh[constants.VEHICLE_TYPE.ID.value]
+            for veh in vehicle_types] == [1, 3]
+
+
+def test_restore_vehicle_types():
+    key = constants.ROUTE.VEHICLE_TYPE_ID.value
+    output = {"Solution": {"Routes": [{key: 1}, {key: 1}, {key: 1},
+                                      {key: 3}]}}
+    preprocessing.restore_vehicle_types(output, {1: [(1, 1), (2, 2)]})
+    assert [route[key] for route in output["Solution"]["Routes"]] == \
+        [1, 2, 2, 3]